@@ -0,0 +1,124 @@
+"""Stress test: N writer processes against one database, as N app replicas would be.
+
+    python -m benchmarks.concurrent_writers --max-processes 8 --ops 200 --json concurrent_writers.json
+
+Every process signs up its own users, saves ideas into one shared gallery
+and edits the ideas it saved, all through the same cached directory the
+app uses.  Afterwards the database is checked for lost updates: every
+user and idea must be present, gallery positions must be unique, every
+edit must have landed, and the write counter must equal the number of
+writes.  Throughput is reported for each process count.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+SHARED_USER = "shared"
+
+
+def _writer(db_file, worker, ops, start, results):
+    from startovate import storage
+    storage.DB_FILE = db_file
+    from benchmarks.datasets import synthetic_ideas
+    from startovate.cache import UserDirectoryCache
+
+    directory = UserDirectoryCache()
+    ideas = synthetic_ideas(ops, seed=worker)
+    start.wait()
+    began = time.perf_counter()
+    errors = []
+    for i, idea in enumerate(ideas):
+        try:
+            directory.add_user(f"w{worker}-u{i}", f"Writer {worker}", f"w{worker}@example.com", "x")
+            # Unique per writer, so no two processes save the same idea.
+            saved = directory.add_idea(SHARED_USER, {**idea, 'tagline': f"w{worker}-{i}"})
+            directory.update_idea(SHARED_USER, {**saved, 'tagline': f"w{worker}-{i} edited"})
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+    results.put((worker, time.perf_counter() - began, errors))
+
+
+def check(processes, ops):
+    """Problems found in the current database after a run (empty when nothing was lost)."""
+    from startovate import storage
+
+    problems = []
+    users = storage.load_user_data()
+    missing_users = [f"w{w}-u{i}" for w in range(processes) for i in range(ops) if f"w{w}-u{i}" not in users]
+    if missing_users:
+        problems.append(f"{len(missing_users)} users missing, e.g. {missing_users[:3]}")
+    positions = [row[0] for row in storage.connect().execute(
+        "SELECT position FROM ideas WHERE username = ?", (SHARED_USER,))]
+    if len(positions) != processes * ops:
+        problems.append(f"shared gallery has {len(positions)} ideas, expected {processes * ops}")
+    if len(set(positions)) != len(positions):
+        problems.append("duplicate gallery positions")
+    unedited = [idea['tagline'] for idea in storage.load_saved_ideas(SHARED_USER) if not idea['tagline'].endswith(" edited")]
+    if unedited:
+        problems.append(f"{len(unedited)} edits lost, e.g. {unedited[:3]}")
+    expected_version = 1 + 3 * processes * ops  # the shared user, then three writes per op
+    if storage.version() != expected_version:
+        problems.append(f"write counter is {storage.version()}, expected {expected_version}")
+    return problems
+
+
+def run(processes, ops):
+    import multiprocessing
+
+    from startovate import storage
+
+    storage.DB_FILE = os.path.join(tempfile.mkdtemp(), "replicas.db")
+    storage.add_user(SHARED_USER, "Shared", "shared@example.com", "x")
+
+    context = multiprocessing.get_context("spawn")
+    start = context.Event()
+    results = context.Queue()
+    workers = [context.Process(target=_writer, args=(storage.DB_FILE, w, ops, start, results))
+               for w in range(processes)]
+    for worker in workers:
+        worker.start()
+    time.sleep(1.0)  # let every process import and build its ideas before the start signal
+    began = time.perf_counter()
+    start.set()
+    reports = [results.get() for _ in workers]
+    elapsed = time.perf_counter() - began
+    for worker in workers:
+        worker.join()
+
+    errors = [error for _, _, worker_errors in reports for error in worker_errors]
+    writes = 3 * processes * ops
+    return {
+        'processes': processes, 'ops_per_process': ops, 'writes': writes, 'seconds': elapsed,
+        'writes_per_second': writes / elapsed, 'errors': len(errors), 'first_errors': errors[:3],
+        'problems': check(processes, ops),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-processes', type=int, default=8)
+    parser.add_argument('--ops', type=int, default=200, help="signup + save + edit rounds per process")
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    process_counts = sorted({1, *(2 ** i for i in range(1, 8) if 2 ** i <= args.max_processes), args.max_processes})
+    results = []
+    print(f"{'processes':>9} {'writes':>7} {'seconds':>8} {'writes/s':>9} {'errors':>7}  lost updates")
+    for processes in process_counts:
+        result = run(processes, args.ops)
+        results.append(result)
+        print(f"{processes:>9} {result['writes']:>7} {result['seconds']:>8.2f} {result['writes_per_second']:>9.0f} "
+              f"{result['errors']:>7}  {'; '.join(result['problems']) or 'none'}")
+        for error in result['first_errors']:
+            print(f"{'':>9} {error}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'concurrent_writers', 'cpu_count': os.cpu_count(), 'results': results}, f, indent=4)
+    if any(result['problems'] or result['errors'] for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
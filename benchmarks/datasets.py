@@ -0,0 +1,90 @@
+"""Synthetic, reproducible datasets and service stand-ins for the benchmarks."""
+import itertools
+import os
+import random
+import threading
+import time
+import wave
+
+from startovate import generator, storage, tts
+from startovate.ideas import with_id
+
+
+def synthetic_ideas(n, seed=0):
+    """``n`` ideas cycling through every generator selection in a shuffled order."""
+    rng = random.Random(seed)
+    combos = list(itertools.product(
+        generator.INDUSTRIES, generator.AUDIENCES, generator.TECHNOLOGIES,
+        generator.GOALS, generator.REGIONS,
+    ))
+    # Shuffled, so that any prefix covers every industry, region, etc.
+    rng.shuffle(combos)
+    combos = itertools.cycle(combos)
+    ideas = []
+    for i, (industry, audience, tech, goal, region) in zip(range(n), combos):
+        monetization = rng.sample(generator.MONETIZATION_OPTIONS, rng.randint(1, 3))
+        ideas.append(generator.generate_ideas(
+            1, industry, audience, tech, goal, monetization, region, rng.randint(1, 50), seed=f"{seed}-{i}"
+        )[0])
+    return ideas
+
+
+def populate_storage(users, ideas_per_user, seed=0):
+    """Fill the current storage database with ``users`` x ``ideas_per_user`` ideas.
+
+    Rows are written in bulk and the search index is built once at the end,
+    so large datasets build in seconds rather than one transaction per idea.
+    Returns the list of usernames.
+    """
+    pool = synthetic_ideas(min(users * ideas_per_user, 5000), seed)
+    usernames = [f"user{i:06d}" for i in range(users)]
+    with storage.transaction() as conn:
+        conn.executemany(
+            "INSERT INTO users (username, name, email, password) VALUES (?, ?, ?, ?)",
+            [(username, username.title(), f"{username}@example.com", "x") for username in usernames],
+        )
+        for u, username in enumerate(usernames):
+            rows = []
+            for position in range(ideas_per_user):
+                idea = with_id(pool[(u * ideas_per_user + position) % len(pool)].replace(team=position + 1))
+                rows.append((username, idea['id'], position, idea.to_json()))
+            conn.executemany(
+                "INSERT INTO ideas (username, idea_id, position, data) VALUES (?, ?, ?, ?)", rows
+            )
+        storage.rebuild_search_index(conn)
+    return usernames
+
+
+def silent_synthesizer(chars_per_second=None):
+    """Stand-in for ``tts._synthesize``: a silent WAV file, one sample per character.
+
+    With ``chars_per_second`` it also takes as long as a synthesizer of that speed.
+    """
+    def synthesize(text, path):
+        if chars_per_second:
+            time.sleep(len(text) / chars_per_second)
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with wave.open(path, 'wb') as f:
+            f.setnchannels(1)
+            f.setsampwidth(2)
+            f.setframerate(8000)
+            f.writeframes(b"\0\0" * len(text))
+        return path
+    return synthesize
+
+
+def _thread_worker(worker_index, requests, results):
+    try:
+        tts._worker_main(worker_index, requests, results)
+    except (EOFError, OSError):
+        pass  # the queues are closed when the process exits
+
+
+class ThreadTTSService(tts.TTSService):
+    """TTS service with worker threads, so a patched ``tts._synthesize`` is used."""
+
+    def _spawn(self, worker_index):
+        worker = threading.Thread(target=_thread_worker, args=(worker_index, self._requests, self._results),
+                                  daemon=True)
+        worker.start()
+        return worker
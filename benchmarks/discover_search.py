@@ -0,0 +1,109 @@
+"""Discover search latency over every user's saved ideas.
+
+    python -m benchmarks.discover_search --users 10000 --json discover_search.json
+
+Fills a fresh database with ``--users`` x ``--ideas-per-user`` ideas
+(10k x 100 is a million), builds the search index, then reports the median
+time of a page of results for typical searches, and what the index adds to
+writes: one edited idea saved with ``save_saved_ideas`` and one
+``add_idea``.
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.datasets import populate_storage
+from startovate import discover, storage
+
+QUERIES = {
+    'everything': {},
+    'rare keyword': {'text': 'loomaly'},
+    'common keyword': {'text': 'smart'},
+    'two keywords': {'text': 'smart zenoify'},
+    'one facet': {'industry': ['Healthcare']},
+    'facets + score range': {'industry': ['Travel'], 'monetization': ['Ads', 'Freemium'], 'score': (80, 90)},
+    'keyword + facets': {'text': 'students', 'tech': ['AI Tool', 'IoT'], 'region': ['India']},
+    'page 50': {'industry': ['Finance'], 'page': 50},
+    'no match': {'text': 'zzzz'},
+}
+
+
+def median_ms(fn, repeat):
+    fn()  # warm the page cache
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        runs.append(time.perf_counter() - start)
+    return statistics.median(runs) * 1000
+
+
+def run(users, ideas_per_user, k, repeat, seed):
+    storage.DB_FILE = os.path.join(tempfile.mkdtemp(), "bench.db")
+    start = time.perf_counter()
+    usernames = populate_storage(users, ideas_per_user, seed)
+    populate_s = time.perf_counter() - start
+
+    results = {}
+    for name, query in QUERIES.items():
+        page = discover.search(k=k, **query)
+        results[name] = {
+            'ms': median_ms(lambda: discover.search(k=k, **query), repeat),
+            'results': len(page.ideas),
+            'scores': [idea['score'] for idea in page.ideas],
+        }
+
+    username = usernames[len(usernames) // 2]
+    ideas = storage.load_saved_ideas(username)
+    edits = iter(range(10 ** 6))
+
+    def save_one_edit():
+        ideas[0] = ideas[0].replace(tagline=f"Edited tagline {next(edits)}")
+        storage.save_saved_ideas(username, ideas)
+
+    def add_one():
+        n = next(edits)
+        storage.add_idea(username, ideas[1].replace(name=f"Added{n}", id=f"added-{n}"))
+
+    writes = {
+        'save_saved_ideas (one edit) ms': median_ms(save_one_edit, repeat),
+        'add_idea ms': median_ms(add_one, repeat),
+    }
+    return {
+        'ideas': users * ideas_per_user,
+        'populate_and_index_s': populate_s,
+        'db_mb': os.path.getsize(storage.DB_FILE) / 2 ** 20,
+        'index_rows': storage.connect().execute("SELECT COUNT(*) FROM idea_terms").fetchone()[0],
+        'queries': results,
+        'writes': writes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--ideas-per-user', type=int, default=100)
+    parser.add_argument('--k', type=int, default=10, help="results per page")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    result = run(args.users, args.ideas_per_user, args.k, args.repeat, args.seed)
+    print(f"{result['ideas']:,} ideas, {result['index_rows']:,} index rows, {result['db_mb']:.0f} MB, "
+          f"populated and indexed in {result['populate_and_index_s']:.1f} s")
+    for name, query in result['queries'].items():
+        print(f"{name:<22} {query['ms']:>8.2f} ms  {query['results']:>3} results  {query['scores'][:5]}")
+    for name, ms in result['writes'].items():
+        print(f"{name:<32} {ms:>8.2f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'discover_search', 'users': args.users, 'ideas_per_user': args.ideas_per_user,
+                       'k': args.k, 'seed': args.seed, **result}, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
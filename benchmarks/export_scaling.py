@@ -0,0 +1,44 @@
+"""How gallery export throughput scales with worker processes.
+
+    python -m benchmarks.export_scaling --ideas 1000 --json export_scaling.json
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.datasets import synthetic_ideas
+from startovate.export import export_gallery_zip
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ideas', type=int, default=1000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    ideas = synthetic_ideas(args.ideas)
+    worker_counts = sorted({1, *(2 ** i for i in range(1, 8) if 2 ** i <= args.max_workers), args.max_workers})
+    results = []
+    print(f"{'workers':>8} {'seconds':>9} {'PDFs/s':>9} {'speedup':>8} {'ZIP MB':>7}")
+    for workers in worker_counts:
+        with tempfile.TemporaryFile() as f:
+            start = time.perf_counter()
+            export_gallery_zip(ideas, f, workers=workers)
+            elapsed = time.perf_counter() - start
+            size = f.tell()
+        result = {'workers': workers, 'ideas': len(ideas), 'seconds': elapsed,
+                  'pdfs_per_second': len(ideas) / elapsed, 'zip_bytes': size}
+        result['speedup'] = results[0]['seconds'] / elapsed if results else 1.0
+        results.append(result)
+        print(f"{workers:>8} {elapsed:>9.2f} {result['pdfs_per_second']:>9.0f} "
+              f"{result['speedup']:>7.2f}x {size / 1e6:>7.1f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'export_scaling', 'cpu_count': os.cpu_count(), 'results': results}, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
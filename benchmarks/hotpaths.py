@@ -0,0 +1,133 @@
+"""Micro-benchmarks for the app's hot paths.
+
+    python -m benchmarks.hotpaths --scale full --json hotpaths.json
+    python -m benchmarks.hotpaths --scale small --compare hotpaths.json
+
+Covers idea generation and scoring (including the top-k search), gallery load/save against a synthetic database
+(``full`` is 10k users x 100 ideas), PDF rendering, the gallery duplicate
+check and pitch text building.  Results are per-call times in microseconds.
+``--compare`` prints the change against an earlier ``--json`` file.
+"""
+import argparse
+import itertools
+import json
+import os
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+import timeit
+
+from benchmarks.datasets import populate_storage, synthetic_ideas
+from startovate import generator, pitch, scoring, storage
+from startovate.cache import UserDirectoryCache
+from startovate.pdf import PdfCache, render_pitch_pdf
+
+SCALES = {
+    'small': {'users': 200, 'ideas_per_user': 100},
+    'full': {'users': 10_000, 'ideas_per_user': 100},
+}
+
+
+def bench(fn, repeat=5, min_time=0.2):
+    """Per-call seconds of ``fn``: (best, median) over ``repeat`` timed batches."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    runs = [t / number for t in timer.repeat(repeat=repeat, number=number)]
+    return min(runs), statistics.median(runs)
+
+
+def legacy_is_saved(idea, saved_ideas):
+    # The gallery's duplicate check before saved ideas had ids.
+    return any(all(item in saved.items() for item in idea.items()) for saved in saved_ideas)
+
+
+def run(scale, seed):
+    rng = random.Random(seed)
+    params = ("Healthcare", "Students", "AI Tool", "Go viral", ["Subscription"], "India", 5)
+    sample = synthetic_ideas(1, seed)[0]
+    cases = {
+        'generate_one': lambda: generator.generate_ideas(1, *params, seed=seed),
+        'generate_six': lambda: generator.generate_ideas(6, *params, seed=seed),
+        'score_one': lambda: scoring.score(*params),
+        'best_ideas_unconstrained': lambda: scoring.best_ideas(10),
+        'best_ideas_industry_region': lambda: scoring.best_ideas(10, industry=["Travel"], region=["India"]),
+        'pitch_narration': lambda: pitch.pitch_narration(sample),
+        'idea_email': lambda: pitch.idea_email(sample),
+        'render_pitch_pdf': lambda: render_pitch_pdf(sample),
+    }
+    pdf_cache = PdfCache()
+    pdf_cache.get(sample)
+    cases['pdf_cache_hit'] = lambda: pdf_cache.get(sample)
+
+    storage.DB_FILE = os.path.join(tempfile.mkdtemp(), "bench.db")
+    start = time.perf_counter()
+    usernames = populate_storage(seed=seed, **SCALES[scale])
+    setup_seconds = time.perf_counter() - start
+
+    user = rng.choice(usernames)
+    gallery = storage.load_saved_ideas(user)
+    edited = [dict(idea) for idea in gallery]
+    taglines = itertools.cycle(generator.TAGLINES)
+
+    def save_one_edit():
+        edited[0]['tagline'] = next(taglines)
+        storage.save_saved_ideas(user, edited)
+
+    directory = UserDirectoryCache()
+    directory.load_saved_ideas(user)
+    unsaved = synthetic_ideas(2, seed + 1)[1]
+    cases.update({
+        'load_saved_ideas': lambda: storage.load_saved_ideas(rng.choice(usernames)),
+        'save_saved_ideas_one_edit': save_one_edit,
+        'update_idea': lambda: storage.update_idea(user, {**gallery[1], 'tagline': next(taglines)}),
+        'cache_load_saved_ideas_hit': lambda: directory.load_saved_ideas(user),
+        'duplicate_check_indexed': lambda: directory.is_saved(user, unsaved),
+        'duplicate_check_legacy_scan': lambda: legacy_is_saved(unsaved, gallery),
+    })
+
+    results = {}
+    for name, fn in cases.items():
+        best, median = bench(fn)
+        results[name] = {'best_us': best * 1e6, 'median_us': median * 1e6}
+    return results, setup_seconds
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--compare', help="compare against an earlier --json file")
+    args = parser.parse_args()
+
+    results, setup_seconds = run(args.scale, args.seed)
+    baseline = {}
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+
+    print(f"dataset: {args.scale} {SCALES[args.scale]} built in {setup_seconds:.1f} s")
+    for name, timing in results.items():
+        line = f"{name:<30} {timing['median_us']:>12.1f} us"
+        if name in baseline:
+            line += f"  ({timing['median_us'] / baseline[name]['median_us'] - 1:+.0%})"
+        print(line)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'hotpaths', 'commit': git_commit(), 'scale': args.scale,
+                       'dataset': SCALES[args.scale], 'seed': args.seed, 'results': results}, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""Memory held by saved ideas: plain dicts from ``json.loads`` vs. ``Idea`` records.
+
+    python -m benchmarks.idea_memory --users 1000 --json idea_memory.json
+
+Measured with ``tracemalloc`` on the saved JSON of synthetic ideas:
+
+* per idea: one idea as the gallery cache holds it;
+* per session: the current idea plus its six variants on the generator page;
+* per gallery cache: ``--users`` x ``--ideas-per-user`` ideas, as a server
+  process would hold them with every user's gallery loaded.
+
+Every idea is also checked to round-trip to the same JSON text.
+"""
+import argparse
+import gc
+import json
+import tracemalloc
+
+from benchmarks.datasets import synthetic_ideas
+from startovate import generator
+from startovate.ideas import Idea, with_id
+
+SESSION_IDEAS = 7  # the selected idea and its six variants
+
+
+def allocated(build):
+    """Bytes still allocated by ``build()``'s result, and the result."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return after - before, result
+
+
+def run(users, ideas_per_user, seed):
+    pool = [with_id(idea).to_json() for idea in synthetic_ideas(min(users * ideas_per_user, 5000), seed)]
+    mismatches = sum(Idea.from_json(text).to_json() != text for text in pool)
+    Idea.from_json(pool[0])  # build the shared vocabularies outside the measurement
+    rows = [[pool[(u * ideas_per_user + p) % len(pool)] for p in range(ideas_per_user)] for u in range(users)]
+    params = ("Healthcare", "Students", "AI Tool", "Go viral", ["Subscription"], "India", 5)
+
+    results = {}
+    for name, load, session in (
+        ('dict', json.loads, lambda: [dict(idea) for idea in generator.generate_ideas(SESSION_IDEAS, *params)]),
+        ('Idea', Idea.from_json, lambda: generator.generate_ideas(SESSION_IDEAS, *params)),
+    ):
+        per_idea, _ = allocated(lambda: [load(text) for text in pool])
+        per_session, _ = allocated(session)
+        cache, _ = allocated(lambda: {u: [load(text) for text in texts] for u, texts in enumerate(rows)})
+        results[name] = {
+            'bytes_per_idea': per_idea / len(pool),
+            'bytes_per_session': per_session,
+            'gallery_cache_bytes': cache,
+        }
+    return results, mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--ideas-per-user', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    results, mismatches = run(args.users, args.ideas_per_user, args.seed)
+    print(f"{'':<6} {'bytes/idea':>11} {'bytes/session':>14} {f'cache of {args.users}x{args.ideas_per_user}':>22}")
+    for name, result in results.items():
+        print(f"{name:<6} {result['bytes_per_idea']:>11.0f} {result['bytes_per_session']:>14} "
+              f"{result['gallery_cache_bytes'] / 2 ** 20:>19.1f} MB")
+    print(f"JSON round-trip mismatches: {mismatches}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'idea_memory', 'users': args.users, 'ideas_per_user': args.ideas_per_user,
+                       'seed': args.seed, 'round_trip_mismatches': mismatches, 'results': results}, f, indent=4)
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == '__main__':
+    main()
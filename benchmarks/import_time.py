@@ -0,0 +1,83 @@
+"""Cold import time of the app and its modules, measured with ``-X importtime``.
+
+    python -m benchmarks.import_time --json import_time.json
+    python -m benchmarks.import_time --baseline import_time.json
+
+Each module of the startovate package, Streamlit and the page script is
+imported in a fresh interpreter.  With ``--baseline`` the run
+is compared with an earlier ``--json`` file and exits non-zero when a module
+got slower by more than ``--tolerance``.
+"""
+import argparse
+import json
+import os
+import pkgutil
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Every module of the package, so a new one that pulls in a heavy dependency shows up too.
+MODULES = sorted(
+    f"startovate.{module.name}" for module in pkgutil.iter_modules([os.path.join(REPO_ROOT, 'startovate')])
+) + ['streamlit', 'page']
+# What the app used to import eagerly; kept for comparison.
+HEAVY_DEPENDENCIES = ['reportlab.pdfgen.canvas', 'pyttsx3', 'speech_recognition', 'smtplib']
+
+
+def import_time_us(module, runs):
+    """Best-of-``runs`` cumulative import time of ``module`` in microseconds."""
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=REPO_ROOT, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            return None
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:') or '|' not in line:
+                continue
+            _, cumulative, name = line[len('import time:'):].split('|')
+            if name.strip() == module:
+                value = int(cumulative)
+                best = value if best is None else min(best, value)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3)
+    parser.add_argument('--json', help="write the results to this file")
+    parser.add_argument('--baseline', help="compare against an earlier --json file")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown, default 25%%")
+    args = parser.parse_args()
+
+    results = {module: import_time_us(module, args.runs) for module in MODULES + HEAVY_DEPENDENCIES}
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    regressions = []
+    for module, micros in results.items():
+        if micros is None:
+            print(f"{module:<28} not installed")
+            continue
+        line = f"{module:<28} {micros / 1000:>8.1f} ms"
+        before = baseline.get(module)
+        if before:
+            change = micros / before - 1
+            line += f"  ({change:+.0%} vs baseline)"
+            if change > args.tolerance:
+                regressions.append(module)
+        print(line)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'import_time', 'python': sys.version.split()[0], 'results': results}, f, indent=4)
+    if regressions:
+        sys.exit(f"import time regressed: {', '.join(regressions)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+"""Load test: N concurrent users running the real app flows against one Streamlit process.
+
+    python -m benchmarks.load_test --max-users 32 --json load_test.json
+
+Starts ``streamlit run page.py`` on a free port with its own database, a
+stub SMTP server that accepts every message, and a TTS stub that writes a
+short silent WAV from threads instead of pyttsx3 worker processes.  The
+simulated users are headless websocket clients that speak Streamlit's
+protocol, so every rerun goes through the same server, session and script
+runner as a browser's.
+
+Each user runs signup -> login -> generate -> pitch deck (with narration) ->
+save -> gallery (opening the saved idea) -> PDF (prepare and download), ``--rounds`` times
+with a fresh account and session each time.  For every number of concurrent
+users the p50/p95/p99 latency of each step, completed flows per second and
+the error rate are reported.  Flows stopped by the app's rate limits are
+counted as throttled, not as errors; ``--unlimited`` lifts the limits to
+measure the process alone.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import socketserver
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from collections import Counter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(REPO_ROOT, "page.py")
+RECEIVE_TIMEOUT = 120  # seconds without a message from the server before a step fails
+STEPS = ['signup', 'login', 'generate', 'pitch_deck', 'save', 'gallery', 'pdf']
+UNLIMITED = {action: {'user_rate': 1e6, 'user_burst': 1e6, 'global_rate': 1e6, 'global_burst': 1e6,
+                      'concurrency': 1000} for action in ('generate', 'narrate', 'record', 'pdf', 'export')}
+
+
+# --- SERVER SIDE (runs in the streamlit process) ---
+
+class _SmtpStub(socketserver.StreamRequestHandler):
+    """Accepts every message and throws it away."""
+
+    def handle(self):
+        self.wfile.write(b"220 stub ESMTP\r\n")
+        for line in self.rfile:
+            command = line[:4].upper()
+            if command == b"DATA":
+                self.wfile.write(b"354 end with .\r\n")
+                for data in self.rfile:
+                    if data.rstrip(b"\r\n") == b".":
+                        break
+                self.wfile.write(b"250 queued\r\n")
+            elif command == b"QUIT":
+                self.wfile.write(b"221 bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 ok\r\n")
+
+
+def serve(port):
+    """Run the app on ``port`` with SMTP and TTS replaced by local stubs."""
+    smtp = socketserver.ThreadingTCPServer(("127.0.0.1", 0), _SmtpStub)
+    smtp.daemon_threads = True
+    threading.Thread(target=smtp.serve_forever, daemon=True).start()
+    os.environ.update({"STARTOVATE_SMTP_HOST": "127.0.0.1", "STARTOVATE_SMTP_PORT": str(smtp.server_address[1]),
+                       "STARTOVATE_SMTP_SSL": "0", "STARTOVATE_SMTP_USER": ""})
+
+    from benchmarks.datasets import ThreadTTSService, silent_synthesizer
+    from startovate import tts
+
+    tts._synthesize = silent_synthesizer()
+    tts._service = ThreadTTSService()
+
+    from streamlit.web import cli
+    sys.argv = ["streamlit", "run", PAGE, "--server.port", str(port), "--server.headless", "true",
+                "--server.enableXsrfProtection", "false", "--server.fileWatcherType", "none",
+                "--browser.gatherUsageStats", "false"]
+    cli.main()
+
+
+def start_server(unlimited):
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    workdir = tempfile.mkdtemp()
+    env = {**os.environ, "STARTOVATE_DB": os.path.join(workdir, "load_test.db"),
+           "STARTOVATE_TTS_CACHE_DIR": os.path.join(workdir, "tts"), "PYTHONPATH": REPO_ROOT}
+    if unlimited:
+        env["STARTOVATE_LIMITS"] = json.dumps(UNLIMITED)
+    log = open(os.path.join(workdir, "server.log"), 'w')
+    process = subprocess.Popen([sys.executable, "-m", "benchmarks.load_test", "--serve", str(port)],
+                               cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(f"{base}/_stcore/health", timeout=1):
+                return process, base, log.name
+        except OSError:
+            if process.poll() is not None:
+                break
+            time.sleep(0.2)
+    process.kill()
+    raise SystemExit(f"server did not start; see {log.name}")
+
+
+# --- CLIENT SIDE ---
+
+class StepFailed(Exception):
+    pass
+
+
+class StepThrottled(Exception):
+    pass
+
+
+class Session:
+    """One browser tab: a websocket session that reruns the script with widget states."""
+
+    def __init__(self, websocket, base):
+        self.websocket = websocket
+        self.base = base
+        self.states = {}    # widget id -> WidgetState the user has set
+        self.elements = []  # elements of the last completed run
+
+    async def _receive(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = ForwardMsg()
+        msg.ParseFromString(await asyncio.wait_for(self.websocket.recv(), RECEIVE_TIMEOUT))
+        kind = msg.WhichOneof('type')
+        if kind == 'new_session':
+            self.elements = []
+        elif kind == 'delta' and msg.delta.WhichOneof('type') == 'new_element':
+            self.elements.append(msg.delta.new_element)
+        return msg, kind
+
+    async def rerun(self, *clicked):
+        """Rerun the script with the current widget states and ``clicked`` buttons, until it finishes."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""  # selects the rerun even when no widget is set
+        widgets = msg.rerun_script.widget_states.widgets
+        for state in self.states.values():
+            widgets.add().CopyFrom(state)
+        for proto in clicked:
+            widgets.add(id=proto.id, trigger_value=True)
+        await self.websocket.send(msg.SerializeToString())
+        # st.rerun() ends a run early and starts another one.
+        while True:
+            msg, kind = await self._receive()
+            if kind == 'script_finished' and msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.check()
+
+    def check(self):
+        for element in self.elements:
+            kind = element.WhichOneof('type')
+            if kind == 'exception':
+                raise StepFailed(f"{element.exception.type}: {element.exception.message}")
+            if kind == 'alert' and element.alert.body.startswith("⏳"):
+                raise StepThrottled(element.alert.body)
+
+    def widget(self, key=None, label=None, key_prefix=None):
+        for element in self.elements:
+            proto = getattr(element, element.WhichOneof('type'))
+            widget_id = getattr(proto, 'id', '')
+            if not isinstance(widget_id, str) or not widget_id:
+                continue
+            if key is not None and widget_id.endswith(f"-{key}"):
+                return proto
+            if key_prefix is not None and f"-{key_prefix}" in widget_id:
+                return proto
+            if label is not None and getattr(proto, 'label', None) == label:
+                return proto
+        raise StepFailed(f"no widget {key or key_prefix or label!r} on the page")
+
+    def set(self, proto, **value):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        self.states[proto.id] = WidgetState(id=proto.id, **value)
+
+    def alerts(self, format_name):
+        from streamlit.proto.Alert_pb2 import Alert
+
+        fmt = Alert.Format.Value(format_name)
+        return [e.alert.body for e in self.elements if e.WhichOneof('type') == 'alert' and e.alert.format == fmt]
+
+    async def download(self, proto):
+        """Fetch a download button's file, as the browser does on a click; returns its bytes."""
+        def fetch():
+            with urllib.request.urlopen(self.base + proto.url, timeout=60) as r:
+                return r.read()
+        return await asyncio.to_thread(fetch)
+
+
+async def flow(base, username, think):
+    """One user's signup-to-PDF flow: ``{step: seconds}`` for the steps that ran, and the outcome."""
+    import websockets
+
+    timings = {}
+    url = base.replace("http", "ws", 1) + "/_stcore/stream"
+    step = 'connect'
+    try:
+        async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as websocket:
+            s = Session(websocket, base)
+            for step in STEPS:
+                began = time.perf_counter()
+                if step == 'signup':
+                    await s.rerun()
+                    for label, value in (("Your Name", username.title()), ("Choose a Username", username),
+                                         ("Your Email", f"{username}@example.com"), ("Choose a Password", "pw")):
+                        s.set(s.widget(label=label), string_value=value)
+                    await s.rerun(s.widget(label="Sign Up"))
+                    if s.alerts('ERROR'):
+                        raise StepFailed(s.alerts('ERROR')[0])
+                elif step == 'login':
+                    s.set(s.widget(label="Username"), string_value=username)
+                    s.set(s.widget(label="Password"), string_value="pw")
+                    await s.rerun(s.widget(label="Login"))
+                    s.widget(key="main_navigation_radio")
+                elif step == 'generate':
+                    await s.rerun(s.widget(key="generate_idea_button"))
+                elif step == 'pitch_deck':
+                    s.set(s.widget(key="main_navigation_radio"), string_value="Idea Pitch Deck")
+                    await s.rerun()
+                    await s.rerun(s.widget(key="narrate_pitch_deck_button"))
+                elif step == 'save':
+                    s.set(s.widget(key="main_navigation_radio"), string_value="Startup Gallery")
+                    await s.rerun()
+                    await s.rerun(s.widget(key="save_idea_button_gallery"))
+                elif step == 'gallery':
+                    s.set(s.widget(key_prefix="gallery_details_"), bool_value=True)
+                    await s.rerun()
+                elif step == 'pdf':
+                    await s.rerun(s.widget(key_prefix="download_pdf_"))  # the "prepare" button renders it
+                    data = await s.download(s.widget(key_prefix="download_pdf_"))
+                    if not data.startswith(b"%PDF"):
+                        raise StepFailed(f"download is not a PDF ({len(data)} bytes)")
+                timings[step] = time.perf_counter() - began
+                if think:
+                    await asyncio.sleep(think)
+    except StepThrottled as e:
+        return timings, ('throttled', step, str(e))
+    except Exception as e:
+        return timings, ('error', step, f"{type(e).__name__}: {e}")
+    return timings, ('ok', None, None)
+
+
+def percentiles(values):
+    if not values:
+        return {'p50': None, 'p95': None, 'p99': None}
+    if len(values) == 1:
+        return {'p50': values[0], 'p95': values[0], 'p99': values[0]}
+    cuts = statistics.quantiles(values, n=100, method='inclusive')
+    return {'p50': cuts[49], 'p95': cuts[94], 'p99': cuts[98]}
+
+
+def cpu_seconds(pid):
+    """User + system CPU time of a process, where /proc is available."""
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+    except OSError:
+        return None
+    return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+
+async def run_level(base, pid, users, rounds, think):
+    async def user(u):
+        return [await flow(base, f"load{users}u{u}r{r}", think) for r in range(rounds)]
+
+    cpu_before = cpu_seconds(pid)
+    began = time.perf_counter()
+    results = [outcome for outcomes in await asyncio.gather(*(user(u) for u in range(users))) for outcome in outcomes]
+    elapsed = time.perf_counter() - began
+    cpu_after = cpu_seconds(pid)
+
+    flows = len(results)
+    outcomes = [outcome for _, outcome in results]
+    completed = sum(kind == 'ok' for kind, _, _ in outcomes)
+    errors = Counter(f"{step}: {message}" for kind, step, message in outcomes if kind == 'error')
+    return {
+        'users': users, 'flows': flows, 'seconds': elapsed,
+        # Near 1.0 means the server is bound by one core (the GIL), not by waiting.
+        'server_cpu_per_second': (cpu_after - cpu_before) / elapsed if cpu_before is not None else None,
+        'flows_per_second': completed / elapsed,
+        'steps_per_second': sum(len(timings) for timings, _ in results) / elapsed,
+        'error_rate': sum(errors.values()) / flows,
+        'throttled_rate': sum(kind == 'throttled' for kind, _, _ in outcomes) / flows,
+        'errors': dict(errors.most_common()),
+        'steps': {step: percentiles([timings[step] for timings, _ in results if step in timings]) for step in STEPS},
+    }
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:>8.0f}" if seconds is not None else f"{'-':>8}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-users', type=int, default=32)
+    parser.add_argument('--rounds', type=int, default=3, help="flows per user at each level")
+    parser.add_argument('--think', type=float, default=0.0, help="seconds a user waits between steps")
+    parser.add_argument('--unlimited', action='store_true', help="lift the app's rate limits")
+    parser.add_argument('--json', help="also write the results to this file")
+    parser.add_argument('--serve', type=int, help=argparse.SUPPRESS)  # internal: run the app server
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+        return
+
+    levels = sorted({1, *(2 ** i for i in range(1, 11) if 2 ** i <= args.max_users), args.max_users})
+    process, base, log = start_server(args.unlimited)
+    results = []
+    try:
+        asyncio.run(flow(base, "warmup", 0))  # first run imports reportlab, draws fonts and builds tables
+        for users in levels:
+            result = asyncio.run(run_level(base, process.pid, users, args.rounds, args.think))
+            results.append(result)
+            cpu = result['server_cpu_per_second']
+            print(f"{users} users: {result['flows_per_second']:.2f} flows/s, {result['steps_per_second']:.1f} steps/s, "
+                  f"server CPU {'-' if cpu is None else f'{cpu:.2f}'} s/s, errors {result['error_rate']:.1%}, "
+                  f"throttled {result['throttled_rate']:.1%}")
+            print(f"    {'step':<11} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+            for step, p in result['steps'].items():
+                print(f"    {step:<11} {_ms(p['p50'])} {_ms(p['p95'])} {_ms(p['p99'])}")
+            for error, count in result['errors'].items():
+                print(f"    {count} x {error}")
+    finally:
+        process.terminate()
+        process.wait()
+    print(f"server log: {log}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'load_test', 'cpu_count': os.cpu_count(), 'rounds': args.rounds,
+                       'think': args.think, 'unlimited': args.unlimited, 'results': results}, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
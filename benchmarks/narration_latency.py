@@ -0,0 +1,95 @@
+"""Pitch deck narration: time to first audio, whole text vs. sentence by sentence.
+
+    python -m benchmarks.narration_latency --ideas 20 --workers 2 --json narration_latency.json
+
+Narrates the pitch decks of ``--ideas`` synthetic ideas one after the other,
+each with an empty cache for the mode:
+
+* whole: the full text as one job (``TTSService.submit``), so the first
+  audio is ready when all of it is;
+* sentences: ``TTSService.narrate``, which queues the text sentence by
+  sentence, so the first sentence can play while the rest render on the
+  other workers, and sentences shared with earlier ideas are reused.
+
+Synthesis uses a stand-in that takes ``--chars-per-second`` to write a
+silent WAV file in worker threads, unless ``--pyttsx3`` is given, which
+uses the real engine in worker processes.
+"""
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+from benchmarks.datasets import ThreadTTSService, silent_synthesizer, synthetic_ideas
+from startovate import pitch, tts
+
+
+def wait(status):
+    while True:
+        result = status()
+        if result['status'] in ('done', 'failed'):
+            return result
+        time.sleep(0.002)
+
+
+def run(ideas, workers, chars_per_second, real, seed):
+    if not real:
+        tts._synthesize = silent_synthesizer(chars_per_second)
+    texts = [pitch.pitch_narration(idea) for idea in synthetic_ideas(ideas, seed)]
+    results = {}
+    for mode in ('whole', 'sentences'):
+        tts.CACHE_DIR = tempfile.mkdtemp()
+        service = tts.TTSService(workers) if real else ThreadTTSService(workers)
+        first, total, chunks, reused = [], [], 0, 0
+        for text in texts:
+            if mode == 'whole':
+                job_id = service.submit(text)
+                job = wait(lambda: service.job(job_id))
+                first.append(job['finished_at'] - job['submitted_at'])
+                total.append(job['finished_at'] - job['submitted_at'])
+                continue
+            narration_id = service.narrate(text)
+            # Sentences already on disk are done before narrate returns.
+            chunk_jobs = [service.job(job_id) for job_id in service.narration(narration_id)['chunks']]
+            chunks += len(chunk_jobs)
+            reused += sum(job['status'] == 'done' for job in chunk_jobs)
+            narration = wait(lambda: service.narration(narration_id))
+            first.append(narration['first_audio_at'] - narration['submitted_at'])
+            total.append(narration['finished_at'] - narration['submitted_at'])
+        results[mode] = {
+            'first_audio_p50_ms': statistics.median(first) * 1000,
+            'first_audio_max_ms': max(first) * 1000,
+            'total_p50_ms': statistics.median(total) * 1000,
+            'total_max_ms': max(total) * 1000,
+            'sentences': chunks,
+            'sentences_reused': reused,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ideas', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=2)
+    parser.add_argument('--chars-per-second', type=float, default=1000, help="speed of the stand-in synthesizer")
+    parser.add_argument('--pyttsx3', action='store_true', help="use the real engine (needs eSpeak or similar)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.ideas, args.workers, args.chars_per_second, args.pyttsx3, args.seed)
+    print(f"{'mode':<10} {'first audio p50':>16} {'max':>8} {'total p50':>10} {'max':>8}  sentences reused")
+    for mode, result in results.items():
+        print(f"{mode:<10} {result['first_audio_p50_ms']:>13.0f} ms {result['first_audio_max_ms']:>5.0f} ms "
+              f"{result['total_p50_ms']:>7.0f} ms {result['total_max_ms']:>5.0f} ms  "
+              f"{result['sentences_reused']}/{result['sentences']}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'benchmark': 'narration_latency', 'ideas': args.ideas, 'workers': args.workers,
+                       'seed': args.seed, 'chars_per_second': None if args.pyttsx3 else args.chars_per_second,
+                       'engine': 'pyttsx3' if args.pyttsx3 else 'stand-in', 'results': results}, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""Bytes of page elements Streamlit sends on each rerun of the auth and main pages.
+
+    python -m benchmarks.rerun_payload --json rerun_payload.json
+
+"inline" is what the same rerun would cost with the stylesheets embedded
+as <style> blocks, the way they were before they moved to static/.
+"""
+import argparse
+import json
+import os
+import tempfile
+
+from streamlit.testing.v1 import AppTest
+
+from startovate.assets import STATIC_DIR
+
+PAGE = os.path.join(os.path.dirname(STATIC_DIR), "page.py")
+
+
+def element_bytes(node):
+    proto = getattr(node, 'proto', None)
+    size = len(proto.SerializeToString()) if proto is not None and hasattr(proto, 'SerializeToString') else 0
+    for child in getattr(node, 'children', {}).values():
+        size += element_bytes(child)
+    return size
+
+
+def inline_style_bytes(name):
+    with open(os.path.join(STATIC_DIR, name)) as f:
+        return len(f"<style>\n{f.read()}</style>".encode())
+
+
+def measure(session_state, stylesheet):
+    at = AppTest.from_file(PAGE, default_timeout=60)
+    for key, value in session_state.items():
+        at.session_state[key] = value
+    at.run()
+    at.run()  # measure a rerun, not the first run
+    static = element_bytes(at._tree)
+    link_bytes = sum(len(m.proto.body.encode()) for m in at.markdown if m.proto.body.startswith('<link'))
+    return {'static': static, 'inline': static - link_bytes + inline_style_bytes(stylesheet)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--json', help="also write the results to this file")
+    args = parser.parse_args()
+    output = os.path.abspath(args.json) if args.json else None
+
+    os.chdir(tempfile.mkdtemp())  # keep the measurement's database out of the repo
+    results = {
+        'auth': measure({}, 'auth.css'),
+        'main': measure({'logged_in': True, 'username': 'Bench', 'user_email': '',
+                         'user_login_username': 'bench'}, 'main.css'),
+    }
+    for page, sizes in results.items():
+        saved = 1 - sizes['static'] / sizes['inline']
+        print(f"{page:>5}: {sizes['inline']:>6} B inline -> {sizes['static']:>6} B with static CSS ({saved:.0%} smaller)")
+    if output:
+        with open(output, 'w') as f:
+            json.dump({'benchmark': 'rerun_payload', 'results': results}, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,225 +1,280 @@
-import streamlit as st
-import random
-import pyttsx3
-import speech_recognition as sr
-import smtplib
-from email.message import EmailMessage
-from datetime import datetime
+"""Streamlit UI for Startovate.
+
+Run with ``streamlit run page.py``.  All generation, storage, PDF, email and
+voice logic lives in the ``startovate`` package; this file only lays out the
+pages.
+"""
+import os
 import time
-import json
-import hashlib
-import io
-from reportlab.pdfgen import canvas
-from reportlab.lib.pagesizes import letter
-import re
-
-# --- PAGE CONFIGURATION ---
-st.set_page_config(
-    page_title="Startovate - AI Startup Generator",
-    page_icon="🚀",
-    layout="wide"
-)
-
-# --- USER AUTHENTICATION & DATA HANDLING ---
-
-USER_DATA_FILE = "users.json"
-SAVED_IDEAS_FILE = "saved_ideas.json"
-
-def load_user_data():
-    try:
-        with open(USER_DATA_FILE, 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+from contextlib import nullcontext
 
-def save_user_data(data):
-    with open(USER_DATA_FILE, 'w') as f:
-        json.dump(data, f, indent=4)
+import streamlit as st
 
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+from startovate import discover, generator, limits, outbox, pitch, scoring, stt, tts
+from startovate.accounts import check_login, hash_password
+from startovate.assets import static_url
+from startovate.cache import directory
+from startovate.export import gallery_zip_file
+from startovate.metrics import Profile, metrics, span
+from startovate.pdf import pdf_cache, pitch_pdf
+from startovate.thumbnails import thumbnail_path
+
+# Accounts and saved ideas live in SQLite (see startovate/storage.py) and are
+# read through a process-wide cache shared by every session (startovate/cache.py).
+
+
+# --- STYLES ---
+# Stylesheets live in static/ and are served by Streamlit's static file
+# server, so a rerun only sends a short <link> tag instead of the whole CSS.
+
+def inject_stylesheet(name):
+    with span("page.css"):
+        st.markdown(f'<link rel="stylesheet" href="{static_url(name)}">', unsafe_allow_html=True)
 
-def load_saved_ideas(username):
-    try:
-        with open(SAVED_IDEAS_FILE, 'r') as f:
-            all_saved_ideas = json.load(f)
-            return all_saved_ideas.get(username, [])
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
 
-def save_saved_ideas(username, ideas):
+# --- LIMITS ---
+# Expensive actions go through per-user and global rate limits and bounded
+# pools (startovate/limits.py); refusals are shown as a warning.
+
+def current_user():
+    return st.session_state.get("user_login_username", "")
+
+
+# --- GENERATION ---
+# "Find best ideas" searches the precomputed score table (startovate/scoring.py);
+# each label is a selection the user can keep fixed.
+SEARCH_FIELDS = {
+    "Industry": 'industry', "Target Audience": 'audience', "Technology": 'tech', "Vision Goal": 'goal',
+    "Target Market": 'region', "Monetization": 'monetization', "Team Size": 'team',
+}
+
+
+def generate_and_select(n, industry, audience, tech, goal, monetization, region, team_size, seed=None):
+    """Generate ``n`` ideas, make the first one current and email it."""
     try:
-        with open(SAVED_IDEAS_FILE, 'r') as f:
-            all_saved_ideas = json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        all_saved_ideas = {}
-    
-    all_saved_ideas[username] = ideas
-    with open(SAVED_IDEAS_FILE, 'w') as f:
-        json.dump(all_saved_ideas, f, indent=4)
+        ideas = limits.run("generate", current_user(), generator.generate_ideas, n, industry, audience, tech, goal, monetization, region, team_size, seed=seed)
+    except (limits.Throttled, limits.Busy) as e:
+        st.warning(f"⏳ {e}")
+        return
+    st.session_state["generated_variants"] = ideas if len(ideas) > 1 else []
+    generated_idea_data = ideas[0]
+    st.session_state["last_generated_idea_data"] = generated_idea_data
+    st.session_state.pop("narration_idea", None)
+    st.session_state.pop("narration_pitch", None)
+    st.success("Idea generated!" if len(ideas) == 1 else f"{len(ideas)} ideas generated!")
+
+    if "user_email" in st.session_state and st.session_state["user_email"]:
+        st.session_state["email_outbox_id"] = outbox.send_idea_email(st.session_state["user_email"], generated_idea_data)
 
 
 # --- TTS and STT Functions ---
-@st.cache_resource # Cache the engine initialization
-def init_pyttsx3():
-    engine = pyttsx3.init()
-    voices = engine.getProperty('voices')
-    # Try to find an English female voice, otherwise use default
-    female_voice = next((v for v in voices if 'en' in v.id and 'female' in v.name.lower()), None)
-    if female_voice:
-        engine.setProperty('voice', female_voice.id)
+# Narration is synthesized to audio files in the background (startovate/tts.py)
+# and played in the user's browser, sentence by sentence until all of it is ready.
+
+def request_narration(job_key, text):
+    # Narration that is already cached costs nothing, so it skips the limits.
+    if not os.path.exists(tts.audio_path(text)):
+        try:
+            limits.admit("narrate", current_user(), pending=tts.service().stats()['narrations_running'])
+        except (limits.Throttled, limits.Busy) as e:
+            st.warning(f"⏳ {e}")
+            return
+    st.session_state[job_key] = tts.service().narrate(text)
+
+def show_narration(job_key):
+    """Play the narration stored in session state.
+
+    While it is being synthesized, its sentences play one after the other in
+    a single player as they become ready: each one is swapped in when the
+    previous one has had time to finish.  Once all of it has played, the
+    joined file is shown for replaying.
+    """
+    narration_id = st.session_state.get(job_key)
+    narration = tts.service().narration(narration_id) if narration_id else None
+    if narration is None:
+        return
+    if narration['status'] == 'failed':
+        st.error(f"Narration failed: {narration['error']}")
+        return
+    playback = st.session_state.get(f"{job_key}_playback")
+    if playback is None or playback['id'] != narration_id:
+        # Narration that is complete already (it was cached) has nothing to stream.
+        playback = {'id': narration_id, 'part': None if narration['status'] == 'done' else 0, 'started_at': None}
+        st.session_state[f"{job_key}_playback"] = playback
+    if playback['part'] is None:
+        st.audio(narration['path'], format="audio/wav")
+        return
+
+    @st.fragment(run_every=0.25)
+    def play_narration():
+        current = tts.service().narration(narration_id)
+        if current is None or current['status'] == 'failed':
+            st.rerun()
+        ready, part = current['ready'], playback['part']
+        if part < len(ready):
+            if playback['started_at'] is None:
+                playback['started_at'] = time.time()
+            elif time.time() - playback['started_at'] >= tts.duration(ready[part]):
+                part = playback['part'] = part + 1
+                playback['started_at'] = time.time() if part < len(ready) else None
+        if part >= len(current['chunks']):
+            if current['status'] == 'done':
+                playback['part'] = None
+                st.rerun()
+            st.info("🔊 Finishing narration...")
+        elif part < len(ready):
+            st.caption(f"🔊 Part {part + 1} of {len(current['chunks'])}")
+            st.audio(ready[part], format="audio/wav", autoplay=True)
+        else:
+            st.info(f"🔊 Preparing narration ({tts.service().stats()['queue_depth']} sentences waiting)...")
+    play_narration()
+
+def show_recognition(job_key):
+    """Show the speech recognition job stored in session state, polling until it finishes."""
+    job_id = st.session_state.get(job_key)
+    job = stt.recognizer().job(job_id) if job_id else None
+    if job is None:
+        return
+    if job['status'] == 'running':
+        @st.fragment(run_every=1)
+        def wait_for_recognition():
+            if stt.recognizer().job(job_id)['status'] != 'running':
+                st.rerun()
+            st.info("🎧 Transcribing your suggestion...")
+        wait_for_recognition()
+        return
+    stt.recognizer().forget(job_id)
+    del st.session_state[job_key]
+    if job['error']:
+        st.error(job['error'])
     else:
-        st.warning("Could not find a suitable female voice. Using default.")
-    engine.setProperty('rate', 170) # Adjust speaking rate
-    return engine
-
-def clean_text_for_tts(text):
-    # Remove markdown for better narration
-    cleaned_text = re.sub(r'[*_`]', '', text) 
-    return cleaned_text
-
-def speak(text):
-    engine = init_pyttsx3()
-    clean_text = clean_text_for_tts(text)
-    engine.say(clean_text)
-    engine.runAndWait()
-
-def recognize_speech():
-    r = sr.Recognizer()
-    with sr.Microphone() as source:
-        st.info("Say something!")
-        r.adjust_for_ambient_noise(source) # Adjust for ambient noise
-        audio = r.listen(source)
-    try:
-        text = r.recognize_google(audio)
-        st.success(f"You said: {text}")
-        return text
-    except sr.UnknownValueError:
-        st.error("Could not understand audio. Please try again.")
-        return ""
-    except sr.RequestError as e:
-        st.error(f"Could not request results from Google Speech Recognition service; {e}")
-        return ""
-
-# ---------- FUNCTION TO EMAIL IDEA ----------
-def send_idea_email(to_email, idea_data):
-    try:
-        msg = EmailMessage()
-        msg['Subject'] = f"Your Startup Idea: {idea_data['name']}"
-        msg['From'] = 'saniyakhandelwal10446@gmail.com' # Use your actual verified sender email
-        msg['To'] = to_email
-
-        content = f"""
-        🚀 Startup Name: {idea_data['name']}
-        📌 Tagline: {idea_data['tagline']}
-        🧠 Idea: A {idea_data['tech']} for {idea_data['audience']} in {idea_data['industry']} to {idea_data['idea']}
-        🎯 Goal: {idea_data['goal']}
-        💸 Monetization: {' | '.join(idea_data['monetization'])}
-        🌍 Region: {idea_data['region']}
-        👥 Team Size: {idea_data['team']}
-        📊 Feasibility Score: {idea_data['score']} / 100
-
-        Thank you for using Startovate!
-        """
-
-        msg.set_content(content)
-        with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
-            smtp.login('saniyakhandelwal10446@gmail.com', 'vtob imzt pojv fmmg') # Use your App Password here
-            smtp.send_message(msg)
-        st.success(f"📩 Email sent to {to_email}!")
-    except Exception as e:
-        st.error(f"Email failed: {e}. Please ensure your email and app password are correct, and less secure app access is enabled if applicable.")
+        st.session_state["recorded_feedback"] = job['text']
+        st.success(f"You said: {job['text']}")
+
+# ---------- EMAIL ----------
+def show_email_status():
+    message_id = st.session_state.get("email_outbox_id")
+    if message_id is None:
+        return
+    delivery = outbox.status(message_id)
+    if delivery is None:
+        return
+    to_email = st.session_state.get("user_email")
+    if delivery['status'] == 'sent':
+        st.caption(f"📩 Email sent to {to_email}.")
+    elif delivery['status'] == 'failed':
+        st.caption(f"⚠️ Email to {to_email} failed after {delivery['attempts']} attempts: {delivery['last_error']}")
+    elif delivery['attempts']:
+        st.caption(f"⏳ Email to {to_email} is being retried ({delivery['attempts']} failed attempts so far).")
+    else:
+        st.caption(f"⏳ Email to {to_email} is queued for delivery.")
+
+
+# ---------- GALLERY ----------
+GALLERY_PAGE_SIZES = [10, 25, 50, 100]
+
+
+def prepared_download(key, prepare_label, label, action, build, *args, wait=0.0, version=None, file_name, mime):
+    """A "prepare" button that builds a file within the ``action`` limits, then its download button.
+
+    ``build`` returns the file's bytes or the path of a file it wrote.  Either
+    is kept in ``st.session_state["prepared_downloads"]`` and handed to
+    ``st.download_button`` as data, so the download stays tied to this
+    session.  A deferred (callable) download is deleted once any two script
+    runs in the process finish, which under load happens before the browser
+    fetches it.  ``version`` changes when the content does, so a stale file is
+    built again.
+    """
+    prepared_downloads = st.session_state.setdefault("prepared_downloads", {})
+    prepared = prepared_downloads.get(key)
+    if prepared is not None and isinstance(prepared[1], str) and not os.path.exists(prepared[1]):
+        prepared = None  # the file was cleaned up; build it again
+    if prepared is None or prepared[0] != version:
+        if not st.button(prepare_label, key=f"{key}_prepare"):
+            return
+        try:
+            data = limits.run(action, current_user(), build, *args, wait=wait)
+        except (limits.Throttled, limits.Busy) as e:
+            st.warning(f"⏳ {e}")
+            return
+        forget_prepared_download(key)
+        prepared_downloads[key] = (version, data)
+        st.rerun()
+    if isinstance(prepared[1], str):
+        with open(prepared[1], 'rb') as f:
+            st.download_button(label=label, data=f, file_name=file_name, mime=mime, key=key)
+    else:
+        st.download_button(label=label, data=prepared[1], file_name=file_name, mime=mime, key=key)
+
+
+def forget_prepared_download(key=None):
+    """Drop a prepared download (all of them without ``key``), removing the files written for it."""
+    prepared_downloads = st.session_state.get("prepared_downloads", {})
+    for name in [key] if key else list(prepared_downloads):
+        _, data = prepared_downloads.pop(name, (None, None))
+        if isinstance(data, str):
+            try:
+                os.remove(data)
+            except FileNotFoundError:
+                pass
+
+
+def render_gallery_idea(idea):
+    """One compact gallery row; the full card is only built when expanded.
+
+    Widget keys use the idea's stable id, so they stay the same when the user
+    changes page or page size, or when other ideas are deleted.
+    """
+    col_summary, col_toggle = st.columns([5, 1])
+    with col_summary:
+        st.markdown(f"📌 **{idea['name']}** ({idea['tagline']}) · {idea['industry']} · {idea['score']} / 100")
+    with col_toggle:
+        show_details = st.toggle("Details", key=f"gallery_details_{idea['id']}")
+    if not show_details:
+        return
+
+    with st.container(border=True):
+        # Drawn locally once and cached on disk (startovate/thumbnails.py).
+        st.image(thumbnail_path(idea['name'], idea['industry']), caption=f"Visual for {idea['name']}", width='stretch',
+                 output_format='PNG')
+        # Name and tagline are already in the row summary.
+        for label, _, value in pitch.render(idea).facts[2:]:
+            st.write(f"**{label}:** {value}")
+
+        new_tagline = st.text_input(f"📝 Edit Tagline for {idea['name']}", value=idea['tagline'], key=f"gallery_tag_{idea['id']}")
+        if st.button(f"💡 Update Tagline for {idea['name']}", key=f"gallery_edit_{idea['id']}"):
+            pdf_cache.invalidate(idea)
+            directory.update_idea(st.session_state["user_login_username"], idea.replace(tagline=new_tagline))
+            st.success("Tagline updated!")
+            st.rerun()
+        if st.button(f"🗑️ Delete {idea['name']}", key=f"gallery_delete_{idea['id']}"):
+            pdf_cache.invalidate(idea)
+            forget_prepared_download(f"download_pdf_{idea['id']}")
+            directory.delete_idea(st.session_state["user_login_username"], idea['id'])
+            st.rerun()
+
+        # Rendered (or served from cache) only on click, within the PDF limits.
+        prepared_download(
+            f"download_pdf_{idea['id']}", "📄 Prepare Pitch PDF", "📥 Download Pitch as PDF", "pdf", pitch_pdf, idea,
+            wait=10.0, version=idea.content_key(),
+            file_name=f"{idea['name']}_pitch.pdf",
+            mime="application/pdf",
+        )
 
 
 # --- AUTHENTICATION PAGE ---
 def authentication_page():
     """Displays the login/signup page and handles all authentication logic."""
-    st.markdown("""
-    <style>
-    /* Gradient background for the authentication page */
-    [data-testid="stAppViewContainer"] > .main {
-        background: linear-gradient(to right, #00C9FF, #92FE9D); /* Blue to Green gradient */
-        min-height: 100vh; /* Ensure it covers the full viewport height */
-        display: flex;
-        justify-content: center; /* Center horizontally */
-        align-items: center; /* Center vertically */
-        padding: 20px;
-        background-size: cover; /* Ensure gradient covers the area */
-        background-position: center;
-        background-repeat: no-repeat;
-        background-attachment: fixed;
-    }
-    
-    /* Styles for the login/signup form box */
-    /* Target the main block containing tabs, ensuring it's the one that holds the form */
-    div[data-testid="stVerticalBlock"] > div.css-1r6dn7c.e1fqkh3o5,
-    div[data-testid="stVerticalBlock"] > div[data-testid="stVerticalBlock"] { /* More robust target for the form container */
-        background-color: rgba(255, 255, 255, 0.9); /* White box for form with slight transparency */
-        padding: 40px;
-        border-radius: 10px;
-        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.2);
-        max-width: 500px;
-        width: 100%;
-        margin-top: 0 !important; /* Reset margin from Streamlit defaults */
-        margin-bottom: 0 !important; /* Reset margin from Streamlit defaults */
-    }
-
-    /* Black font for all text/labels within the form */
-    div[data-testid="stVerticalBlock"] label,
-    div[data-testid="stVerticalBlock"] h1,
-    div[data-testid="stVerticalBlock"] h3,
-    div[data-testid="stVerticalBlock"] h4,
-    div[data-testid="stVerticalBlock"] p,
-    div[data-testid="stVerticalBlock"] .stTab {
-        color: black !important;
-    }
-    
-    /* White background for input fields, black text */
-    .stTextInput>div>div>input {
-        background-color: white !important;
-        color: black !important;
-        border: 1px solid #ccc;
-        border-radius: 5px;
-        padding: 10px;
-    }
-
-    /* Style for buttons within the authentication page forms */
-    div[data-testid="stVerticalBlock"] .stButton>button {
-        background-color: #6C5CE7; /* A nice purple for auth buttons */
-        color: white;
-        border: none;
-        padding: 10px 20px;
-        border-radius: 5px;
-        font-size: 16px;
-        cursor: pointer;
-        transition: background-color 0.3s ease, transform 0.2s ease;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-    }
-    div[data-testid="stVerticalBlock"] .stButton>button:hover {
-        background-color: #8A2BE2; /* Darker purple on hover */
-        transform: translateY(-2px);
-    }
-
-    /* Center text for titles within the auth form */
-    div[data-testid="stVerticalBlock"] h1, div[data-testid="stVerticalBlock"] h3 {
-        text-align: center;
-    }
-
-    /* Adjust padding for tabs content */
-    .stTabs [data-testid="stTabContent"] {
-        padding: 1rem 0;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    inject_stylesheet("auth.css")
 
     col_left, col_center, col_right = st.columns([1, 2, 1])
 
-    with col_center:
+    with span("page.auth"), col_center:
         st.markdown("<h1 style='text-align: center;'>🚀 Startovate</h1>", unsafe_allow_html=True)
         st.markdown("<h3 style='text-align: center;'>Your AI-Powered Startup Companion</h3>", unsafe_allow_html=True)
         st.write("")
 
-        users = load_user_data()
+        users = directory.users()
         
         login_tab, signup_tab = st.tabs(["🔐 Login", "📝 Sign Up"])
 
@@ -231,8 +286,7 @@ def authentication_page():
                 submitted = st.form_submit_button("Login", use_container_width=True)
 
                 if submitted:
-                    hashed_password = hash_password(password_input)
-                    if username_input in users and users[username_input]['password'] == hashed_password:
+                    if check_login(users.get(username_input), password_input):
                         st.session_state["logged_in"] = True
                         st.session_state["username"] = users[username_input]['name'] 
                         st.session_state["user_email"] = users[username_input]['email']
@@ -256,373 +310,342 @@ def authentication_page():
                         st.warning("Please fill out all fields.")
                     elif new_username in users:
                         st.error(f"Username '{new_username}' is already taken. Please choose another.")
+                    elif not directory.add_user(new_username, new_name, new_email, hash_password(new_password)):
+                        st.error(f"Username '{new_username}' is already taken. Please choose another.")
                     else:
-                        users[new_username] = {
-                            'name': new_name,
-                            'email': new_email, 
-                            'password': hash_password(new_password)
-                        }
-                        save_user_data(users)
                         st.success(f"✅ Account created for {new_name}! Please go to the Login tab to log in.")
     
 
+# ---------- DIAGNOSTICS ----------
+# Timing spans are always recorded (startovate/metrics.py).  The panel that
+# exports them and profiles a session's reruns is only shown when
+# STARTOVATE_DIAGNOSTICS=1.
+SHOW_DIAGNOSTICS = os.environ.get("STARTOVATE_DIAGNOSTICS") == "1"
+
+
+def diagnostics_panel():
+    with st.sidebar.expander("⏱️ Diagnostics"):
+        st.toggle("Profile my reruns", key="profile_reruns")
+        if st.session_state.get("profile_reruns") and st.session_state.get("profile_report"):
+            st.caption("Previous rerun:")
+            st.code(st.session_state["profile_report"], language=None)
+        st.caption("Action limits")
+        st.json(limits.stats(), expanded=False)
+        st.caption("User directory cache")
+        st.json(directory.stats(), expanded=False)
+        st.download_button("Metrics (Prometheus)", data=metrics.prometheus_text,
+                           file_name="startovate_metrics.prom", mime="text/plain", key="metrics_prometheus")
+        st.download_button("Metrics (JSON lines)", data=metrics.jsonl,
+                           file_name="startovate_metrics.jsonl", mime="application/jsonl", key="metrics_jsonl")
+
+
 # --- MAIN APPLICATION ---
 def main_app():
     """The main application logic after a user has logged in."""
     
     # ---------- BACKGROUND GRADIENT + BLUR + SLIDE-IN ANIMATION FOR MAIN APP ----------
-    st.markdown(f"""
-    <style>
-    @keyframes slideFadeIn {{
-        0% {{ transform: translateY(20px); opacity: 0; }}
-        100% {{ transform: translateY(0); opacity: 1; }}
-    }}
-    [data-testid="stAppViewContainer"] > .main {{
-        background: linear-gradient(to right, #00C9FF, #92FE9D); /* Blue to Green gradient */
-        background-size: cover;
-        background-position: center;
-        background-repeat: no-repeat;
-        background-attachment: fixed;
-        animation: slideFadeIn 1s ease-out;
-        /* Apply blur to the gradient background */
-        backdrop-filter: blur(10px); /* Increased blur level */
-        -webkit-backdrop-filter: blur(10px); /* For Safari support */
-        /* background-color: rgba(0, 0, 0, 0.3); Removed or set to transparent if you only want gradient */
-    }}
-
-    /* You might also want to adjust the main content area itself to be semi-transparent */
-    /* to show the blur effect behind it, rather than just the background image itself */
-    /* For instance, if you want the content blocks to be slightly translucent: */
-    /*
-    div.st-emotion-cache-1pxmztm.ea3g5fb0 {{ /* This targets the main content block, may vary */
-        background-color: rgba(255, 255, 255, 0.1); /* Slightly transparent white */
-        border-radius: 10px;
-        padding: 20px;
-    }}
-    */
-
-    [data-testid="stSidebar"] > div:first-child {{
-        background-color: rgba(0,0,0,0.6);
-        animation: slideFadeIn 1.5s ease-out;
-    }}
-    /* Specific styling for the Main App's buttons as per your request */
-    /* Generate Ideas Button - Green */
-    .stButton button:has(div[data-testid="stMarkdownContainer"] > p:contains("Generate Startup Idea")) {{
-        background-color: #4CAF50 !important; /* Green */
-        color: white !important;
-        border: none;
-        padding: 10px 20px;
-        border-radius: 5px;
-        font-size: 16px;
-        cursor: pointer;
-        transition: background-color 0.3s ease, transform 0.2s ease;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-    }}
-    .stButton button:has(div[data-testid="stMarkdownContainer"] > p:contains("Generate Startup Idea")):hover {{
-        background-color: #45a049 !important; /* Darker green on hover */
-        transform: translateY(-2px);
-    }}
-
-    /* Voice and Pitch Deck Buttons - Blue */
-    .stButton button:has(div[data-testid="stMarkdownContainer"] > p:contains("Narrate Idea")),
-    .stButton button:has(div[data-testid="stMarkdownContainer"] > p:contains("Record Suggestions")),
-    .stButton button:has(div[data-testid="stMarkdownContainer"] > p:contains("Narrate This Pitch Deck")) {{
-        background-color: #008CBA !important; /* Blue */
-        color: white !important;
-        border: none;
-        padding: 10px 20px;
-        border-radius: 5px;
-        font-size: 16px;
-        cursor: pointer;
-        transition: background-color 0.3s ease, transform 0.2s ease;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-    }}
-    .stButton button:has(div[data-testid="stMarkdownContainer"] > p:contains("Narrate Idea")):hover,
-    .stButton button:has(div[data-testid="stMarkdownContainer"] > p:contains("Record Suggestions")):hover,
-    .stButton button:has(div[data-testid="stMarkdownContainer"] > p:contains("Narrate This Pitch Deck")):hover {{
-        background-color: #005f7d !important; /* Darker blue on hover */
-        transform: translateY(-2px);
-    }}
-
-    /* General button styling for other buttons (e.g., Save, Update, Download) if needed */
-    .stButton button:not(:has(div[data-testid="stMarkdownContainer"] > p:contains("Generate Startup Idea"))):not(:has(div[data-testid="stMarkdownContainer"] > p:contains("Narrate Idea"))):not(:has(div[data-testid="stMarkdownContainer"] > p:contains("Record Suggestions"))):not(:has(div[data-testid="stMarkdownContainer"] > p:contains("Narrate This Pitch Deck"))) {{
-        background-color: #6C5CE7; /* Default purple for others like Home, Logout, Save, Update, Download */
-        color: white;
-        border: none;
-        padding: 10px 20px;
-        border-radius: 5px;
-        font-size: 16px;
-        cursor: pointer;
-        transition: background-color 0.3s ease, transform 0.2s ease;
-        box-shadow: 0 2px 4px rgba(0,0,0,0.2);
-    }}
-    .stButton button:not(:has(div[data-testid="stMarkdownContainer"] > p:contains("Generate Startup Idea"))):not(:has(div[data-testid="stMarkdownContainer"] > p:contains("Narrate Idea"))):not(:has(div[data-testid="stMarkdownContainer"] > p:contains("Record Suggestions"))):not(:has(div[data-testid="stMarkdownContainer"] > p:contains("Narrate This Pitch Deck"))):hover {{
-        background-color: #8A2BE2; /* Darker purple on hover */
-        transform: translateY(-2px);
-    }}
-
-    </style>
-    """, unsafe_allow_html=True)
+    inject_stylesheet("main.css")
 
     # --- SIDEBAR ---
-    with st.sidebar:
-        st.title(f"👋 Welcome, {st.session_state.get('username', 'Guest')}")
-        if "user_email" in st.session_state:
-            st.write(f"📧 **Email:** {st.session_state['user_email']}")
-        st.markdown("---")
+    with span("page.sidebar"):
+        with st.sidebar:
+            st.title(f"👋 Welcome, {st.session_state.get('username', 'Guest')}")
+            if "user_email" in st.session_state:
+                st.write(f"📧 **Email:** {st.session_state['user_email']}")
+            st.markdown("---")
         
-        if st.button("🏠 Home Page", key="sidebar_home_button"): # Added unique key
-            st.session_state["current_page"] = "Startup Generator"
-            st.rerun()
+            if st.button("🏠 Home Page", key="sidebar_home_button"): # Added unique key
+                st.session_state["current_page"] = "Startup Generator"
+                st.rerun()
 
-        nav = st.radio("🧭 Navigation", ["Startup Generator", "Idea Pitch Deck", "Startup Gallery"], 
-                       index=["Startup Generator", "Idea Pitch Deck", "Startup Gallery"].index(st.session_state.get("current_page", "Startup Generator")),
-                       key="main_navigation_radio") # Added unique key
-        st.markdown("---")
-        if st.button("Logout", key="sidebar_logout_button"): # Added unique key
-            st.session_state["logged_in"] = False
-            del st.session_state["username"]
-            del st.session_state["user_email"]
-            del st.session_state["user_login_username"]
-            if "last_generated_idea_data" in st.session_state:
-                del st.session_state["last_generated_idea_data"]
-            if "recorded_feedback" in st.session_state:
-                del st.session_state["recorded_feedback"]
-            st.rerun()
+            nav = st.radio("🧭 Navigation", ["Startup Generator", "Idea Pitch Deck", "Startup Gallery", "Discover"], 
+                           index=["Startup Generator", "Idea Pitch Deck", "Startup Gallery", "Discover"].index(st.session_state.get("current_page", "Startup Generator")),
+                           key="main_navigation_radio") # Added unique key
+            st.markdown("---")
+            if st.button("Logout", key="sidebar_logout_button"): # Added unique key
+                st.session_state["logged_in"] = False
+                del st.session_state["username"]
+                del st.session_state["user_email"]
+                del st.session_state["user_login_username"]
+                if "last_generated_idea_data" in st.session_state:
+                    del st.session_state["last_generated_idea_data"]
+                if "recorded_feedback" in st.session_state:
+                    del st.session_state["recorded_feedback"]
+                if "email_outbox_id" in st.session_state:
+                    del st.session_state["email_outbox_id"]
+                if "generated_variants" in st.session_state:
+                    del st.session_state["generated_variants"]
+                forget_prepared_download()
+                st.session_state.pop("narration_idea", None)
+                st.session_state.pop("narration_pitch", None)
+                st.session_state.pop("recognition_job", None)
+                st.session_state.pop("search_results", None)
+                st.rerun()
 
     # The rest of your app logic
     if nav == "Startup Generator":
-        st.session_state["current_page"] = "Startup Generator"
-        st.title("✨ Intelligent Startup Idea Generator")
-        st.write("Unleash your entrepreneurial spirit! Let our AI generate innovative startup ideas for you.")
-
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            industry = st.selectbox("Industry", ["Healthcare", "Education", "Finance", "Entertainment", "AI/ML", "GreenTech", "Travel"], key="gen_industry")
-        with col2:
-            audience = st.selectbox("Target Audience", ["Students", "Professionals", "Seniors", "Startups", "Businesses", "Individuals"], key="gen_audience")
-        with col3:
-            tech = st.selectbox("Technology", ["AI Tool", "Mobile App", "Web App", "IoT", "Blockchain", "SaaS Platform", "VR/AR"], key="gen_tech")
-
-        goal = st.selectbox("Vision Goal", ["Disrupt the market", "Solve social issues", "Go viral", "Generate revenue", "Improve efficiency", "Enhance user experience"], key="gen_goal")
-        monetization = st.multiselect("Monetization", ["Subscription", "Ads", "Freemium", "Commission", "Direct Sales", "Licensing"], default=["Subscription"], key="gen_monetization")
-        region = st.selectbox("Target Market", ["India", "Global", "US", "Europe", "Asia", "Africa"], key="gen_region")
-        team_size = st.slider("Team Size", 1, 50, 5, key="gen_team_size")
-
-        generate_button_clicked = st.button("🚀 Generate Startup Idea", key="generate_idea_button")
-
-        if generate_button_clicked:
-            with st.spinner("🚧 Generating brilliant idea..."):
-                time.sleep(2)
-
-                names = ["Nexa", "Zeno", "Looma", "Orbit", "Glowr", "Synapse", "Apex", "Nova", "Vortex"]
-                suffixes = ["ly", "X", "ify", "Hub", "Flow", "Go", "AI"]
-                startup_name = random.choice(names) + random.choice(suffixes)
-                tagline_options = [
-                    "Revolutionizing the future.", "Power through simplicity.",
-                    "Smart ideas, real impact.", "Innovation meets action.",
-                    "Your ultimate solution.", "Simplifying complex problems."
-                ]
-                startup_tagline = random.choice(tagline_options)
-                idea_map = {
-                    "Healthcare": "analyze health metrics and provide instant AI feedback for personalized wellness plans.",
-                    "Education": "deliver smart, adaptive lessons and track learning patterns for optimized student growth.",
-                    "Finance": "automate savings, budgets, and investments with intelligent predictive analytics.",
-                    "Entertainment": "create customized immersive experiences through interactive storytelling and AI-driven content.",
-                    "AI/ML": "build intelligent solutions for automating daily tasks and enhancing productivity across industries.",
-                    "GreenTech": "suggest eco-friendly habits and monitor environmental impact using real-time data.",
-                    "Travel": "plan smart, personalized trips that adjust on-the-go based on preferences and real-time conditions."
-                }
-                score = random.randint(70, 95)
-
-                generated_idea_data = {
-                    "name": startup_name,
-                    "tagline": startup_tagline,
-                    "industry": industry,
-                    "audience": audience,
-                    "tech": tech,
-                    "goal": goal,
-                    "monetization": monetization,
-                    "region": region,
-                    "team": team_size,
-                    "score": score,
-                    "idea": idea_map.get(industry, "solve a pressing problem in the chosen domain.")
-                }
-                st.session_state["last_generated_idea_data"] = generated_idea_data
-                st.success("Idea generated!")
-
-                if "user_email" in st.session_state and st.session_state["user_email"]:
-                    send_idea_email(st.session_state["user_email"], generated_idea_data)
-
-        if "last_generated_idea_data" in st.session_state and st.session_state["last_generated_idea_data"]:
-            d = st.session_state["last_generated_idea_data"]
-            st.markdown("---")
-            st.subheader("Your Generated Startup Idea:")
-            st.header(f"🚀 {d['name']}")
-            st.caption(d['tagline'])
-            st.markdown(f"**Core Idea:** A {d['tech']} for {d['audience']} in the {d['industry']} industry to {d['idea']}")
-            st.markdown(f"**Vision:** {d['goal']} | **Market:** {d['region']} | **Team Size:** {d['team']}")
-            st.markdown(f"**Monetization:** {' | '.join(d['monetization'])}")
-            st.markdown(f"**Feasibility Score:** {d['score']} / 100")
+        with span("page.generator"):
+            st.session_state["current_page"] = "Startup Generator"
+            st.title("✨ Intelligent Startup Idea Generator")
+            st.write("Unleash your entrepreneurial spirit! Let our AI generate innovative startup ideas for you.")
+
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                industry = st.selectbox("Industry", generator.INDUSTRIES, key="gen_industry")
+            with col2:
+                audience = st.selectbox("Target Audience", generator.AUDIENCES, key="gen_audience")
+            with col3:
+                tech = st.selectbox("Technology", generator.TECHNOLOGIES, key="gen_tech")
+
+            goal = st.selectbox("Vision Goal", generator.GOALS, key="gen_goal")
+            monetization = st.multiselect("Monetization", generator.MONETIZATION_OPTIONS, default=["Subscription"], key="gen_monetization")
+            region = st.selectbox("Target Market", generator.REGIONS, key="gen_region")
+            team_size = st.slider("Team Size", 1, 50, 5, key="gen_team_size")
+
+            col_variants, col_seed = st.columns(2)
+            with col_variants:
+                variants = st.number_input("Variants to generate", min_value=1, max_value=6, value=1, key="gen_variants")
+            with col_seed:
+                seed_text = st.text_input("Seed (optional, for reproducible ideas)", key="gen_seed")
+
+            generate_button_clicked = st.button("🚀 Generate Startup Idea", key="generate_idea_button")
+
+            if generate_button_clicked:
+                seed = seed_text.strip() or None
+                generate_and_select(int(variants), industry, audience, tech, goal, monetization, region, team_size, seed=seed)
+
+            with st.expander("🔎 Find best ideas"):
+                st.caption("Search every combination for the highest feasibility scores. The selections you keep fixed are taken from above.")
+                col_fixed, col_k = st.columns([3, 1])
+                with col_fixed:
+                    fixed = st.multiselect("Keep fixed", list(SEARCH_FIELDS), default=["Industry"], key="search_fixed")
+                with col_k:
+                    top_k = st.number_input("Results", min_value=1, max_value=20, value=5, key="search_k")
+                if st.button("🔎 Find best ideas", key="search_button"):
+                    selections = {'industry': industry, 'audience': audience, 'tech': tech, 'goal': goal,
+                                  'region': region, 'monetization': monetization, 'team': team_size}
+                    constraints = {SEARCH_FIELDS[label]: selections[SEARCH_FIELDS[label]] for label in fixed}
+                    for key in ('industry', 'audience', 'tech', 'goal', 'region'):
+                        if key in constraints:
+                            constraints[key] = [constraints[key]]
+                    if 'team' in constraints:
+                        constraints['team'] = (team_size, team_size)
+                    st.session_state["search_results"] = scoring.best_ideas(int(top_k), **constraints)
+                for i, combo in enumerate(st.session_state.get("search_results", [])):
+                    col_combo, col_use = st.columns([5, 1])
+                    with col_combo:
+                        st.markdown(f"**{combo['score']} / 100** · {combo['industry']} · {combo['audience']} · {combo['tech']} · "
+                                    f"{combo['goal']} · {combo['region']} · {', '.join(combo['monetization'])} · team of {combo['team']}")
+                    with col_use:
+                        if st.button("Generate", key=f"search_use_{i}"):
+                            generate_and_select(1, combo['industry'], combo['audience'], combo['tech'], combo['goal'],
+                                                combo['monetization'], combo['region'], combo['team'])
+
+            if st.session_state.get("generated_variants"):
+                st.markdown("---")
+                st.subheader("Compare Variants")
+                variant_cols = st.columns(len(st.session_state["generated_variants"]))
+                for i, (col, variant) in enumerate(zip(variant_cols, st.session_state["generated_variants"])):
+                    with col:
+                        st.markdown(f"#### 🚀 {variant['name']}")
+                        st.caption(variant['tagline'])
+                        st.markdown(f"**Feasibility:** {variant['score']} / 100")
+                        if variant == st.session_state["last_generated_idea_data"]:
+                            st.markdown("✅ *Selected*")
+                        elif st.button("Use this idea", key=f"use_variant_{i}"):
+                            st.session_state["last_generated_idea_data"] = variant
+                            st.session_state.pop("narration_idea", None)
+                            st.session_state.pop("narration_pitch", None)
+                            st.rerun()
 
-            st.markdown("---")
-            st.subheader("🗣️ Voice Features")
-            col_tts, col_stt = st.columns(2)
-            with col_tts:
-                if st.button("📢 Narrate Idea (Text-to-Speech)", key="narrate_idea_button"): # Ensure unique key
-                    with st.spinner("Narrating..."):
-                        full_idea_text = f"Startup name is {d['name']}. Tagline: {d['tagline']}. Core idea: A {d['tech']} for {d['audience']} in the {d['industry']} industry to {d['idea']}. Vision: {d['goal']}. Target Market: {d['region']}. Expected team size: {d['team']} members. Feasibility score: {d['score']} out of 100."
-                        speak(full_idea_text)
-                    st.success("Narration complete!")
+            if "last_generated_idea_data" in st.session_state and st.session_state["last_generated_idea_data"]:
+                d = st.session_state["last_generated_idea_data"]
+                st.markdown("---")
+                st.subheader("Your Generated Startup Idea:")
+                st.header(f"🚀 {d['name']}")
+                st.caption(d['tagline'])
+                st.markdown(f"**Core Idea:** A {d['tech']} for {d['audience']} in the {d['industry']} industry to {d['idea']}")
+                st.markdown(f"**Vision:** {d['goal']} | **Market:** {d['region']} | **Team Size:** {d['team']}")
+                st.markdown(f"**Monetization:** {' | '.join(d['monetization'])}")
+                st.markdown(f"**Feasibility Score:** {d['score']} / 100")
+                show_email_status()
+
+                st.markdown("---")
+                st.subheader("🗣️ Voice Features")
+                col_tts, col_stt = st.columns(2)
+                with col_tts:
+                    if st.button("📢 Narrate Idea (Text-to-Speech)", key="narrate_idea_button"): # Ensure unique key
+                        request_narration("narration_idea", pitch.idea_narration(d))
+                    show_narration("narration_idea")
             
-            with col_stt:
-                if st.button("🎤 Record Suggestions", key="record_suggestions_button"): # Ensure unique key
-                    st.session_state["recorded_feedback"] = recognize_speech()
-                    if st.session_state["recorded_feedback"]:
-                        st.write(f"Thank you for your suggestion: {st.session_state['recorded_feedback']}")
-                        # The suggestion is already processed/displayed by recognize_speech,
-                        # so no further action needed here unless you want to update the idea.
-                        # For now, simply displaying it is sufficient.
-            
-            if "recorded_feedback" in st.session_state and st.session_state["recorded_feedback"]:
-                st.info(f"Last recorded suggestion: {st.session_state['recorded_feedback']}")
-                # If you want the suggestion to *persist* on rerun, you'd store it.
-                # If it's a one-time display, the current setup is fine.
-
-            st.markdown("---")
+                with col_stt:
+                    # Recorded in the user's browser; transcribed in the background.
+                    recording = st.audio_input("🎤 Record Suggestions", key="record_suggestions_audio")
+                    if recording is not None and recording.file_id != st.session_state.get("recording_file_id"):
+                        st.session_state["recording_file_id"] = recording.file_id
+                        try:
+                            limits.admit("record", current_user(), pending=stt.recognizer().pending())
+                        except (limits.Throttled, limits.Busy) as e:
+                            st.warning(f"⏳ {e}")
+                        else:
+                            st.session_state["recognition_job"] = stt.recognizer().submit(recording.getvalue())
+                    show_recognition("recognition_job")
+
+                if "recorded_feedback" in st.session_state and st.session_state["recorded_feedback"]:
+                    st.info(f"Last recorded suggestion: {st.session_state['recorded_feedback']}")
+                    # If you want the suggestion to *persist* on rerun, you'd store it.
+                    # If it's a one-time display, the current setup is fine.
+
+                st.markdown("---")
 
     elif nav == "Idea Pitch Deck":
-        st.session_state["current_page"] = "Idea Pitch Deck"
-        st.title("📊 Startup Pitch Deck Builder")
-        if "last_generated_idea_data" not in st.session_state:
-            st.warning("Please generate a startup idea first on the 'Startup Generator' page.")
-        else:
-            d = st.session_state["last_generated_idea_data"]
-            st.header(f"Pitch Deck for: {d['name']}")
-            st.caption(d['tagline'])
+        with span("page.pitch_deck"):
+            st.session_state["current_page"] = "Idea Pitch Deck"
+            st.title("📊 Startup Pitch Deck Builder")
+            if "last_generated_idea_data" not in st.session_state:
+                st.warning("Please generate a startup idea first on the 'Startup Generator' page.")
+            else:
+                d = st.session_state["last_generated_idea_data"]
+                st.header(f"Pitch Deck for: {d['name']}")
+                st.caption(d['tagline'])
 
-            st.subheader("1. Problem")
-            st.write(f"In the **{d['industry']}** sector, **{d['audience']}** often face challenges related to **{d['idea'].replace('solve a pressing problem in the chosen domain.', 'existing inefficiencies or lack of innovative solutions.')}**.")
-            
-            st.subheader("2. Solution")
-            st.write(f"Our solution is a **{d['tech']}** designed to **{d['idea']}**, providing a seamless and effective approach.")
-            
-            st.subheader("3. Market & Audience")
-            st.write(f"We are targeting the **{d['region']}** market, specifically focusing on **{d['audience']}** who are looking for **{d['goal']}**.")
-            
-            st.subheader("4. Business Model")
-            st.write(f"Our primary monetization strategies include **{', '.join(d['monetization'])}**, ensuring sustainable growth.")
-            
-            st.subheader("5. Team & Feasibility")
-            st.write(f"With a dedicated team of **{d['team']}** members, we are well-equipped to achieve our vision. Our idea has a strong feasibility score of **{d['score']} / 100**.")
-            st.markdown("---")
-            # Narration button for Pitch Deck
-            if st.button("📢 Narrate This Pitch Deck", key="narrate_pitch_deck_button"): # Ensure unique key
-                with st.spinner("Narrating pitch..."):
-                    pitch_text = f"Introducing {d['name']}, {d['tagline']}. Problem: In the {d['industry']} sector, {d['audience']} often face challenges related to {d['idea'].replace('solve a pressing problem in the chosen domain.', 'existing inefficiencies or lack of innovative solutions.')}. Solution: Our solution is a {d['tech']} designed to {d['idea']}. Market and Audience: We are targeting the {d['region']} market, specifically focusing on {d['audience']} who are looking for {d['goal']}. Business Model: Our primary monetization strategies include {', '.join(d['monetization'])}. Team and Feasibility: With a dedicated team of {d['team']} members, and a strong feasibility score of {d['score']} out of 100, we are poised for success."
-                    speak(pitch_text)
-                st.success("Pitch narration complete!")
+                for number, (title, body) in enumerate(pitch.render(d).sections, start=1):
+                    st.subheader(f"{number}. {title}")
+                    st.write(body)
+
+                st.markdown("---")
+                # Narration button for Pitch Deck
+                if st.button("📢 Narrate This Pitch Deck", key="narrate_pitch_deck_button"): # Ensure unique key
+                    request_narration("narration_pitch", pitch.pitch_narration(d))
+                show_narration("narration_pitch")
 
 
     elif nav == "Startup Gallery":
-        st.session_state["current_page"] = "Startup Gallery"
-        st.title("🖼️ Startup Gallery")
-
-        if "user_login_username" in st.session_state:
-            current_user_ideas = load_saved_ideas(st.session_state["user_login_username"])
-            if "last_generated_idea_data" in st.session_state:
-                # Check if the last generated idea is already in the saved list to avoid duplicates on refresh
-                # This needs a more robust check than just `in` for dictionaries. Let's compare keys.
-                is_idea_saved = any(
-                    all(item in saved_idea.items() for item in st.session_state["last_generated_idea_data"].items())
-                    for saved_idea in current_user_ideas
-                )
-
-                if not is_idea_saved:
-                    if st.button("💾 Save Current Idea to Gallery", key="save_idea_button_gallery"):
-                        current_user_ideas.append(st.session_state["last_generated_idea_data"])
-                        save_saved_ideas(st.session_state["user_login_username"], current_user_ideas)
-                        st.success("Idea saved to gallery!")
-                        st.rerun()
+        with span("page.gallery"):
+            st.session_state["current_page"] = "Startup Gallery"
+            st.title("🖼️ Startup Gallery")
+
+            if "user_login_username" in st.session_state:
+                current_user_ideas = directory.load_saved_ideas(st.session_state["user_login_username"])
+                if "last_generated_idea_data" in st.session_state:
+                    # O(1) lookup of the idea's content-derived id in the user's id index;
+                    # it keeps matching after the saved copy's tagline is edited.
+                    is_idea_saved = directory.is_saved(st.session_state["user_login_username"], st.session_state["last_generated_idea_data"])
+
+                    if not is_idea_saved:
+                        if st.button("💾 Save Current Idea to Gallery", key="save_idea_button_gallery"):
+                            directory.add_idea(st.session_state["user_login_username"], st.session_state["last_generated_idea_data"])
+                            st.success("Idea saved to gallery!")
+                            st.rerun()
+                    else:
+                        st.info("Current idea is already saved in your gallery.")
                 else:
-                    st.info("Current idea is already saved in your gallery.")
+                    st.info("Generate an idea first to save it to your gallery.")
+
+
+                if current_user_ideas:
+                    st.markdown("## 📚 Your Saved Ideas")
+                    prepared_download(
+                        "export_gallery_zip", f"📦 Prepare all {len(current_user_ideas)} pitch decks (ZIP)",
+                        f"📦 Download all {len(current_user_ideas)} pitch decks (ZIP)", "export",
+                        gallery_zip_file, current_user_ideas,
+                        version=tuple(idea.content_key() for idea in current_user_ideas),
+                        file_name=f"{st.session_state['user_login_username']}_pitch_decks.zip",
+                        mime="application/zip",
+                    )
+
+                    # Only the current page is rendered, so reruns cost the same for 10 or 5,000 ideas.
+                    col_size, col_page = st.columns(2)
+                    with col_size:
+                        page_size = st.selectbox("Ideas per page", GALLERY_PAGE_SIZES, index=0, key="gallery_page_size")
+                    page_count = (len(current_user_ideas) + page_size - 1) // page_size
+                    if st.session_state.get("gallery_page", 1) > page_count:
+                        st.session_state["gallery_page"] = page_count
+                    with col_page:
+                        page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, key="gallery_page")
+                    start = (page - 1) * page_size
+                    for idea in current_user_ideas[start:start + page_size]:
+                        render_gallery_idea(idea)
+                else:
+                    st.info("No ideas saved yet for this user. Generate one on the 'Startup Generator' page and save it!")
             else:
-                st.info("Generate an idea first to save it to your gallery.")
-
-
-            if current_user_ideas:
-                st.markdown("## 📚 Your Saved Ideas")
-                for idx, idea in enumerate(current_user_ideas):
-                    with st.expander(f"📌 {idea['name']} ({idea['tagline']})"):
-                        st.image("https://source.unsplash.com/random/400x200?startup," + idea['industry'], caption=f"Visual for {idea['name']}", use_column_width=True)
-                        st.write(f"**Industry:** {idea['industry']}")
-                        st.write(f"**Audience:** {idea['audience']}")
-                        st.write(f"**Technology:** {idea['tech']}")
-                        st.write(f"**Core Idea:** {idea['idea']}")
-                        st.write(f"**Vision Goal:** {idea['goal']}")
-                        st.write(f"**Target Market:** {idea['region']}")
-                        st.write(f"**Monetization:** {' | '.join(idea['monetization'])}")
-                        st.write(f"**Team Size:** {idea['team']}")
-                        st.write(f"**Feasibility Score:** {idea['score']} / 100")
-
-                        new_tagline = st.text_input(f"📝 Edit Tagline for {idea['name']}", value=idea['tagline'], key=f"gallery_tag_{idx}")
-                        if st.button(f"💡 Update Tagline for {idea['name']}", key=f"gallery_edit_{idx}"):
-                            current_user_ideas[idx]['tagline'] = new_tagline
-                            save_saved_ideas(st.session_state["user_login_username"], current_user_ideas)
-                            st.success("Tagline updated!")
-                            st.rerun()
-
-                        buffer = io.BytesIO()
-                        pdf = canvas.Canvas(buffer, pagesize=letter)
-                        y_pos = 750
-                        line_height = 18
-                        pdf.setFont("Helvetica-Bold", 14)
-                        pdf.drawString(50, y_pos, f"Pitch Deck - {idea['name']}")
-                        y_pos -= line_height * 2
-                        pdf.setFont("Helvetica", 10)
-                        pdf.drawString(50, y_pos, f"Tagline: {idea['tagline']}")
-                        y_pos -= line_height
-                        pdf.drawString(50, y_pos, f"Industry: {idea['industry']}")
-                        y_pos -= line_height
-                        pdf.drawString(50, y_pos, f"Audience: {idea['audience']}")
-                        y_pos -= line_height
-                        pdf.drawString(50, y_pos, f"Technology: {idea['tech']}")
-                        y_pos -= line_height
-                        pdf.drawString(50, y_pos, f"Core Idea: {idea['idea']}")
-                        y_pos -= line_height
-                        pdf.drawString(50, y_pos, f"Vision Goal: {idea['goal']}")
-                        y_pos -= line_height
-                        pdf.drawString(50, y_pos, f"Target Market: {idea['region']}")
-                        y_pos -= line_height
-                        pdf.drawString(50, y_pos, f"Monetization: {', '.join(idea['monetization'])}")
-                        y_pos -= line_height
-                        pdf.drawString(50, y_pos, f"Team Size: {idea['team']}")
-                        y_pos -= line_height
-                        pdf.drawString(50, y_pos, f"Feasibility Score: {idea['score']} / 100")
-                        pdf.save()
-                        buffer.seek(0)
-
-                        st.download_button(
-                            label="📥 Download Pitch as PDF",
-                            data=buffer,
-                            file_name=f"{idea['name']}_pitch.pdf",
-                            mime="application/pdf",
-                            key=f"download_pdf_{idx}"
-                        )
+                st.warning("Please log in to view and save ideas in the gallery.")
+
+    elif nav == "Discover":
+        with span("page.discover"):
+            st.session_state["current_page"] = "Discover"
+            st.title("🧭 Discover Startup Ideas")
+            st.write("Search the ideas saved by every Startovate user, best feasibility score first.")
+
+            query = st.text_input("Keywords", key="discover_query")
+            col1, col2 = st.columns(2)
+            with col1:
+                industries = st.multiselect("Industry", generator.INDUSTRIES, key="discover_industry")
+                regions = st.multiselect("Target Market", generator.REGIONS, key="discover_region")
+            with col2:
+                technologies = st.multiselect("Technology", generator.TECHNOLOGIES, key="discover_tech")
+                monetization = st.multiselect("Monetization", generator.MONETIZATION_OPTIONS, key="discover_monetization")
+            score_range = st.slider("Feasibility Score", 0, 100, (0, 100), key="discover_score")
+
+            col_size, col_page = st.columns(2)
+            with col_size:
+                page_size = st.selectbox("Ideas per page", GALLERY_PAGE_SIZES, index=0, key="discover_page_size")
+            with col_page:
+                page = st.number_input("Page", min_value=1, key="discover_page")
+            # Served from the search index, so a page costs milliseconds however many ideas are saved.
+            results = discover.search(query, industry=industries, tech=technologies, region=regions,
+                                      monetization=monetization, score=score_range, k=page_size, page=int(page))
+            for i, idea in enumerate(results.ideas):
+                col_idea, col_use = st.columns([5, 1])
+                with col_idea:
+                    st.markdown(f"📌 **{idea['name']}** ({idea['tagline']}) · {idea['industry']} · {idea['tech']} · "
+                                f"{idea['region']} · {idea['score']} / 100")
+                with col_use:
+                    if st.button("Use this idea", key=f"discover_use_{i}"):
+                        st.session_state["last_generated_idea_data"] = idea
+                        st.session_state.pop("narration_idea", None)
+                        st.session_state.pop("narration_pitch", None)
+                        st.success(f"'{idea['name']}' is now your current idea.")
+            if results.ideas:
+                st.caption(f"Page {results.page}" + (" · more on the next page" if results.has_more else " · last page"))
             else:
-                st.info("No ideas saved yet for this user. Generate one on the 'Startup Generator' page and save it!")
-        else:
-            st.warning("Please log in to view and save ideas in the gallery.")
+                st.info("No saved ideas match this search.")
 
 
 # --- SCRIPT ENTRY POINT ---
-if "logged_in" not in st.session_state:
-    st.session_state["logged_in"] = False
+def main():
+    st.set_page_config(
+        page_title="Startovate - AI Startup Generator",
+        page_icon="🚀",
+        layout="wide"
+    )
+
+    # Emails left queued by an earlier server run go out without waiting for a new one.
+    outbox.start()
+
+    if "logged_in" not in st.session_state:
+        st.session_state["logged_in"] = False
+
+    if "current_page" not in st.session_state:
+        st.session_state["current_page"] = "Startup Generator"
+
+    page_name = st.session_state["current_page"] if st.session_state["logged_in"] else "Login"
+    profile = Profile() if st.session_state.get("profile_reruns") else nullcontext()
+    try:
+        with metrics.rerun(page_name), profile:
+            if not st.session_state["logged_in"]:
+                authentication_page()
+            else:
+                main_app()
+    finally:
+        # st.rerun() leaves the page by raising, so keep the report either way.
+        if isinstance(profile, Profile):
+            st.session_state["profile_report"] = profile.report
+
+    if SHOW_DIAGNOSTICS:
+        diagnostics_panel()
 
-if "current_page" not in st.session_state:
-    st.session_state["current_page"] = "Startup Generator"
 
-if not st.session_state["logged_in"]:
-    authentication_page()
-else:
-    main_app()
\ No newline at end of file
+# Streamlit runs this file as __main__; importing it (e.g. from tools) has no side effects.
+if __name__ == "__main__":
+    main()
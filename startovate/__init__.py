@@ -0,0 +1 @@
+"""Core logic for Startovate, importable without Streamlit."""
@@ -0,0 +1,11 @@
+"""Password hashing and login checks."""
+import hashlib
+
+
+def hash_password(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def check_login(user, password):
+    """True if ``password`` matches the stored account ``user`` (None if it does not exist)."""
+    return user is not None and user['password'] == hash_password(password)
@@ -0,0 +1,21 @@
+"""Versioned URLs for the files Streamlit serves from ``static/``.
+
+The ``?v=`` query is a hash of the file's content, so browsers can cache a
+stylesheet indefinitely and still fetch the new one as soon as it changes.
+"""
+import functools
+import hashlib
+import os
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+
+@functools.lru_cache(maxsize=None)
+def _versioned_url(name, mtime_ns):
+    with open(os.path.join(STATIC_DIR, name), 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    return f"app/static/{name}?v={digest}"
+
+
+def static_url(name):
+    return _versioned_url(name, os.stat(os.path.join(STATIC_DIR, name)).st_mtime_ns)
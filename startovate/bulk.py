@@ -0,0 +1,221 @@
+"""Bulk idea generation and pitch PDF export, without the Streamlit UI.
+
+    python -m startovate.bulk out/ --per-combination 3 --workers 4
+    python -m startovate.bulk out/ --shard 0/4 --industry Healthcare --industry Travel --no-pdf
+
+Every combination of the selected industries, audiences, technologies,
+goals and regions gets ``--per-combination`` ideas from the generator.
+Ideas are written one JSON object per line to ``ideas.jsonl`` as they are
+generated, then each one's pitch deck PDF (the gallery export layout) is
+rendered into ``pdfs/`` by a pool of worker processes.
+
+Runs are deterministic: a combination's ideas depend only on ``--seed`` and
+the combination's selections, not on the filters, sharding or earlier runs.
+``--shard i/n`` takes every n-th combination starting at the i-th, so n
+machines can split the work.  An interrupted run resumes when started again with the same
+arguments: complete lines are kept (a half-written last line is dropped),
+generation continues after them and only missing PDFs are rendered.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from collections import deque
+
+from startovate import generator
+from startovate.export import pdf_file_name, render_pdfs
+from startovate.ideas import Idea, with_id
+
+IDEAS_FILE = "ideas.jsonl"
+PDF_DIR = "pdfs"
+RUN_FILE = "run.json"  # the arguments of the run, checked on resume
+PROGRESS_INTERVAL = 5.0  # seconds between progress lines
+
+
+def combinations(industries, audiences, technologies, goals, regions, shard=0, shards=1):
+    """``(index, (industry, audience, tech, goal, region))`` of every combination in this shard."""
+    combos = itertools.product(industries, audiences, technologies, goals, regions)
+    return itertools.islice(enumerate(combos), shard, None, shards)
+
+
+def generate(settings, skip=0):
+    """The run's ideas in output order, after the first ``skip``."""
+    n = settings['per_combination']
+    for _, (industry, audience, tech, goal, region) in combinations(
+        settings['industries'], settings['audiences'], settings['technologies'], settings['goals'],
+        settings['regions'], settings['shard'], settings['shards'],
+    ):
+        if skip >= n:
+            skip -= n
+            continue
+        seed = '/'.join([settings['seed'], industry, audience, tech, goal, region])
+        ideas = generator.generate_ideas(n, industry, audience, tech, goal, settings['monetization'], region,
+                                         settings['team'], seed=seed)
+        for idea in ideas[skip:]:
+            yield with_id(idea)
+        skip = 0
+
+
+def complete_lines(path):
+    """How many complete lines ``path`` has; a half-written last line is cut off."""
+    if not os.path.exists(path):
+        return 0
+    count = 0
+    end = 0
+    with open(path, 'rb+') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break
+            count += 1
+            end += len(line)
+        f.truncate(end)
+    return count
+
+
+class Progress:
+    """Counts done items and prints the rate every ``PROGRESS_INTERVAL`` seconds."""
+
+    def __init__(self, label, out=sys.stderr):
+        self.label = label
+        self.out = out
+        self.count = 0
+        self.start = self._last = time.perf_counter()
+
+    def add(self, n=1):
+        self.count += n
+        now = time.perf_counter()
+        if now - self._last >= PROGRESS_INTERVAL:
+            self._last = now
+            print(f"{self.label}: {self.count} ({self.rate():.0f}/s)", file=self.out, flush=True)
+
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def rate(self):
+        return self.count / max(self.elapsed(), 1e-9)
+
+
+def write_ideas(path, settings, skip):
+    """Append the run's ideas after the first ``skip`` to ``path``."""
+    progress = Progress("ideas")
+    with open(path, 'a', encoding='utf-8') as f:
+        for idea in generate(settings, skip):
+            f.write(idea.to_json() + '\n')
+            progress.add()
+    return progress
+
+
+def missing_pdfs(ideas_path, pdf_dir):
+    """``(position, idea)`` of every written idea whose PDF is not there yet."""
+    with open(ideas_path, encoding='utf-8') as f:
+        for position, line in enumerate(f):
+            idea = Idea.from_json(line)
+            if not os.path.exists(os.path.join(pdf_dir, pdf_file_name(position, idea))):
+                yield position, idea
+
+
+def write_pdfs(ideas_path, pdf_dir, workers, chunk_size):
+    """Render every missing PDF into ``pdf_dir``."""
+    os.makedirs(pdf_dir, exist_ok=True)
+    positions = deque()  # render_pdfs numbers ideas from 0, so the file positions queue up here
+
+    def ideas():
+        for position, idea in missing_pdfs(ideas_path, pdf_dir):
+            positions.append(position)
+            yield idea
+
+    progress = Progress("PDFs")
+    for _, idea, data in render_pdfs(ideas(), workers, chunk_size):
+        path = os.path.join(pdf_dir, pdf_file_name(positions.popleft(), idea))
+        # Written under a temporary name, so an interrupted run never leaves a truncated PDF.
+        with open(path + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(path + '.tmp', path)
+        progress.add()
+    return progress
+
+
+def parse_per_combination(text):
+    # generate_ideas gives each idea of a combination its own name, so there are at most this many.
+    n = int(text)
+    if not 1 <= n <= len(generator.STARTUP_NAMES):
+        raise argparse.ArgumentTypeError(f"must be between 1 and {len(generator.STARTUP_NAMES)}")
+    return n
+
+
+def parse_shard(text):
+    shard, _, shards = text.partition('/')
+    try:
+        shard, shards = int(shard), int(shards)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected i/n, e.g. 0/4") from None
+    if not 0 <= shard < shards:
+        raise argparse.ArgumentTypeError(f"shard {shard} is not in 0..{shards - 1}")
+    return shard, shards
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('out', help="output directory")
+    parser.add_argument('--industry', action='append', choices=generator.INDUSTRIES,
+                        help="repeat to select several (default: all)")
+    parser.add_argument('--audience', action='append', choices=generator.AUDIENCES)
+    parser.add_argument('--tech', action='append', choices=generator.TECHNOLOGIES)
+    parser.add_argument('--goal', action='append', choices=generator.GOALS)
+    parser.add_argument('--region', action='append', choices=generator.REGIONS)
+    parser.add_argument('--monetization', action='append', choices=generator.MONETIZATION_OPTIONS,
+                        help="strategies every idea offers (default: Subscription)")
+    parser.add_argument('--team', type=int, default=5)
+    parser.add_argument('--per-combination', type=parse_per_combination, default=1,
+                        help=f"ideas per combination, at most {len(generator.STARTUP_NAMES)}")
+    parser.add_argument('--seed', default='0')
+    parser.add_argument('--shard', type=parse_shard, default=(0, 1), help="i/n: this run's share of the combinations")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="PDF worker processes")
+    parser.add_argument('--chunk-size', type=int, default=16, help="ideas sent to a PDF worker at a time")
+    parser.add_argument('--no-pdf', action='store_true', help="only write ideas.jsonl")
+    args = parser.parse_args(argv)
+
+    settings = {
+        'industries': args.industry or generator.INDUSTRIES,
+        'audiences': args.audience or generator.AUDIENCES,
+        'technologies': args.tech or generator.TECHNOLOGIES,
+        'goals': args.goal or generator.GOALS,
+        'regions': args.region or generator.REGIONS,
+        'monetization': args.monetization or ["Subscription"],
+        'team': args.team,
+        'per_combination': args.per_combination,
+        'seed': args.seed,
+        'shard': args.shard[0],
+        'shards': args.shard[1],
+    }
+    os.makedirs(args.out, exist_ok=True)
+    run_path = os.path.join(args.out, RUN_FILE)
+    if os.path.exists(run_path):
+        with open(run_path) as f:
+            if json.load(f) != settings:
+                parser.error(f"{args.out} holds a run with other arguments (see {RUN_FILE}); use another directory")
+    else:
+        with open(run_path, 'w') as f:
+            json.dump(settings, f, indent=4)
+
+    ideas_path = os.path.join(args.out, IDEAS_FILE)
+    try:
+        done = complete_lines(ideas_path)
+        if done:
+            print(f"resuming after {done} ideas", file=sys.stderr)
+        ideas = write_ideas(ideas_path, settings, done)
+        print(f"ideas: {ideas.count} written in {ideas.elapsed():.1f} s ({ideas.rate():.0f} ideas/s), "
+              f"{done + ideas.count} in {ideas_path}")
+        if not args.no_pdf:
+            pdfs = write_pdfs(ideas_path, os.path.join(args.out, PDF_DIR), args.workers, args.chunk_size)
+            print(f"PDFs: {pdfs.count} rendered in {pdfs.elapsed():.1f} s ({pdfs.rate():.1f} PDFs/s) "
+                  f"with {args.workers} workers")
+    except KeyboardInterrupt:
+        print("interrupted; run the same command again to resume", file=sys.stderr)
+        raise SystemExit(130)
+
+
+if __name__ == '__main__':
+    main()
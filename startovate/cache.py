@@ -0,0 +1,169 @@
+"""Process-wide cache of user accounts and saved ideas.
+
+Streamlit reruns the page script on every interaction, and every session in
+a server process shares this module.  Reads are answered from memory as long
+as the database has not changed.  That check is a ``stat`` of the database
+files, with the storage version counter read only when the files changed.
+Writes made through the cache update it in place, so a save does not throw
+away what other sessions have loaded.
+"""
+import threading
+from collections import OrderedDict
+
+from startovate import storage
+from startovate.ideas import idea_id
+
+
+class UserDirectoryCache:
+    def __init__(self, max_idea_lists=256):
+        self.max_idea_lists = max_idea_lists
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        self._signature = None
+        self._version = None
+        self._users = None
+        self._ideas = OrderedDict()  # username -> list of Idea records, in LRU order
+
+    def _clear(self):
+        self._users = None
+        self._ideas.clear()
+
+    def _validate(self):
+        # The signature is taken before the version is read: a write landing in
+        # between changes the files again, so the next call looks once more.
+        signature = storage.signature()
+        if signature == self._signature:
+            return
+        version = storage.version()
+        if version != self._version:
+            self._clear()
+            self._version = version
+        self._signature = signature
+
+    def _after_write(self, apply):
+        # Our own write bumps the version by exactly one; anything more means
+        # another process wrote too, so fall back to reloading.
+        signature = storage.signature()
+        version = storage.version()
+        if self._version is not None and version == self._version + 1:
+            apply()
+        else:
+            self._clear()
+        self._version = version
+        self._signature = signature
+
+    # --- USERS ---
+
+    def users(self):
+        """All accounts as ``{username: {...}}``; treat the result as read-only."""
+        with self._lock:
+            self._validate()
+            if self._users is None:
+                self.misses += 1
+                self._users = storage.load_user_data()
+            else:
+                self.hits += 1
+            return self._users
+
+    def add_user(self, username, name, email, password_hash):
+        with self._lock:
+            self._validate()
+            created = storage.add_user(username, name, email, password_hash)
+            if created:
+                def apply():
+                    if self._users is not None:
+                        self._users[username] = {'name': name, 'email': email, 'password': password_hash}
+                self._after_write(apply)
+            return created
+
+    # --- SAVED IDEAS ---
+    # Each user's entry is (ideas, ids): the gallery list plus a dict from
+    # idea id to list index, kept in step on every write.
+
+    def _cached_ideas(self, username):
+        entry = self._ideas.get(username)
+        if entry is None:
+            self.misses += 1
+            ideas = storage.load_saved_ideas(username)
+            entry = (ideas, {idea['id']: i for i, idea in enumerate(ideas)})
+            self._ideas[username] = entry
+            while len(self._ideas) > self.max_idea_lists:
+                self._ideas.popitem(last=False)
+        else:
+            self.hits += 1
+            self._ideas.move_to_end(username)
+        return entry
+
+    def load_saved_ideas(self, username):
+        """The user's saved ideas; the list is a copy but the (read-only) records are shared."""
+        with self._lock:
+            self._validate()
+            return list(self._cached_ideas(username)[0])
+
+    def is_saved(self, username, idea):
+        with self._lock:
+            self._validate()
+            return idea_id(idea) in self._cached_ideas(username)[1]
+
+    def add_idea(self, username, idea):
+        with self._lock:
+            self._validate()
+            saved = storage.add_idea(username, idea)
+
+            def apply():
+                if username in self._ideas:
+                    ideas, ids = self._ideas[username]
+                    if saved['id'] not in ids:
+                        ids[saved['id']] = len(ideas)
+                        ideas.append(saved)
+            self._after_write(apply)
+            return saved
+
+    def update_idea(self, username, idea):
+        with self._lock:
+            self._validate()
+            idea = storage.update_idea(username, idea)
+
+            def apply():
+                if username in self._ideas:
+                    ideas, ids = self._ideas[username]
+                    if idea['id'] in ids:
+                        ideas[ids[idea['id']]] = idea
+            self._after_write(apply)
+
+    def delete_idea(self, username, idea_id):
+        with self._lock:
+            self._validate()
+            storage.delete_idea(username, idea_id)
+
+            def apply():
+                if username in self._ideas:
+                    ideas, ids = self._ideas[username]
+                    if idea_id in ids:
+                        del ideas[ids[idea_id]]
+                        self._ideas[username] = (ideas, {idea['id']: i for i, idea in enumerate(ideas)})
+            self._after_write(apply)
+
+    def save_saved_ideas(self, username, ideas):
+        with self._lock:
+            self._validate()
+            ideas = storage.save_saved_ideas(username, ideas)
+
+            def apply():
+                if username in self._ideas:
+                    self._ideas[username] = (ideas, {idea['id']: i for i, idea in enumerate(ideas)})
+            self._after_write(apply)
+            return ideas
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'cached_idea_lists': len(self._ideas),
+                'version': self._version,
+            }
+
+
+directory = UserDirectoryCache()
@@ -0,0 +1,31 @@
+"""Discover: keyword and faceted search over every user's saved ideas.
+
+Saved ideas are listed in an inverted index in the database
+(``idea_terms``), one row per term and idea that also holds the idea's
+score, so a term's ideas can be read best-first; see startovate.terms for
+what the terms are.  ``storage`` updates the index in the same transaction
+as the ideas, so it is never out of step and every replica shares it.
+
+Results are ranked by feasibility score, newest first among equal scores,
+and paginated.
+"""
+from collections import namedtuple
+
+from startovate import storage
+from startovate.terms import query_groups
+
+Results = namedtuple('Results', ['ideas', 'page', 'has_more'])
+
+
+def search(text="", industry=(), audience=(), tech=(), goal=(), region=(), monetization=(), score=None,
+           k=10, page=1):
+    """Page ``page`` of the best-scoring saved ideas that match, ``k`` per page.
+
+    ``text`` is matched word by word; each facet is a list of allowed
+    values (monetization matches ideas that offer any of them); ``score`` is
+    an inclusive ``(min, max)`` range.
+    """
+    groups = query_groups(text, industry=industry, audience=audience, tech=tech, goal=goal, region=region,
+                          monetization=monetization)
+    ideas = storage.search_ideas(groups, score, limit=k + 1, offset=(page - 1) * k)
+    return Results(ideas[:k], page, len(ideas) > k)
@@ -0,0 +1,121 @@
+"""Bulk export of a gallery as a ZIP of pitch PDFs.
+
+PDFs are rendered in a process pool.  Only a small window of chunks is in
+flight at a time, and each PDF is written into the archive as soon as it
+arrives, so memory use stays flat however large the gallery is.  Archives
+for the gallery download are kept as files in ``EXPORT_DIR`` and removed
+after ``EXPORT_RETENTION`` seconds.
+"""
+import itertools
+import json
+import os
+import re
+import tempfile
+import time
+import zipfile
+from collections import deque
+
+from startovate.ideas import content_hash
+from startovate.pdf import render_pitch_pdf
+
+EXPORT_DIR = os.environ.get("STARTOVATE_EXPORT_DIR", os.path.join(tempfile.gettempdir(), "startovate_exports"))
+EXPORT_RETENTION = 3600.0  # seconds an archive is kept for its download
+
+
+def pdf_file_name(position, idea):
+    safe_name = re.sub(r'[^A-Za-z0-9_-]+', '_', idea['name']).strip('_') or 'idea'
+    return f"{position + 1:04d}_{safe_name}_pitch.pdf"
+
+
+def _render_chunk(ideas):
+    return [render_pitch_pdf(idea) for idea in ideas]
+
+
+def _chunks(ideas, size):
+    it = iter(ideas)
+    while True:
+        chunk = list(itertools.islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def render_pdfs(ideas, workers=None, chunk_size=16):
+    """Yield ``(position, idea, pdf_bytes)`` in gallery order.
+
+    Ideas are sent to the workers ``chunk_size`` at a time to keep IPC
+    overhead low.  ``workers=1`` renders in this process, which avoids pool
+    start-up cost for small galleries.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for position, idea in enumerate(ideas):
+            yield position, idea, render_pitch_pdf(idea)
+        return
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+
+    window = workers * 2
+    position = 0
+    # spawn: forking a threaded Streamlit server is not safe.
+    with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        pending = deque()
+        for chunk in _chunks(ideas, chunk_size):
+            pending.append((chunk, pool.submit(_render_chunk, chunk)))
+            while len(pending) >= window or (pending and pending[0][1].done()):
+                chunk_done, future = pending.popleft()
+                for idea, data in zip(chunk_done, future.result()):
+                    yield position, idea, data
+                    position += 1
+        while pending:
+            chunk_done, future = pending.popleft()
+            for idea, data in zip(chunk_done, future.result()):
+                yield position, idea, data
+                position += 1
+
+
+def export_gallery_zip(ideas, fileobj, workers=None, manifest=True):
+    """Write every idea's pitch PDF into a ZIP archive on ``fileobj``.
+
+    With ``manifest`` a ``manifest.jsonl`` member is added that lists each
+    PDF next to the idea it was rendered from.  Returns the number of PDFs.
+    """
+    manifest_lines = []
+    count = 0
+    with zipfile.ZipFile(fileobj, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for position, idea, data in render_pdfs(ideas, workers):
+            file_name = pdf_file_name(position, idea)
+            archive.writestr(file_name, data)
+            count += 1
+            if manifest:
+                manifest_lines.append(json.dumps(
+                    {'file': file_name, 'content_hash': content_hash(idea), 'idea': dict(idea)}
+                ))
+        if manifest:
+            archive.writestr('manifest.jsonl', '\n'.join(manifest_lines) + '\n')
+    return count
+
+
+def gallery_zip_file(ideas):
+    """Write the gallery download's archive to a new file in ``EXPORT_DIR`` and return its path.
+
+    Archives older than ``EXPORT_RETENTION`` are removed first.
+    """
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    expired = time.time() - EXPORT_RETENTION
+    for entry in os.scandir(EXPORT_DIR):
+        try:
+            if entry.stat().st_mtime < expired:
+                os.remove(entry.path)
+        except FileNotFoundError:
+            pass  # removed by another process meanwhile
+    # Small galleries render faster in-process than by starting a worker pool.
+    workers = 1 if len(ideas) < 50 else None
+    fd, path = tempfile.mkstemp(suffix='.zip', dir=EXPORT_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            export_gallery_zip(ideas, f, workers=workers)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
@@ -0,0 +1,46 @@
+"""Startup idea generation.
+
+The vocabularies live in ``startovate.vocabulary`` and are re-exported here.
+Pass a ``seed`` to get the same ideas back for the same inputs.  The feasibility score does not depend
+on the seed: it comes from the selections (see ``scoring``).
+"""
+import random
+
+from startovate import ideas, scoring
+from startovate.vocabulary import (
+    AUDIENCES, DEFAULT_IDEA, GOALS, IDEA_MAP, INDUSTRIES, MONETIZATION_OPTIONS, NAMES, REGIONS, STARTUP_NAMES,
+    SUFFIXES, TAGLINES, TECHNOLOGIES,
+)
+
+__all__ = [
+    'INDUSTRIES', 'AUDIENCES', 'TECHNOLOGIES', 'GOALS', 'MONETIZATION_OPTIONS', 'REGIONS', 'NAMES', 'SUFFIXES',
+    'STARTUP_NAMES', 'TAGLINES', 'IDEA_MAP', 'DEFAULT_IDEA', 'generate_ideas',
+]
+
+
+def _build_idea(name, rng, industry, audience, tech, goal, monetization, region, team):
+    return ideas.Idea(
+        name=name,
+        tagline=rng.choice(TAGLINES),
+        industry=industry,
+        audience=audience,
+        tech=tech,
+        goal=goal,
+        monetization=list(monetization),
+        region=region,
+        team=team,
+        score=scoring.score(industry, audience, tech, goal, monetization, region, team),
+        idea=IDEA_MAP.get(industry, DEFAULT_IDEA),
+    )
+
+
+def generate_ideas(n, industry, audience, tech, goal, monetization, region, team, seed=None):
+    """Generate ``n`` ideas with distinct startup names in one call.
+
+    There are only ``len(STARTUP_NAMES)`` possible names, so at most that
+    many ideas are returned.
+    """
+    rng = random.Random(seed)
+    names = rng.sample(STARTUP_NAMES, min(n, len(STARTUP_NAMES)))
+    return [_build_idea(name, rng, industry, audience, tech, goal, monetization, region, team)
+            for name in names]
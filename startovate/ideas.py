@@ -0,0 +1,202 @@
+"""Saved ideas: the ``Idea`` record and helpers shared by everything that handles them.
+
+A gallery keeps many ideas in memory (every cached user's list, every
+session's current idea and its variants), and nearly all of their text
+comes from the generator's short lists in ``startovate.vocabulary``.
+``Idea`` is a read-only mapping with ``__slots__`` that stores industry,
+audience, technology, goal and region as their index in those lists, and
+shares one copy of every tagline, idea text, name and monetization set.  A value that is not
+in the lists (an older or hand-edited idea) is kept as it is, so
+``Idea.from_json(text).to_json() == text`` for anything the app has saved.
+
+Use ``replace`` to get a changed copy; ``dict(idea)`` gives a plain dict.
+"""
+import hashlib
+import json
+import sys
+from collections.abc import Mapping
+
+from startovate import vocabulary
+
+KEYS = ('name', 'tagline', 'industry', 'audience', 'tech', 'goal', 'monetization', 'region', 'team', 'score', 'idea')
+CODED = ('industry', 'audience', 'tech', 'goal', 'region')  # kept as indexes into the generator's lists
+
+
+class _Missing:
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<missing>'
+
+
+MISSING = _Missing()
+
+_vocabularies = None
+_decode = {}  # coded key -> the generator's list
+_shared_text = {}
+_shared_monetization = {}
+
+
+def _vocabulary():
+    """``{key: (values, {value: index})}`` for the coded keys, built on first use."""
+    global _vocabularies
+    if _vocabularies is None:
+        lists = dict(zip(CODED, (vocabulary.INDUSTRIES, vocabulary.AUDIENCES, vocabulary.TECHNOLOGIES,
+                                 vocabulary.GOALS, vocabulary.REGIONS)))
+        for text in (*vocabulary.TAGLINES, *vocabulary.IDEA_MAP.values(), vocabulary.DEFAULT_IDEA,
+                     *vocabulary.STARTUP_NAMES, *vocabulary.MONETIZATION_OPTIONS):
+            _shared_text[text] = sys.intern(text)
+        _decode.update(lists)
+        _vocabularies = {key: (values, {value: i for i, value in enumerate(values)})
+                         for key, values in lists.items()}
+    return _vocabularies
+
+
+def _share(text):
+    # One copy of every generator string; edited text is kept as it is.
+    return _shared_text.get(text, text) if type(text) is str else text
+
+
+def _monetization(options):
+    if type(options) not in (list, tuple):
+        return options  # not a list in the stored JSON; kept as it is
+    options = tuple(options)
+    shared = _shared_monetization.get(options)
+    if shared is None:
+        options = tuple(_share(option) for option in options)
+        if all(option in _shared_text for option in options):
+            # At most a few thousand orderings of the generator's options.
+            _shared_monetization[options] = options
+        return options
+    return shared
+
+
+class Idea(Mapping):
+    """One startup idea, read like the dict it is saved as."""
+
+    __slots__ = ('name', 'tagline', '_industry', '_audience', '_tech', '_goal', '_monetization',
+                 '_region', 'team', 'score', 'idea', 'id', '_extra', '_keys')
+
+    def __init__(self, name, tagline, industry, audience, tech, goal, monetization, region, team, score, idea,
+                 id=MISSING):
+        codes = _vocabulary()
+        self.name = _share(name)
+        self.tagline = _share(tagline)
+        self._industry = codes['industry'][1].get(industry, industry)
+        self._audience = codes['audience'][1].get(audience, audience)
+        self._tech = codes['tech'][1].get(tech, tech)
+        self._goal = codes['goal'][1].get(goal, goal)
+        self._monetization = _monetization(monetization)
+        self._region = codes['region'][1].get(region, region)
+        self.team = team
+        self.score = score
+        self.idea = _share(idea)
+        self.id = id
+        self._extra = None  # {key: value} for keys the app does not know
+        self._keys = None   # the stored key order, when it is not KEYS (+ 'id')
+
+    @classmethod
+    def from_mapping(cls, data):
+        if type(data) is cls:
+            return data
+        record = cls(*(data.get(key, MISSING) for key in KEYS), id=data.get('id', MISSING))
+        keys = tuple(data)
+        if keys != KEYS and keys != KEYS + ('id',):
+            record._keys = keys
+            extra = {key: data[key] for key in keys if key not in _FIELDS}
+            record._extra = extra or None
+        return record
+
+    @classmethod
+    def from_json(cls, text):
+        return cls.from_mapping(json.loads(text))
+
+    def to_json(self):
+        """The idea as the JSON text it is saved as."""
+        return json.dumps(self.as_dict())
+
+    def as_dict(self):
+        return {key: self[key] for key in self}
+
+    def replace(self, **changes):
+        """A copy with some values changed, e.g. ``idea.replace(tagline="...")``."""
+        data = self.as_dict()
+        data.update(changes)
+        return Idea.from_mapping(data)
+
+    def content_key(self):
+        """Hashable key of the saved content, without ``id`` or unknown keys."""
+        return (self.name, self.tagline, self._industry, self._audience, self._tech, self._goal,
+                self._monetization, self._region, self.team, self.score, self.idea)
+
+    def __getitem__(self, key):
+        field = _FIELDS.get(key)
+        if field is None:
+            if self._extra is None:
+                raise KeyError(key)
+            return self._extra[key]
+        value = getattr(self, field)
+        if value is MISSING:
+            raise KeyError(key)
+        if type(value) is int:
+            values = _decode.get(key)  # team and score are plain ints
+            if values is not None:
+                return values[value]
+        elif type(value) is tuple and key == 'monetization':
+            return list(value)
+        return value
+
+    def __iter__(self):
+        if self._keys is not None:
+            return iter(self._keys)
+        return iter(KEYS if self.id is MISSING else KEYS + ('id',))
+
+    def __len__(self):
+        if self._keys is not None:
+            return len(self._keys)
+        return len(KEYS) + (self.id is not MISSING)
+
+    def __contains__(self, key):
+        if self._keys is not None:
+            return key in self._keys
+        return key in _FIELDS and getattr(self, _FIELDS[key]) is not MISSING
+
+    def _state(self):
+        return tuple(getattr(self, slot) for slot in Idea.__slots__)
+
+    def __eq__(self, other):
+        if type(other) is Idea and self._keys is None and other._keys is None:
+            return self._state() == other._state()
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __reduce__(self):
+        # Sent to other processes (PDF workers) as JSON, whose codes may not be built yet.
+        return Idea.from_json, (self.to_json(),)
+
+    def __repr__(self):
+        return f"Idea({self.as_dict()!r})"
+
+
+_FIELDS = {key: (f'_{key}' if key in CODED or key == 'monetization' else key) for key in (*KEYS, 'id')}
+
+
+def content_hash(idea):
+    """Stable hash of an idea's content, independent of key order and ``id``."""
+    content = {key: value for key, value in idea.items() if key != 'id'}
+    canonical = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def idea_id(idea):
+    """The idea's stable id: assigned when it is first saved, derived from its content until then."""
+    return idea.get('id') or content_hash(idea)[:16]
+
+
+def with_id(idea):
+    """The idea as an ``Idea`` record that has an id."""
+    idea = Idea.from_mapping(idea)
+    if idea.get('id'):
+        return idea
+    return idea.replace(id=idea_id(idea))
@@ -0,0 +1,170 @@
+"""Admission control for expensive actions.
+
+Each action (generating ideas, narrating, transcribing a recording, a PDF
+download, a gallery export) has two token buckets, one per user and one
+shared by everybody, plus a bound on how many run at once.  ``admit``
+raises ``Throttled`` when a bucket is empty, with the time until the next
+token.  ``slot`` waits for a free place in the action's concurrency pool
+and raises ``Busy`` when none frees up in time.  Work that runs in a
+background pool (narration, transcription) passes its current backlog to
+``admit`` instead of holding a slot: for ``narrate`` that is the number of
+unfinished narrations (each one several sentence jobs), for ``record`` the
+transcriptions queued or running.
+
+Limits can be changed with ``STARTOVATE_LIMITS``, a JSON object of
+overrides such as ``{"generate": {"user_rate": 1, "user_burst": 10}}``.
+Rates are tokens per second.  Counts of admitted and refused requests go to
+the metrics registry; ``stats`` also reports how many are in flight.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from startovate.metrics import metrics
+
+# ``concurrency`` counts whole actions: narrations (not their sentence jobs), transcriptions, PDFs, exports.
+DEFAULTS = {
+    'generate': {'user_rate': 0.5, 'user_burst': 5, 'global_rate': 20.0, 'global_burst': 50, 'concurrency': 8},
+    'narrate': {'user_rate': 0.2, 'user_burst': 3, 'global_rate': 2.0, 'global_burst': 10, 'concurrency': 16},
+    'record': {'user_rate': 0.2, 'user_burst': 3, 'global_rate': 2.0, 'global_burst': 10, 'concurrency': 8},
+    'pdf': {'user_rate': 1.0, 'user_burst': 10, 'global_rate': 20.0, 'global_burst': 40, 'concurrency': 4},
+    'export': {'user_rate': 1 / 60, 'user_burst': 2, 'global_rate': 0.2, 'global_burst': 2, 'concurrency': 1},
+}
+MAX_TRACKED_USERS = 10_000
+
+
+class Throttled(Exception):
+    def __init__(self, action, scope, retry_after):
+        self.action = action
+        self.scope = scope
+        self.retry_after = retry_after
+        who = "You are" if scope == 'user' else "Everyone is"
+        super().__init__(f"{who} doing this too often; try again in {max(1, round(retry_after))} s.")
+
+
+class Busy(Exception):
+    def __init__(self, action):
+        self.action = action
+        super().__init__("The server is busy with other requests; please try again shortly.")
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+
+    def take(self, now):
+        """Take one token; returns 0 on success, else the seconds until one is available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self):
+        self.tokens = min(self.burst, self.tokens + 1)
+
+
+class ActionLimit:
+    def __init__(self, action, user_rate, user_burst, global_rate, global_burst, concurrency):
+        self.action = action
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.concurrency = concurrency
+        self._global = TokenBucket(global_rate, global_burst)
+        self._users = OrderedDict()  # username -> TokenBucket, least recently used first
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(concurrency)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def _user_bucket(self, user):
+        bucket = self._users.get(user)
+        if bucket is None:
+            bucket = self._users[user] = TokenBucket(self.user_rate, self.user_burst)
+            if len(self._users) > MAX_TRACKED_USERS:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user)
+        return bucket
+
+    def admit(self, user, pending=None):
+        """Let one request by ``user`` through, or raise ``Throttled`` / ``Busy``.
+
+        ``pending`` is the action's current backlog for work that runs in a
+        background pool; it is refused once the backlog reaches ``concurrency``.
+        """
+        if pending is not None and pending >= self.concurrency:
+            metrics.increment('limit_busy', action=self.action)
+            raise Busy(self.action)
+        now = time.monotonic()
+        with self._lock:
+            user_bucket = self._user_bucket(user)
+            wait = user_bucket.take(now)
+            if wait:
+                scope = 'user'
+            else:
+                wait = self._global.take(now)
+                if wait:
+                    user_bucket.refund()
+                    scope = 'global'
+        if wait:
+            metrics.increment('limit_throttled', action=self.action, scope=scope)
+            raise Throttled(self.action, scope, wait)
+        metrics.increment('limit_admitted', action=self.action)
+
+    @contextmanager
+    def slot(self, wait=0.0):
+        """Hold one of the action's ``concurrency`` places while the block runs."""
+        if not self._slots.acquire(timeout=wait):
+            metrics.increment('limit_busy', action=self.action)
+            raise Busy(self.action)
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+    def stats(self):
+        with self._lock:
+            return {'concurrency': self.concurrency, 'in_flight': self.in_flight,
+                    'peak_in_flight': self.peak_in_flight, 'tracked_users': len(self._users)}
+
+
+def _load_limits():
+    overrides = json.loads(os.environ.get("STARTOVATE_LIMITS") or "{}")
+    return {action: ActionLimit(action, **{**settings, **overrides.get(action, {})})
+            for action, settings in DEFAULTS.items()}
+
+
+LIMITS = _load_limits()
+
+
+def admit(action, user, pending=None):
+    LIMITS[action].admit(user, pending)
+
+
+def slot(action, wait=0.0):
+    return LIMITS[action].slot(wait)
+
+
+def run(action, user, fn, *args, wait=5.0, **kwargs):
+    """``fn(*args, **kwargs)`` once ``user`` is admitted and a slot is free."""
+    limit = LIMITS[action]
+    limit.admit(user)
+    with limit.slot(wait):
+        return fn(*args, **kwargs)
+
+
+def stats():
+    return {action: limit.stats() for action, limit in LIMITS.items()}
@@ -0,0 +1,208 @@
+"""Timing spans, latency histograms and opt-in profiling.
+
+Page sections, storage calls and external services (SMTP, TTS, speech
+recognition, PDF rendering) are wrapped in ``span`` or decorated with
+``timed``; each span has a kind (``section``, ``io``, ``external`` or
+``render``).  Every span is added to a process-wide histogram, and spans
+recorded during a Streamlit rerun are also collected per rerun.  When
+``STARTOVATE_METRICS_JSONL`` is set, each rerun appends one line with its
+spans to that file.
+
+``increment`` counts events such as refused requests.
+``prometheus_text`` and ``jsonl`` export the histograms and counters.  ``Profile``
+captures a cProfile (or pyinstrument, with ``STARTOVATE_PROFILER=pyinstrument``)
+report of one rerun; the UI turns it on per session.
+"""
+import functools
+import io
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RERUN_LOG = os.environ.get("STARTOVATE_METRICS_JSONL")
+PROFILER = os.environ.get("STARTOVATE_PROFILER", "cprofile")
+
+
+class Histogram:
+    """Cumulative latency histogram in the Prometheus style (seconds)."""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._histograms = {}  # (name, kind) -> Histogram
+        self._counters = {}    # (name, sorted label items) -> count
+        self._local = threading.local()
+
+    def observe(self, name, seconds, kind='section'):
+        with self._lock:
+            histogram = self._histograms.get((name, kind))
+            if histogram is None:
+                histogram = self._histograms[(name, kind)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+        spans = getattr(self._local, 'spans', None)
+        if spans is not None:
+            spans.append((name, kind, seconds))
+
+    def increment(self, name, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+
+    @contextmanager
+    def span(self, name, kind='section'):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, kind)
+
+    def timed(self, name, kind='io'):
+        """Decorator form of ``span``."""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name, kind):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    @contextmanager
+    def rerun(self, page):
+        """Collect the spans of one script run on this thread; yields the span list."""
+        spans = self._local.spans = []
+        start = time.perf_counter()
+        try:
+            yield spans
+        finally:
+            self._local.spans = None
+            total = time.perf_counter() - start
+            self.observe('rerun', total)
+            if RERUN_LOG:
+                line = json.dumps({'ts': time.time(), 'page': page, 'seconds': total,
+                                   'spans': [{'name': n, 'kind': k, 'seconds': s} for n, k, s in spans]})
+                with open(RERUN_LOG, 'a') as f:
+                    f.write(line + '\n')
+
+    def snapshot(self):
+        with self._lock:
+            return {key: (list(h.cumulative()), h.count, h.sum) for key, h in sorted(self._histograms.items())}
+
+    def counters(self):
+        with self._lock:
+            return sorted(self._counters.items())
+
+    def prometheus_text(self):
+        out = ["# HELP startovate_span_seconds Time spent in instrumented sections and calls.",
+               "# TYPE startovate_span_seconds histogram"]
+        for (name, kind), (buckets, count, total) in self.snapshot().items():
+            labels = f'name="{name}",kind="{kind}"'
+            for bound, cumulative in buckets:
+                le = "+Inf" if bound == float('inf') else repr(bound)
+                out.append(f'startovate_span_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            out.append(f'startovate_span_seconds_sum{{{labels}}} {total}')
+            out.append(f'startovate_span_seconds_count{{{labels}}} {count}')
+        last_name = None
+        for (name, labels), value in self.counters():
+            if name != last_name:
+                out.append(f"# TYPE startovate_{name}_total counter")
+                last_name = name
+            label_text = ','.join(f'{key}="{label}"' for key, label in labels)
+            out.append(f'startovate_{name}_total{{{label_text}}} {value}')
+        return '\n'.join(out) + '\n'
+
+    def jsonl(self):
+        lines = []
+        for (name, kind), (buckets, count, total) in self.snapshot().items():
+            lines.append(json.dumps({
+                'name': name, 'kind': kind, 'count': count, 'sum': total,
+                'buckets': {("+Inf" if bound == float('inf') else str(bound)): cumulative
+                            for bound, cumulative in buckets},
+            }))
+        for (name, labels), value in self.counters():
+            lines.append(json.dumps({'counter': name, 'labels': dict(labels), 'value': value}))
+        return ''.join(line + '\n' for line in lines)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+metrics = Registry()
+span = metrics.span
+timed = metrics.timed
+
+
+class Profile:
+    """Profile a block of code; ``report`` holds the text output afterwards.
+
+    Only one profiler can run per process at a time with pyinstrument, and
+    concurrent cProfile captures blur each other, so overlapping captures
+    are skipped and say so in the report.
+    """
+
+    _active = threading.Lock()
+
+    def __init__(self, backend=PROFILER, limit=40):
+        self.backend = backend
+        self.limit = limit
+        self.report = None
+
+    def __enter__(self):
+        self._owner = self._active.acquire(blocking=False)
+        if not self._owner:
+            self.report = "Another session is being profiled; try again on the next rerun."
+            return self
+        if self.backend == 'pyinstrument':
+            from pyinstrument import Profiler
+            self._profiler = Profiler()
+            self._profiler.start()
+        else:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self._owner:
+            return False
+        try:
+            if self.backend == 'pyinstrument':
+                self._profiler.stop()
+                self.report = self._profiler.output_text(unicode=True)
+            else:
+                import pstats
+                self._profiler.disable()
+                buffer = io.StringIO()
+                pstats.Stats(self._profiler, stream=buffer).sort_stats('cumulative').print_stats(self.limit)
+                self.report = buffer.getvalue()
+        finally:
+            self._active.release()
+        return False
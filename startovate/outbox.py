@@ -0,0 +1,251 @@
+"""Durable email outbox with a background sender.
+
+``enqueue`` writes the message to the ``outbox`` table and returns at once;
+sender threads claim up to ``BATCH_SIZE`` due messages at a time and deliver
+them over SMTP connections that stay logged in between messages.  Failed
+deliveries are retried with exponential backoff until ``MAX_ATTEMPTS`` is
+reached.  Because the queue lives in the database, messages survive a
+restart: ``start`` runs when the app starts, so messages left over from
+before go out without waiting for a new one.
+
+SMTP settings come from the environment.  Without ``STARTOVATE_SMTP_USER``
+and ``STARTOVATE_SMTP_PASSWORD`` nothing is queued for the default Gmail
+server.  To try it against a local stand-in server instead, run
+``python -m aiosmtpd -n -l localhost:1025`` and set
+``STARTOVATE_SMTP_HOST=localhost STARTOVATE_SMTP_PORT=1025 STARTOVATE_SMTP_SSL=0``.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from startovate import pitch, storage
+from startovate.metrics import span
+
+DEFAULT_SMTP_HOST = "smtp.gmail.com"
+SMTP_HOST = os.environ.get("STARTOVATE_SMTP_HOST", DEFAULT_SMTP_HOST)
+SMTP_PORT = int(os.environ.get("STARTOVATE_SMTP_PORT", "465"))
+SMTP_SSL = os.environ.get("STARTOVATE_SMTP_SSL", "1") == "1"
+SMTP_USER = os.environ.get("STARTOVATE_SMTP_USER", "")
+SMTP_PASSWORD = os.environ.get("STARTOVATE_SMTP_PASSWORD", "")  # e.g. a Gmail App Password
+SENDER = os.environ.get("STARTOVATE_SMTP_SENDER", SMTP_USER or "startovate@localhost")
+
+WORKERS = int(os.environ.get("STARTOVATE_SMTP_WORKERS", "2"))
+MAX_ATTEMPTS = 5
+BACKOFF_BASE = 2.0      # seconds; doubled after every failed attempt
+SMTP_TIMEOUT = 30.0     # per socket operation
+BATCH_SIZE = 5          # messages claimed together and sent over one connection
+# A claimed message not sent within this is retried.  Connecting and logging
+# in take up to four socket operations of SMTP_TIMEOUT each, and sending a
+# message (MAIL, RCPT, DATA, body) four more, so a whole batch fits.
+CLAIM_LEASE = (4 + 4 * BATCH_SIZE) * SMTP_TIMEOUT
+IDLE_TIMEOUT = 60.0     # close a pooled connection after this long unused
+POLL_INTERVAL = 5.0
+DB_RETRY_MAX = 30.0     # seconds; longest wait between retries of a locked database
+
+log = logging.getLogger(__name__)
+
+
+def configured():
+    """Whether emails can be sent: a login, or a server other than the default that may not need one."""
+    return bool(SMTP_USER and SMTP_PASSWORD) or SMTP_HOST != DEFAULT_SMTP_HOST
+
+
+def enqueue(to_email, subject, body):
+    """Queue a message for delivery and return its outbox id."""
+    now = time.time()
+    with storage.transaction(bump=False) as conn:
+        message_id = conn.execute(
+            "INSERT INTO outbox (to_email, subject, body, next_attempt_at, created_at) VALUES (?, ?, ?, ?, ?)",
+            (to_email, subject, body, now, now),
+        ).lastrowid
+    sender().wake()
+    return message_id
+
+
+def send_idea_email(to_email, idea_data):
+    """Queue the idea email and return its outbox id, or None if email is not configured."""
+    if not configured():
+        log.warning("Not emailing %s: set STARTOVATE_SMTP_USER and STARTOVATE_SMTP_PASSWORD "
+                    "(or STARTOVATE_SMTP_HOST) to enable email.", to_email)
+        return None
+    subject, body = pitch.idea_email(idea_data)
+    return enqueue(to_email, subject, body)
+
+
+def status(message_id):
+    row = storage.connect().execute(
+        "SELECT status, attempts, last_error, sent_at FROM outbox WHERE id = ?", (message_id,)
+    ).fetchone()
+    if row is None:
+        return None
+    return {'status': row[0], 'attempts': row[1], 'last_error': row[2], 'sent_at': row[3]}
+
+
+def _claim():
+    """Up to ``BATCH_SIZE`` due messages, leased to the caller for ``CLAIM_LEASE`` seconds."""
+    now = time.time()
+    with storage.transaction(bump=False) as conn:
+        return conn.execute(
+            """
+            UPDATE outbox SET status = 'sending', claimed_at = ?
+            WHERE id IN (
+                SELECT id FROM outbox
+                WHERE (status = 'pending' AND next_attempt_at <= ?)
+                   OR (status = 'sending' AND claimed_at < ?)
+                ORDER BY next_attempt_at LIMIT ?
+            )
+            RETURNING id, to_email, subject, body, attempts
+            """,
+            (now, now, now - CLAIM_LEASE, BATCH_SIZE),
+        ).fetchall()
+
+
+def _release(message_ids):
+    """Hand claimed messages back, e.g. when the sender stops before sending them."""
+    with storage.transaction(bump=False) as conn:
+        conn.executemany("UPDATE outbox SET status = 'pending' WHERE id = ? AND status = 'sending'",
+                         [(message_id,) for message_id in message_ids])
+
+
+def _mark_sent(message_id):
+    with storage.transaction(bump=False) as conn:
+        conn.execute(
+            "UPDATE outbox SET status = 'sent', sent_at = ?, attempts = attempts + 1, last_error = NULL WHERE id = ?",
+            (time.time(), message_id),
+        )
+
+
+def _mark_failed(message_id, attempts, error):
+    attempts += 1
+    if attempts >= MAX_ATTEMPTS:
+        new_status, next_attempt_at = 'failed', time.time()
+    else:
+        new_status, next_attempt_at = 'pending', time.time() + BACKOFF_BASE * 2 ** (attempts - 1)
+    with storage.transaction(bump=False) as conn:
+        conn.execute(
+            "UPDATE outbox SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+            (new_status, attempts, next_attempt_at, str(error), message_id),
+        )
+
+
+def _open_smtp():
+    import smtplib  # loaded by the sender threads only, not on app start-up
+
+    if SMTP_SSL:
+        smtp = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    else:
+        smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    if SMTP_USER and SMTP_PASSWORD and (SMTP_SSL or smtp.has_extn('auth')):
+        smtp.login(SMTP_USER, SMTP_PASSWORD)
+    return smtp
+
+
+class OutboxSender:
+    """Pool of sender threads, each holding one reusable SMTP connection."""
+
+    def __init__(self, workers=WORKERS, connect=_open_smtp):
+        self.workers = workers
+        self.connect = connect
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"outbox-sender-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def wake(self):
+        self._wakeup.set()
+
+    def _db(self, operation, *args):
+        """Run a database step, retrying with backoff while the database is locked.
+
+        Returns None if the sender is stopped first.
+        """
+        delay = 0.1
+        while not self._stop.is_set():
+            try:
+                return operation(*args)
+            except sqlite3.OperationalError as e:
+                log.warning("Outbox %s failed (%s); retrying in %.1f s", operation.__name__, e, delay)
+                self._stop.wait(delay)
+                delay = min(delay * 2, DB_RETRY_MAX)
+        return None
+
+    def _run(self):
+        from email.message import EmailMessage
+
+        smtp = None
+        last_used = 0.0
+        while not self._stop.is_set():
+            batch = self._db(_claim)
+            if not batch:
+                if smtp is not None and time.time() - last_used > IDLE_TIMEOUT:
+                    smtp = _close(smtp)
+                self._wakeup.wait(POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            for i, (message_id, to_email, subject, body, attempts) in enumerate(batch):
+                if self._stop.is_set():
+                    self._db(_release, [claimed[0] for claimed in batch[i:]])
+                    break
+                msg = EmailMessage()
+                msg['Subject'] = subject
+                msg['From'] = SENDER
+                msg['To'] = to_email
+                msg.set_content(body)
+                try:
+                    if smtp is None:
+                        with span("smtp.connect", 'external'):
+                            smtp = self.connect()
+                    with span("smtp.send", 'external'):
+                        smtp.send_message(msg)
+                except Exception as e:
+                    # The connection may be unusable now; open a fresh one for the next message.
+                    smtp = _close(smtp)
+                    self._db(_mark_failed, message_id, attempts, e)
+                else:
+                    # Retried until it lands: a message left 'sending' would be sent again.
+                    self._db(_mark_sent, message_id)
+                last_used = time.time()
+        _close(smtp)
+
+
+def _close(smtp):
+    if smtp is not None:
+        try:
+            smtp.quit()
+        except Exception:
+            pass
+    return None
+
+
+_sender = None
+_sender_lock = threading.Lock()
+
+
+def sender():
+    """The process-wide sender, started on first use."""
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            _sender = OutboxSender().start()
+        return _sender
+
+
+def start():
+    """Start the sender when the app starts, so messages queued before a restart are delivered."""
+    if configured():
+        sender()
@@ -0,0 +1,125 @@
+"""Pitch deck PDFs, rendered on demand and cached by idea content.
+
+The cache key is the idea's content hash.  Editing an idea therefore gives
+it a new key, and ``invalidate`` drops the stale entry.  Entries pushed out
+of the in-memory LRU are written to ``spill_dir`` when one is configured, so
+they can be read back later without rendering again.
+"""
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+from startovate import pitch
+from startovate.ideas import content_hash
+from startovate.metrics import timed
+
+
+PDF_STYLES = {  # style -> (font, size, space after)
+    'title': ("Helvetica-Bold", 14, 18),
+    'heading': ("Helvetica-Bold", 11, 4),
+    'text': ("Helvetica", 10, 8),
+}
+
+
+@timed("pdf.render", kind='render')
+def render_pitch_pdf(idea):
+    # reportlab is only needed once someone actually downloads a PDF.
+    from reportlab.lib.pagesizes import letter
+    from reportlab.lib.utils import simpleSplit
+    from reportlab.pdfgen import canvas
+
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=letter)
+    width, height = letter
+    margin = 50
+    y_pos = height - 42
+    for style, text in pitch.render(idea).pdf_lines:
+        font, size, space_after = PDF_STYLES[style]
+        for line in simpleSplit(text, font, size, width - 2 * margin):
+            if y_pos < margin:
+                pdf.showPage()
+                y_pos = height - margin
+            pdf.setFont(font, size)
+            pdf.drawString(margin, y_pos, line)
+            y_pos -= size + 4
+        y_pos -= space_after
+    pdf.save()
+    return buffer.getvalue()
+
+
+class PdfCache:
+    def __init__(self, max_entries=128, spill_dir=None):
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # content hash -> PDF bytes, in LRU order
+        self._lock = threading.Lock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.pdf")
+
+    def _read_spilled(self, key):
+        if not self.spill_dir:
+            return None
+        try:
+            with open(self._spill_path(key), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _store(self, key, data):
+        self._entries[key] = data
+        while len(self._entries) > self.max_entries:
+            old_key, old_data = self._entries.popitem(last=False)
+            if self.spill_dir:
+                # Other processes may share spill_dir; never let them read a half-written file.
+                fd, tmp_path = tempfile.mkstemp(suffix='.pdf', dir=self.spill_dir)
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(old_data)
+                os.replace(tmp_path, self._spill_path(old_key))
+
+    def get(self, idea):
+        """PDF bytes for ``idea``, rendering only on a cache miss."""
+        key = content_hash(idea)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return data
+            data = self._read_spilled(key)
+            if data is not None:
+                self.hits += 1
+                self._store(key, data)
+                return data
+            self.misses += 1
+        data = render_pitch_pdf(idea)
+        with self._lock:
+            self._store(key, data)
+        return data
+
+    def invalidate(self, idea):
+        key = content_hash(idea)
+        with self._lock:
+            self._entries.pop(key, None)
+            if self.spill_dir:
+                try:
+                    os.remove(self._spill_path(key))
+                except FileNotFoundError:
+                    pass
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+pdf_cache = PdfCache(spill_dir=os.environ.get("STARTOVATE_PDF_CACHE_DIR"))
+
+
+def pitch_pdf(idea):
+    return pdf_cache.get(idea)
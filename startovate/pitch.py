@@ -0,0 +1,172 @@
+"""One pitch model for an idea, rendered for the screen, narration, PDF and email.
+
+The pitch is described once, as idea facts and pitch deck sections whose
+templates are compiled when this module is imported.  ``render`` fills
+them in for one idea and returns every output format together: Markdown
+for the page, plain text for narration, lines for the PDF and the email
+subject and body.  Results are memoized by the idea's content (the values
+the templates read), so a rerun that shows the same idea does no string
+building.
+
+Template fields are idea keys or derived values (see ``_fields``).  A field
+written ``{*name}`` is emphasized: bold in Markdown, plain everywhere else.
+"""
+import threading
+from collections import OrderedDict, namedtuple
+from string import Formatter
+
+from startovate.ideas import Idea
+
+CACHE_SIZE = 1024
+CONTENT_KEYS = ('name', 'tagline', 'industry', 'audience', 'tech', 'idea', 'goal', 'region', 'team', 'score')
+
+# (label, emoji, template)
+FACTS = [
+    ("Startup Name", "🚀", "{name}"),
+    ("Tagline", "📌", "{tagline}"),
+    ("Industry", "🏭", "{industry}"),
+    ("Audience", "🙋", "{audience}"),
+    ("Technology", "🛠️", "{tech}"),
+    ("Core Idea", "🧠", "A {tech} for {audience} in the {industry} industry to {idea}"),
+    ("Vision Goal", "🎯", "{goal}"),
+    ("Target Market", "🌍", "{region}"),
+    ("Monetization", "💸", "{monetization}"),
+    ("Team Size", "👥", "{team}"),
+    ("Feasibility Score", "📊", "{score}"),
+]
+
+# (title, template)
+SECTIONS = [
+    ("Problem", "In the {*industry} sector, {*audience} often face challenges related to {*problem}."),
+    ("Solution", "Our solution is a {*tech} designed to {*idea}, providing a seamless and effective approach."),
+    ("Market & Audience", "We are targeting the {*region} market, specifically focusing on {*audience} who are looking for {*goal}."),
+    ("Business Model", "Our primary monetization strategies include {*monetization}, ensuring sustainable growth."),
+    ("Team & Feasibility", "With a dedicated team of {*team} members, we are well-equipped to achieve our vision. Our idea has a strong feasibility score of {*score}."),
+]
+
+EMAIL_SUBJECT = "Your Startup Idea: {name}"
+EMAIL_FOOTER = "Thank you for using Startovate!"
+PITCH_INTRO = "Introducing {name}, {tagline}."
+
+
+def _compile(template):
+    """``template`` as a tuple of ``(literal, field, emphasized)`` parts."""
+    parts = []
+    for literal, field, _, _ in Formatter().parse(template):
+        emphasized = bool(field) and field.startswith('*')
+        parts.append((literal, field.lstrip('*') if field else None, emphasized))
+    return tuple(parts)
+
+
+_FACTS = [(label, emoji, _compile(template)) for label, emoji, template in FACTS]
+_SECTIONS = [(title, _compile(template)) for title, template in SECTIONS]
+_EMAIL_SUBJECT = _compile(EMAIL_SUBJECT)
+_PITCH_INTRO = _compile(PITCH_INTRO)
+
+
+def _fill(parts, values, markdown=False):
+    out = []
+    for literal, field, emphasized in parts:
+        out.append(literal)
+        if field:
+            value = values[field]
+            out.append(f"**{value}**" if markdown and emphasized else value)
+    return ''.join(out)
+
+
+def _fields(idea, spoken=False):
+    # Taglines and idea descriptions are full sentences; the templates add their own full stops.
+    idea_text = idea['idea'].rstrip('.')
+    return {
+        'name': idea['name'],
+        'tagline': idea['tagline'].rstrip('.'),
+        'industry': idea['industry'],
+        'audience': idea['audience'],
+        'tech': idea['tech'],
+        'idea': idea_text,
+        'problem': idea_text.replace('solve a pressing problem in the chosen domain',
+                                     'existing inefficiencies or lack of innovative solutions'),
+        'goal': idea['goal'],
+        'region': idea['region'],
+        'monetization': ', '.join(idea['monetization']),
+        'team': str(idea['team']),
+        'score': f"{idea['score']} out of 100" if spoken else f"{idea['score']} / 100",
+    }
+
+
+Pitch = namedtuple('Pitch', [
+    'name', 'tagline',
+    'facts',             # [(label, emoji, text)]
+    'sections',          # [(title, markdown)]
+    'idea_narration',    # spoken summary of the facts
+    'pitch_narration',   # spoken pitch deck
+    'pdf_lines',         # [(style, text)], style is 'title', 'heading' or 'text'
+    'email_subject', 'email_body',
+])
+
+
+def _render(idea):
+    text = _fields(idea)
+    spoken = _fields(idea, spoken=True)
+    facts = [(label, emoji, _fill(parts, text)) for label, emoji, parts in _FACTS]
+    sections = [(title, _fill(parts, text, markdown=True)) for title, parts in _SECTIONS]
+
+    idea_narration = ' '.join(f"{label}: {_fill(parts, spoken)}." for label, _, parts in _FACTS)
+    pitch_narration = ' '.join(
+        [_fill(_PITCH_INTRO, spoken)] + [f"{title}: {_fill(parts, spoken)}" for title, parts in _SECTIONS]
+    )
+
+    pdf_lines = [('title', f"Pitch Deck - {text['name']}")]
+    pdf_lines += [('text', f"{label}: {value}") for label, _, value in facts[1:]]
+    for title, parts in _SECTIONS:
+        pdf_lines += [('heading', title), ('text', _fill(parts, text))]
+
+    email_body = '\n'.join([f"{emoji} {label}: {value}" for label, emoji, value in facts] + ['', EMAIL_FOOTER])
+
+    return Pitch(
+        name=idea['name'], tagline=idea['tagline'], facts=tuple(facts), sections=tuple(sections),
+        idea_narration=idea_narration, pitch_narration=pitch_narration, pdf_lines=tuple(pdf_lines),
+        email_subject=_fill(_EMAIL_SUBJECT, text), email_body=email_body,
+    )
+
+
+_cache = OrderedDict()  # content key -> Pitch, in LRU order
+_cache_lock = threading.Lock()
+
+
+def render(idea):
+    """Every rendering of ``idea``'s pitch, memoized by content.
+
+    The result is shared between callers.
+    """
+    # A tuple of the values is cheaper to hash than the JSON content hash,
+    # and keys the templates never read (such as ``id``) don't split entries.
+    if type(idea) is Idea:
+        key = idea.content_key()
+    else:
+        key = tuple(idea[k] for k in CONTENT_KEYS) + tuple(idea['monetization'])
+    with _cache_lock:
+        pitch = _cache.get(key)
+        if pitch is not None:
+            _cache.move_to_end(key)
+            return pitch
+    pitch = _render(idea)
+    with _cache_lock:
+        _cache[key] = pitch
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return pitch
+
+
+def idea_narration(idea):
+    return render(idea).idea_narration
+
+
+def pitch_narration(idea):
+    return render(idea).pitch_narration
+
+
+def idea_email(idea):
+    """``(subject, body)`` of the email sent when an idea is generated."""
+    pitch = render(idea)
+    return pitch.email_subject, pitch.email_body
@@ -0,0 +1,229 @@
+"""Deterministic feasibility scores and top-k search over every selection.
+
+A score is the sum of small, readable fit tables: how well the technology,
+audience and goal suit the industry, how well the monetization options
+suit the audience, how ready the region is, and how workable the team size
+is.  The tables are evaluated with NumPy for the whole grid of industry x
+audience x technology x goal x region x monetization set (about 670,000
+combinations) into one lookup table the first time a score is needed.
+Team size is kept as a separate 50-entry vector, since its fit does not
+depend on the other choices.
+
+Raw sums are mapped onto ``SCORE_RANGE`` using the grid's minimum and
+maximum, so the best possible idea scores ``SCORE_RANGE[1]``.
+
+``best_ideas`` returns the top-k combinations that satisfy the caller's
+constraints.  It slices the lookup table instead of recomputing anything.
+"""
+import threading
+
+from startovate import vocabulary
+
+TEAM_SIZES = range(1, 51)
+SCORE_RANGE = (40, 98)
+MAX_SEARCH_MONETIZATION = 3  # unconstrained searches consider sets of 1-3 options
+
+TECH_FIT = {  # (industry, technology) -> bonus; unlisted pairs are neutral
+    ("Healthcare", "AI Tool"): 2.0, ("Healthcare", "IoT"): 1.5, ("Healthcare", "Mobile App"): 1.0,
+    ("Healthcare", "Blockchain"): -1.0,
+    ("Education", "Web App"): 1.5, ("Education", "VR/AR"): 1.5, ("Education", "Mobile App"): 1.0,
+    ("Education", "SaaS Platform"): 1.0, ("Education", "Blockchain"): -1.5,
+    ("Finance", "AI Tool"): 1.5, ("Finance", "Blockchain"): 1.5, ("Finance", "SaaS Platform"): 1.5,
+    ("Finance", "Mobile App"): 1.0, ("Finance", "VR/AR"): -1.5,
+    ("Entertainment", "VR/AR"): 2.0, ("Entertainment", "Mobile App"): 1.5, ("Entertainment", "AI Tool"): 1.0,
+    ("Entertainment", "IoT"): -1.0,
+    ("AI/ML", "AI Tool"): 2.0, ("AI/ML", "SaaS Platform"): 1.5, ("AI/ML", "Web App"): 0.5,
+    ("AI/ML", "VR/AR"): -0.5,
+    ("GreenTech", "IoT"): 2.0, ("GreenTech", "Mobile App"): 0.5, ("GreenTech", "AI Tool"): 0.5,
+    ("GreenTech", "Blockchain"): -1.0, ("GreenTech", "VR/AR"): -1.0,
+    ("Travel", "Mobile App"): 2.0, ("Travel", "AI Tool"): 1.0, ("Travel", "VR/AR"): 1.0,
+    ("Travel", "IoT"): -0.5, ("Travel", "Blockchain"): -1.0,
+}
+
+AUDIENCE_FIT = {  # (industry, audience) -> bonus
+    ("Healthcare", "Seniors"): 1.5, ("Healthcare", "Individuals"): 1.0, ("Healthcare", "Businesses"): 0.5,
+    ("Education", "Students"): 2.0, ("Education", "Professionals"): 1.0, ("Education", "Seniors"): -0.5,
+    ("Finance", "Businesses"): 1.5, ("Finance", "Startups"): 1.0, ("Finance", "Professionals"): 1.0,
+    ("Finance", "Students"): -0.5,
+    ("Entertainment", "Individuals"): 1.5, ("Entertainment", "Students"): 1.0, ("Entertainment", "Businesses"): -1.0,
+    ("AI/ML", "Businesses"): 1.5, ("AI/ML", "Startups"): 1.5, ("AI/ML", "Professionals"): 1.0,
+    ("AI/ML", "Seniors"): -1.0,
+    ("GreenTech", "Businesses"): 1.0, ("GreenTech", "Individuals"): 1.0,
+    ("Travel", "Individuals"): 1.5, ("Travel", "Professionals"): 0.5, ("Travel", "Startups"): -0.5,
+}
+
+GOAL_FIT = {  # (technology, goal) -> bonus
+    ("Mobile App", "Go viral"): 1.5, ("AI Tool", "Go viral"): 0.5, ("IoT", "Go viral"): -1.0,
+    ("SaaS Platform", "Generate revenue"): 1.5, ("Blockchain", "Generate revenue"): 0.5,
+    ("AI Tool", "Improve efficiency"): 1.5, ("SaaS Platform", "Improve efficiency"): 1.0, ("IoT", "Improve efficiency"): 1.0,
+    ("VR/AR", "Enhance user experience"): 1.5, ("Mobile App", "Enhance user experience"): 1.0,
+    ("Web App", "Enhance user experience"): 0.5,
+    ("AI Tool", "Disrupt the market"): 1.0, ("Blockchain", "Disrupt the market"): 1.0,
+    ("IoT", "Solve social issues"): 0.5, ("Mobile App", "Solve social issues"): 0.5,
+}
+
+MISSION_FIT = {  # (industry, goal) -> bonus
+    ("GreenTech", "Solve social issues"): 1.5, ("Healthcare", "Solve social issues"): 1.0,
+    ("Education", "Solve social issues"): 1.0, ("Finance", "Generate revenue"): 1.0,
+    ("Entertainment", "Go viral"): 1.5, ("AI/ML", "Improve efficiency"): 1.0, ("Travel", "Enhance user experience"): 1.0,
+}
+
+REGION_FIT = {"Global": 1.0, "US": 1.0, "Europe": 0.5, "India": 0.5, "Asia": 0.5, "Africa": 0.0}
+REGION_INDUSTRY_FIT = {
+    ("Africa", "Finance"): 1.5, ("India", "Education"): 1.0, ("India", "Finance"): 0.5,
+    ("Europe", "GreenTech"): 1.0, ("US", "AI/ML"): 0.5, ("Asia", "Entertainment"): 0.5, ("Global", "Travel"): 0.5,
+}
+
+MONETIZATION_FIT = {  # (audience, option) -> fit
+    ("Students", "Freemium"): 1.5, ("Students", "Ads"): 1.0, ("Students", "Subscription"): -0.5,
+    ("Students", "Licensing"): -1.0, ("Students", "Direct Sales"): -0.5,
+    ("Professionals", "Subscription"): 1.5, ("Professionals", "Freemium"): 0.5, ("Professionals", "Ads"): -0.5,
+    ("Seniors", "Subscription"): 1.0, ("Seniors", "Direct Sales"): 1.0, ("Seniors", "Ads"): -1.0,
+    ("Startups", "Freemium"): 1.0, ("Startups", "Subscription"): 1.0, ("Startups", "Commission"): 0.5,
+    ("Businesses", "Subscription"): 1.5, ("Businesses", "Licensing"): 1.5, ("Businesses", "Commission"): 0.5,
+    ("Businesses", "Ads"): -1.0, ("Businesses", "Freemium"): -0.5,
+    ("Individuals", "Freemium"): 1.0, ("Individuals", "Ads"): 1.0, ("Individuals", "Subscription"): 0.5,
+}
+MONETIZATION_COUNT_FIT = {0: -3.0, 1: 0.0, 2: 0.5, 3: 0.25, 4: -0.5, 5: -1.0, 6: -1.5}  # focus vs. diversity
+
+IDEAL_TEAM = 8
+TEAM_WEIGHT = 0.6
+
+# Axes of the lookup table, in order.
+AXES = ('industry', 'audience', 'tech', 'goal', 'region', 'monetization')
+
+
+def _vocabularies():
+    return (vocabulary.INDUSTRIES, vocabulary.AUDIENCES, vocabulary.TECHNOLOGIES, vocabulary.GOALS, vocabulary.REGIONS)
+
+
+def monetization_mask(options):
+    """Bit mask of a monetization set; bit ``i`` is ``MONETIZATION_OPTIONS[i]``."""
+    return sum(1 << vocabulary.MONETIZATION_OPTIONS.index(option) for option in set(options))
+
+
+def _mask_options(mask):
+    return [option for i, option in enumerate(vocabulary.MONETIZATION_OPTIONS) if mask >> i & 1]
+
+
+def _fit_matrix(np, fit, rows, columns):
+    return np.array([[fit.get((row, column), 0.0) for column in columns] for row in rows], dtype=np.float32)
+
+
+def _build():
+    import numpy as np  # only loaded once the first score is needed
+
+    industries, audiences, technologies, goals, regions = _vocabularies()
+    options = vocabulary.MONETIZATION_OPTIONS
+
+    tech = _fit_matrix(np, TECH_FIT, industries, technologies)                # (I, T)
+    audience = _fit_matrix(np, AUDIENCE_FIT, industries, audiences)           # (I, A)
+    goal = _fit_matrix(np, GOAL_FIT, technologies, goals)                     # (T, G)
+    mission = _fit_matrix(np, MISSION_FIT, industries, goals)                 # (I, G)
+    region = np.array([REGION_FIT[r] for r in regions], dtype=np.float32)    # (R,)
+    region_industry = _fit_matrix(np, REGION_INDUSTRY_FIT, regions, industries).T  # (I, R)
+
+    # Average fit of the chosen options for each audience, plus a bonus or
+    # penalty for how many options there are: (A, M) over all 64 sets.
+    option_fit = _fit_matrix(np, MONETIZATION_FIT, audiences, options)        # (A, O)
+    masks = np.arange(1 << len(options))
+    chosen = ((masks[:, None] >> np.arange(len(options))) & 1).astype(np.float32)  # (M, O)
+    counts = chosen.sum(axis=1)
+    monetization = (option_fit @ chosen.T) / np.maximum(counts, 1)
+    monetization += np.array([MONETIZATION_COUNT_FIT[int(c)] for c in counts], dtype=np.float32)
+
+    table = (
+        audience[:, :, None, None, None, None]
+        + tech[:, None, :, None, None, None]
+        + goal[None, None, :, :, None, None]
+        + mission[:, None, None, :, None, None]
+        + (region[None, :] + region_industry)[:, None, None, None, :, None]
+        + monetization[None, :, None, None, None, :]
+    ).astype(np.float32)                                                     # (I, A, T, G, R, M)
+
+    teams = np.array(TEAM_SIZES, dtype=np.float32)
+    team = (-TEAM_WEIGHT * np.log2(teams / IDEAL_TEAM) ** 2).astype(np.float32)
+
+    low = float(table.min() + team.min())
+    high = float(table.max() + team.max())
+    return np, table, team, low, high
+
+
+_tables = None
+_tables_lock = threading.Lock()
+
+
+def tables():
+    """``(numpy, table, team, low, high)``, built on first use."""
+    global _tables
+    with _tables_lock:
+        if _tables is None:
+            _tables = _build()
+        return _tables
+
+
+def _scale(raw, low, high):
+    bottom, top = SCORE_RANGE
+    return int(round(bottom + (raw - low) / (high - low) * (top - bottom)))
+
+
+def score(industry, audience, tech, goal, monetization, region, team):
+    """Feasibility score of one idea, 0-100."""
+    _, table, team_fit, low, high = tables()
+    raw = table[vocabulary.INDUSTRIES.index(industry), vocabulary.AUDIENCES.index(audience), vocabulary.TECHNOLOGIES.index(tech),
+                vocabulary.GOALS.index(goal), vocabulary.REGIONS.index(region), monetization_mask(monetization)]
+    raw += team_fit[min(max(int(team), 1), len(TEAM_SIZES)) - 1]
+    return _scale(float(raw), low, high)
+
+
+def best_ideas(k=10, industry=None, audience=None, tech=None, goal=None, region=None,
+               monetization=None, team=None):
+    """The ``k`` highest-scoring combinations allowed by the constraints.
+
+    Each categorical constraint is ``None`` (anything) or a list of allowed
+    values.  ``monetization`` is ``None`` (any set of 1 to
+    ``MAX_SEARCH_MONETIZATION`` options) or one exact list of options.
+    ``team`` is ``None`` or an inclusive ``(smallest, largest)`` range.
+    Returns dicts with the selections and their ``score``, best first; ties
+    are broken by the order of the vocabularies.  Every result uses the best
+    team size in the allowed range.
+    """
+    np, table, team_fit, low, high = tables()
+    index = [np.arange(len(values)) if allowed is None else np.array([values.index(v) for v in allowed], dtype=int)
+             for values, allowed in zip(_vocabularies(), (industry, audience, tech, goal, region))]
+    if monetization is None:
+        masks = [m for m in range(1, 1 << len(vocabulary.MONETIZATION_OPTIONS)) if bin(m).count('1') <= MAX_SEARCH_MONETIZATION]
+    else:
+        masks = [monetization_mask(monetization)]
+    index.append(np.array(masks, dtype=int))
+    smallest, largest = team or (TEAM_SIZES[0], TEAM_SIZES[-1])
+    teams = np.arange(max(smallest, 1), min(largest, TEAM_SIZES[-1]) + 1)
+    if k <= 0 or any(len(ix) == 0 for ix in index) or len(teams) == 0:
+        return []
+
+    # Team fit does not depend on the other choices, so every result gets the
+    # best allowed team size and the k results are k distinct combinations.
+    team_size = int(teams[_top(np, team_fit[teams - 1], 1)[0]])
+    flat = table[np.ix_(*index)].ravel()
+    shape = [len(ix) for ix in index]
+    results = []
+    for position in _top(np, flat, k):
+        cell = np.unravel_index(position, shape)
+        i, a, t, g, r, m = (int(ix[c]) for ix, c in zip(index, cell))
+        results.append({
+            'industry': vocabulary.INDUSTRIES[i], 'audience': vocabulary.AUDIENCES[a], 'tech': vocabulary.TECHNOLOGIES[t],
+            'goal': vocabulary.GOALS[g], 'region': vocabulary.REGIONS[r], 'monetization': _mask_options(m),
+            'team': team_size,
+            'score': _scale(float(flat[position] + team_fit[team_size - 1]), low, high),
+        })
+    return results
+
+
+def _top(np, values, k):
+    """Indices of the ``k`` largest values, ties going to the lower index."""
+    if len(values) <= k:
+        return np.arange(len(values))
+    # argpartition picks arbitrarily among ties at the cut, so take every tied value.
+    threshold = np.partition(values, len(values) - k)[len(values) - k]
+    candidates = np.flatnonzero(values >= threshold)
+    return candidates[np.lexsort((candidates, -values[candidates]))[:k]]
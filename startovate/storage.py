@@ -0,0 +1,431 @@
+"""SQLite-backed storage for user accounts and saved ideas.
+
+Every user and every saved idea is its own row, so signing up or saving an
+idea touches a single row instead of rewriting one big JSON file.  The
+database runs in WAL mode, which lets readers keep going while a write
+commits.  On first use the old ``users.json`` / ``saved_ideas.json`` files
+are imported once.
+
+Several app processes (replicas) on one host can share the database file.
+Every write is a ``BEGIN IMMEDIATE`` transaction, so writers from different
+processes queue on SQLite's lock instead of overwriting each other, waiting
+up to ``STARTOVATE_DB_BUSY_TIMEOUT`` milliseconds.  The file must be on a
+local disk; SQLite's locking is not reliable on network filesystems.
+
+Every write to saved ideas also updates the search index (``idea_terms``
+and ``term_counts``, see startovate.terms) in the same transaction.
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+
+from startovate import terms
+from startovate.ideas import Idea, idea_id, with_id
+from startovate.metrics import timed
+
+DB_FILE = os.environ.get("STARTOVATE_DB", "startovate.db")
+BUSY_TIMEOUT_MS = int(os.environ.get("STARTOVATE_DB_BUSY_TIMEOUT", "5000"))
+
+# Legacy JSON files, only read by the one-time migration.
+USER_DATA_FILE = "users.json"
+SAVED_IDEAS_FILE = "saved_ideas.json"
+
+# Each entry upgrades the schema by one version (tracked in PRAGMA user_version).
+MIGRATIONS = [
+    """
+    CREATE TABLE users (
+        username TEXT PRIMARY KEY,
+        name     TEXT NOT NULL,
+        email    TEXT NOT NULL,
+        password TEXT NOT NULL
+    );
+    CREATE TABLE ideas (
+        id       INTEGER PRIMARY KEY,
+        username TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        data     TEXT NOT NULL,
+        UNIQUE (username, position)
+    );
+    """,
+    """
+    CREATE TABLE meta (
+        key   TEXT PRIMARY KEY,
+        value INTEGER NOT NULL
+    );
+    INSERT INTO meta (key, value) VALUES ('version', 0);
+    """,
+    """
+    CREATE TABLE outbox (
+        id              INTEGER PRIMARY KEY,
+        to_email        TEXT NOT NULL,
+        subject         TEXT NOT NULL,
+        body            TEXT NOT NULL,
+        status          TEXT NOT NULL DEFAULT 'pending',
+        attempts        INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        claimed_at      REAL,
+        last_error      TEXT,
+        created_at      REAL NOT NULL,
+        sent_at         REAL
+    );
+    CREATE INDEX outbox_due ON outbox (status, next_attempt_at);
+    """,
+    # Ideas are addressed by a stable id instead of their list position.
+    """
+    CREATE TABLE ideas_v4 (
+        id       INTEGER PRIMARY KEY,
+        username TEXT NOT NULL,
+        idea_id  TEXT NOT NULL,
+        position INTEGER NOT NULL,
+        data     TEXT NOT NULL,
+        UNIQUE (username, idea_id)
+    );
+    CREATE INDEX ideas_by_position ON ideas_v4 (username, position);
+    """,
+    # Search index over every user's ideas: a term's ideas in score order.
+    """
+    CREATE TABLE idea_terms (
+        term  TEXT NOT NULL,
+        score INTEGER NOT NULL,
+        idea  INTEGER NOT NULL,
+        PRIMARY KEY (term, score, idea)
+    ) WITHOUT ROWID;
+    CREATE TABLE term_counts (
+        term  TEXT PRIMARY KEY,
+        ideas INTEGER NOT NULL
+    ) WITHOUT ROWID;
+    """,
+]
+
+_local = threading.local()
+
+
+def _load_json(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _import_legacy_json(conn):
+    users = _load_json(USER_DATA_FILE)
+    conn.executemany(
+        "INSERT OR IGNORE INTO users (username, name, email, password) VALUES (?, ?, ?, ?)",
+        [(username, u['name'], u['email'], u['password']) for username, u in users.items()],
+    )
+    all_saved_ideas = _load_json(SAVED_IDEAS_FILE)
+    conn.executemany(
+        "INSERT OR IGNORE INTO ideas (username, position, data) VALUES (?, ?, ?)",
+        [
+            (username, position, json.dumps(idea))
+            for username, ideas in all_saved_ideas.items()
+            for position, idea in enumerate(ideas)
+        ],
+    )
+
+
+def _assign_idea_ids(conn):
+    rows = conn.execute("SELECT username, position, data FROM ideas ORDER BY username, position")
+    taken = set()
+    for username, position, data in rows.fetchall():
+        idea = json.loads(data)
+        new_id = idea_id(idea)
+        if (username, new_id) in taken:
+            # The same idea was saved twice before duplicates were detected.
+            new_id = f"{new_id}-{position}"
+        taken.add((username, new_id))
+        idea['id'] = new_id
+        conn.execute(
+            "INSERT INTO ideas_v4 (username, idea_id, position, data) VALUES (?, ?, ?, ?)",
+            (username, new_id, position, json.dumps(idea)),
+        )
+    conn.execute("DROP TABLE ideas")
+    conn.execute("ALTER TABLE ideas_v4 RENAME TO ideas")
+
+
+def _index_score(idea):
+    score = idea.get('score')
+    return score if isinstance(score, int) else 0
+
+
+def _postings(rows):
+    postings = set()
+    for rowid, idea in rows:
+        score = _index_score(idea)
+        postings.update((term, score, rowid) for term in terms.idea_terms(idea))
+    return postings
+
+
+def _update_index(conn, removed=(), added=()):
+    """Swap the index terms of the ``removed`` (rowid, idea) rows for those of ``added``.
+
+    Only postings that differ are written, so editing a tagline touches a few rows.
+    """
+    old, new = _postings(removed), _postings(added)
+    old, new = old - new, new - old
+    conn.executemany("DELETE FROM idea_terms WHERE term = ? AND score = ? AND idea = ?", sorted(old))
+    conn.executemany("INSERT OR IGNORE INTO idea_terms (term, score, idea) VALUES (?, ?, ?)", sorted(new))
+    counts = Counter(term for term, _, _ in new)
+    counts.subtract(term for term, _, _ in old)
+    conn.executemany(
+        "INSERT INTO term_counts (term, ideas) VALUES (?, ?) "
+        "ON CONFLICT (term) DO UPDATE SET ideas = ideas + excluded.ideas",
+        [(term, count) for term, count in counts.items() if count],
+    )
+
+
+def rebuild_search_index(conn):
+    """Index every saved idea from scratch (inside the caller's transaction)."""
+    conn.execute("DELETE FROM idea_terms")
+    conn.execute("DELETE FROM term_counts")
+    rows = conn.execute("SELECT id, data FROM ideas ORDER BY id")
+    while True:
+        batch = rows.fetchmany(10_000)
+        if not batch:
+            break
+        _update_index(conn, added=[(rowid, json.loads(data)) for rowid, data in batch])
+
+
+# Data migrations that run right after the schema change of the same version.
+POST_MIGRATIONS = {
+    1: _import_legacy_json,
+    4: _assign_idea_ids,
+    5: rebuild_search_index,
+}
+
+
+def _migrate(conn):
+    # New connections are opened on every Streamlit rerun thread, so the
+    # up-to-date case must not take the write lock.
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= len(MIGRATIONS):
+        return
+    with transaction(conn, bump=False):
+        # Checked again under the lock: another connection may have migrated meanwhile.
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for target in range(version + 1, len(MIGRATIONS) + 1):
+            for statement in MIGRATIONS[target - 1].split(';'):
+                if statement.strip():
+                    conn.execute(statement)
+            if target in POST_MIGRATIONS:
+                POST_MIGRATIONS[target](conn)
+            conn.execute(f"PRAGMA user_version = {target}")
+
+
+def connect():
+    """Return this thread's connection, opening and migrating it on first use."""
+    conn = getattr(_local, 'conn', None)
+    if conn is None or _local.path != DB_FILE:
+        conn = sqlite3.connect(DB_FILE, isolation_level=None, check_same_thread=False)
+        # Set first: switching to WAL needs a lock that another replica may hold.
+        conn.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        _migrate(conn)
+        _local.conn = conn
+        _local.path = DB_FILE
+    return conn
+
+
+@contextmanager
+def transaction(conn=None, bump=True):
+    """Run a block as one atomic write transaction.
+
+    Unless ``bump`` is False the storage version is incremented in the same
+    transaction, so caches in any process can tell that something changed.
+    """
+    conn = conn or connect()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+        if bump:
+            conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+def version():
+    """Counter bumped by every committed write."""
+    return connect().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+
+def signature():
+    """Cheap on-disk fingerprint (two stat calls) that changes whenever a write lands."""
+    fingerprint = []
+    for path in (DB_FILE, DB_FILE + '-wal'):
+        try:
+            st = os.stat(path)
+            fingerprint.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            fingerprint.append(None)
+    return tuple(fingerprint)
+
+
+# --- USERS ---
+
+@timed("storage.load_user_data")
+def load_user_data():
+    rows = connect().execute("SELECT username, name, email, password FROM users")
+    return {username: {'name': name, 'email': email, 'password': password}
+            for username, name, email, password in rows}
+
+
+@timed("storage.add_user")
+def add_user(username, name, email, password_hash):
+    """Create an account; returns False if the username is already taken."""
+    try:
+        with transaction() as conn:
+            conn.execute(
+                "INSERT INTO users (username, name, email, password) VALUES (?, ?, ?, ?)",
+                (username, name, email, password_hash),
+            )
+    except sqlite3.IntegrityError:
+        return False
+    return True
+
+
+# --- SAVED IDEAS ---
+# Every stored idea carries its ``id`` both in the JSON and in the indexed
+# idea_id column; see startovate.ideas.idea_id.  Ideas are read back as
+# startovate.ideas.Idea records, which write out the same JSON.
+
+@timed("storage.load_saved_ideas")
+def load_saved_ideas(username):
+    rows = connect().execute(
+        "SELECT data FROM ideas WHERE username = ? ORDER BY position", (username,)
+    )
+    return [Idea.from_json(data) for (data,) in rows]
+
+
+@timed("storage.add_idea")
+def add_idea(username, idea):
+    """Append one idea to the user's gallery and return it with its id.
+
+    Saving an idea that is already in the gallery is a no-op.
+    """
+    idea = with_id(idea)
+    with transaction() as conn:
+        cursor = conn.execute(
+            """
+            INSERT OR IGNORE INTO ideas (username, idea_id, position, data)
+            SELECT ?, ?, COALESCE(MAX(position) + 1, 0), ? FROM ideas WHERE username = ?
+            """,
+            (username, idea['id'], idea.to_json(), username),
+        )
+        if cursor.rowcount:
+            _update_index(conn, added=[(cursor.lastrowid, idea)])
+    return idea
+
+
+@timed("storage.update_idea")
+def update_idea(username, idea):
+    """Replace the stored idea that has the same id and return it as an ``Idea``."""
+    idea = Idea.from_mapping(idea)
+    with transaction() as conn:
+        row = conn.execute(
+            "SELECT id, data FROM ideas WHERE username = ? AND idea_id = ?", (username, idea['id'])
+        ).fetchone()
+        if row is not None:
+            conn.execute("UPDATE ideas SET data = ? WHERE id = ?", (idea.to_json(), row[0]))
+            _update_index(conn, removed=[(row[0], json.loads(row[1]))], added=[(row[0], idea)])
+    return idea
+
+
+@timed("storage.delete_idea")
+def delete_idea(username, idea_id):
+    with transaction() as conn:
+        row = conn.execute(
+            "SELECT id, data FROM ideas WHERE username = ? AND idea_id = ?", (username, idea_id)
+        ).fetchone()
+        if row is not None:
+            conn.execute("DELETE FROM ideas WHERE id = ?", (row[0],))
+            _update_index(conn, removed=[(row[0], json.loads(row[1]))])
+
+
+@timed("storage.save_saved_ideas")
+def save_saved_ideas(username, ideas):
+    """Make the stored gallery match ``ideas``, writing only the rows that changed.
+
+    Returns the ideas with ids assigned to any that did not have one yet.
+    """
+    ideas = [with_id(idea) for idea in ideas]
+    with transaction() as conn:
+        stored = {stored_id: (rowid, position, data) for rowid, stored_id, position, data in conn.execute(
+            "SELECT id, idea_id, position, data FROM ideas WHERE username = ?", (username,)
+        )}
+        wanted = {idea['id'] for idea in ideas}
+        removed = [stored[old_id] for old_id in stored.keys() - wanted]
+        conn.executemany("DELETE FROM ideas WHERE id = ?", [(rowid,) for rowid, _, _ in removed])
+        unindex = [(rowid, json.loads(data)) for rowid, _, data in removed]
+        index = []
+        for position, idea in enumerate(ideas):
+            data = idea.to_json()
+            if idea['id'] not in stored:
+                cursor = conn.execute(
+                    "INSERT INTO ideas (username, idea_id, position, data) VALUES (?, ?, ?, ?)",
+                    (username, idea['id'], position, data),
+                )
+                index.append((cursor.lastrowid, idea))
+                continue
+            rowid, old_position, old_data = stored[idea['id']]
+            if (old_position, old_data) != (position, data):
+                conn.execute("UPDATE ideas SET position = ?, data = ? WHERE id = ?", (position, data, rowid))
+            if old_data != data:
+                unindex.append((rowid, json.loads(old_data)))
+                index.append((rowid, idea))
+        # The search index changes with the gallery, in the same transaction.
+        _update_index(conn, removed=unindex, added=index)
+    return ideas
+
+
+# --- SEARCH ---
+
+@timed("storage.search_ideas")
+def search_ideas(groups, score_range=None, limit=10, offset=0):
+    """Saved ideas of every user that have a term of each group, best score first.
+
+    The smallest single-term group drives the query: its postings are read in
+    score order and each is checked against the other groups by primary key,
+    so a page costs about ``offset + limit`` rows divided by how many of the
+    driving term's ideas match, not the size of the index.
+    """
+    groups = [sorted(set(group)) for group in groups] or [[terms.ALL]]
+    conn = connect()
+    wanted = sorted({term for group in groups for term in group})
+    counts = dict(conn.execute(
+        f"SELECT term, ideas FROM term_counts WHERE term IN ({', '.join('?' * len(wanted))})", wanted
+    ))
+    sizes = [sum(counts.get(term, 0) for term in group) for group in groups]
+    if min(sizes) <= 0:
+        return []
+    single = [i for i, group in enumerate(groups) if len(group) == 1]
+    driver = min(single or range(len(groups)), key=sizes.__getitem__)
+
+    def term_in(group):
+        return f"term IN ({', '.join('?' * len(group))})"
+
+    sql = [f"SELECT {'DISTINCT ' if len(groups[driver]) > 1 else ''}p.score, p.idea FROM idea_terms p "
+           f"WHERE p.{term_in(groups[driver])}"]
+    params = list(groups[driver])
+    if score_range is not None:
+        sql.append("AND p.score BETWEEN ? AND ?")
+        params.extend(score_range)
+    for i, group in enumerate(groups):
+        if i != driver:
+            sql.append(f"AND EXISTS (SELECT 1 FROM idea_terms q WHERE q.{term_in(group)} "
+                       "AND q.score = p.score AND q.idea = p.idea)")
+            params.extend(group)
+    sql.append("ORDER BY p.score DESC, p.idea DESC LIMIT ? OFFSET ?")
+    params.extend((limit, offset))
+    rowids = [rowid for _, rowid in conn.execute(' '.join(sql), params)]
+    if not rowids:
+        return []
+    rows = dict(conn.execute(
+        f"SELECT id, data FROM ideas WHERE id IN ({', '.join('?' * len(rowids))})", rowids
+    ))
+    return [Idea.from_json(rows[rowid]) for rowid in rowids]
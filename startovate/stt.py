@@ -0,0 +1,164 @@
+"""Speech recognition of audio recorded in the browser.
+
+Recordings arrive as WAV bytes from ``st.audio_input``.  They are
+transcribed on a small thread pool, so the page script never blocks on a
+microphone or a network call.  Every job has a deadline, and at most
+``PHRASE_TIME_LIMIT`` seconds of audio are transcribed.  Jobs nobody
+collected are dropped ``RESULT_GRACE`` seconds after their deadline, and a
+job that timed out before a worker picked it up is cancelled.  Results are cached
+by a hash of the audio and the backend name.
+
+The backend is chosen with ``STARTOVATE_STT_BACKEND``.  ``google`` needs the
+network.  ``sphinx`` (PocketSphinx) and ``vosk`` (model in ``./model``) run
+offline.  Other engines can be added with ``register_backend``.
+"""
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from startovate.metrics import timed
+
+BACKEND = os.environ.get("STARTOVATE_STT_BACKEND", "google")
+TIMEOUT = float(os.environ.get("STARTOVATE_STT_TIMEOUT", "15"))
+PHRASE_TIME_LIMIT = float(os.environ.get("STARTOVATE_STT_PHRASE_TIME_LIMIT", "30"))
+WORKERS = 2
+CACHE_SIZE = 256
+RESULT_GRACE = 10.0  # seconds a job is kept after its deadline for the page to read it
+
+
+def _speech_recognition_backend(method_name):
+    def recognize(recognizer, audio):
+        return getattr(recognizer, method_name)(audio)
+    return recognize
+
+
+def _vosk(recognizer, audio):
+    # recognize_vosk returns the engine's raw JSON rather than plain text.
+    return json.loads(recognizer.recognize_vosk(audio)).get('text', '')
+
+
+BACKENDS = {
+    'google': _speech_recognition_backend('recognize_google'),
+    'sphinx': _speech_recognition_backend('recognize_sphinx'),
+    'vosk': _vosk,
+}
+
+
+def register_backend(name, recognize):
+    """Add a backend: ``recognize(recognizer, audio_data) -> text``."""
+    BACKENDS[name] = recognize
+
+
+@timed("stt.transcribe", kind='external')
+def transcribe(wav_bytes, backend=BACKEND, timeout=TIMEOUT, phrase_time_limit=PHRASE_TIME_LIMIT):
+    """Transcribe WAV bytes synchronously; returns ``(text, error)``."""
+    import speech_recognition as sr  # loaded on the first recording, not on app start-up
+
+    r = sr.Recognizer()
+    r.operation_timeout = timeout  # bounds network backends
+    with sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+        audio = r.record(source, duration=phrase_time_limit)
+    try:
+        return BACKENDS[backend](r, audio), None
+    except sr.UnknownValueError:
+        return "", "Could not understand audio. Please try again."
+    except sr.RequestError as e:
+        return "", f"Could not request results from the {backend} speech recognition service; {e}"
+
+
+class Recognizer:
+    """Background transcription jobs with deadlines and a result cache."""
+
+    def __init__(self, backend=BACKEND, workers=WORKERS, timeout=TIMEOUT):
+        self.backend = backend
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="stt")
+        self._lock = threading.RLock()
+        self._jobs = {}             # job id -> (future, cache key, deadline)
+        self._running = set()       # futures still queued or on a worker, collected or not
+        self._cache = OrderedDict()  # audio hash -> (text, error)
+
+    def submit(self, wav_bytes):
+        key = hashlib.sha256(self.backend.encode() + b'\0' + wav_bytes).hexdigest()
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._prune()
+            deadline = time.time() + self.timeout
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                future = Future()
+                future.set_result(self._cache[key])
+                self._jobs[job_id] = (future, key, deadline)
+                return job_id
+            future = self._executor.submit(transcribe, wav_bytes, self.backend, self.timeout)
+            self._running.add(future)
+            future.add_done_callback(lambda f: self._store(key, f))
+            self._jobs[job_id] = (future, key, deadline)
+        return job_id
+
+    def _store(self, key, future):
+        with self._lock:
+            self._running.discard(future)
+            if future.cancelled() or future.exception() is not None:
+                return
+            self._cache[key] = future.result()
+            while len(self._cache) > CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def _prune(self):
+        """Drop jobs ``RESULT_GRACE`` seconds past their deadline; callers hold the lock."""
+        now = time.time()
+        for job_id, (future, _, deadline) in list(self._jobs.items()):
+            if now > deadline + RESULT_GRACE:
+                future.cancel()
+                del self._jobs[job_id]
+
+    def job(self, job_id):
+        """``{'status': 'running' | 'done' | 'timeout' | 'failed', 'text', 'error'}``"""
+        with self._lock:
+            entry = self._jobs.get(job_id)
+            if entry is None:
+                return None
+        future, key, deadline = entry
+        if future.done():
+            if future.cancelled():
+                return {'status': 'timeout', 'text': "", 'error': f"Speech recognition took longer than {self.timeout:.0f} s."}
+            if future.exception() is not None:
+                return {'status': 'failed', 'text': "", 'error': str(future.exception())}
+            text, error = future.result()
+            return {'status': 'done', 'text': text, 'error': error}
+        if time.time() > deadline:
+            # Still queued behind other jobs: give its place back.  A job already on a
+            # worker cannot be stopped, but transcribe bounds it with the same timeout.
+            future.cancel()
+            return {'status': 'timeout', 'text': "", 'error': f"Speech recognition took longer than {self.timeout:.0f} s."}
+        return {'status': 'running', 'text': "", 'error': None}
+
+    def pending(self):
+        """Transcriptions queued or running, including ones whose job was dropped."""
+        with self._lock:
+            self._prune()
+            return len(self._running)
+
+    def forget(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+
+_recognizer = None
+_recognizer_lock = threading.Lock()
+
+
+def recognizer():
+    """The process-wide recognizer, created on first use."""
+    global _recognizer
+    with _recognizer_lock:
+        if _recognizer is None:
+            _recognizer = Recognizer()
+        return _recognizer
@@ -0,0 +1,51 @@
+"""Search terms of saved ideas, shared by the search index and Discover.
+
+An idea's terms are its words (name, tagline, idea text and selections,
+lower-cased), one term per facet value (``industry:Healthcare``,
+``monetization:Ads``...) and ``*``, which every idea has.  A search is an
+AND of groups, each an OR of terms: one group per keyword and one per facet
+with selected values.
+"""
+import re
+
+FACETS = ('industry', 'audience', 'tech', 'goal', 'region', 'monetization')
+ALL = '*'
+STOPWORDS = frozenset(
+    "a an and are as at based be by for from in into is it of on or the their through to using with your".split()
+)
+_WORD = re.compile(r"[A-Za-z0-9]+")
+_CAMEL = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+")
+
+
+def keywords(text):
+    """Searchable words of ``text``: lower-cased, without stopwords, with CamelCase names also split."""
+    words = set()
+    for word in _WORD.findall(text):
+        words.add(word.lower())
+        parts = _CAMEL.findall(word)
+        if len(parts) > 1:
+            words.update(part.lower() for part in parts)
+    return {word for word in words if len(word) > 1 and word not in STOPWORDS}
+
+
+def idea_terms(idea):
+    """Every index term of ``idea``."""
+    terms = {ALL}
+    text = [str(idea.get('name', '')), str(idea.get('tagline', '')), str(idea.get('idea', ''))]
+    for facet in FACETS:
+        value = idea.get(facet)
+        for item in (value if isinstance(value, list) else [value] if value is not None else []):
+            terms.add(f"{facet}:{item}")
+            text.append(str(item))
+    terms.update(keywords(' '.join(text)))
+    return terms
+
+
+def query_groups(text="", **facets):
+    """The term groups of a search: all must match, any term of a group will do."""
+    groups = [[word] for word in sorted(keywords(text))]
+    for facet in FACETS:
+        values = facets.get(facet)
+        if values:
+            groups.append([f"{facet}:{value}" for value in values])
+    return groups
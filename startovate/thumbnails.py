@@ -0,0 +1,91 @@
+"""Gallery thumbnails drawn locally with Pillow.
+
+Each thumbnail is a gradient in the industry's colours, with a few
+soft shapes and the startup name on top.  Everything is derived from a hash
+of the name and industry, so the same idea always gets the same picture.
+Files are written once under that hash to ``STARTOVATE_THUMBNAIL_DIR``
+(``.thumbnail_cache`` by default, outside the app's source tree, which may
+be read-only), and Streamlit serves them from there, so showing a gallery
+never calls out to the network.
+"""
+import hashlib
+import io
+import os
+import tempfile
+
+THUMBNAIL_DIR = os.environ.get("STARTOVATE_THUMBNAIL_DIR", ".thumbnail_cache")
+SIZE = (400, 200)
+STYLE_VERSION = 1  # bump when the drawing changes, so cached files are not reused
+
+INDUSTRY_COLOURS = {  # (start, end) of the gradient
+    "Healthcare": ((0, 150, 136), (129, 212, 250)),
+    "Education": ((63, 81, 181), (179, 157, 219)),
+    "Finance": ((27, 94, 32), (255, 213, 79)),
+    "Entertainment": ((194, 24, 91), (255, 171, 64)),
+    "AI/ML": ((49, 27, 146), (0, 229, 255)),
+    "GreenTech": ((46, 125, 50), (205, 220, 57)),
+    "Travel": ((2, 119, 189), (255, 138, 101)),
+}
+DEFAULT_COLOURS = ((69, 90, 100), (176, 190, 197))
+
+
+def thumbnail_key(name, industry):
+    return hashlib.sha256(f"{STYLE_VERSION}\n{name}\n{industry}".encode()).hexdigest()[:20]
+
+
+def render_thumbnail(name, industry):
+    """PNG bytes of the thumbnail for ``name`` in ``industry``."""
+    # Pillow is only loaded when a thumbnail has to be drawn.
+    from PIL import Image, ImageDraw, ImageFilter, ImageFont
+
+    digest = hashlib.sha256(f"{name}\n{industry}".encode()).digest()
+    width, height = SIZE
+    start, end = INDUSTRY_COLOURS.get(industry, DEFAULT_COLOURS)
+
+    # Gradient at an angle that comes from the name.  It is drawn on a square
+    # wider than the thumbnail's diagonal, so the rotated corners are cropped off.
+    side = int((width ** 2 + height ** 2) ** 0.5) + 2
+    mask = Image.linear_gradient('L').resize((side, side)).rotate(digest[0] * 360 / 256)
+    left, top = (side - width) // 2, (side - height) // 2
+    mask = mask.crop((left, top, left + width, top + height))
+    image = Image.composite(Image.new('RGB', SIZE, end), Image.new('RGB', SIZE, start), mask)
+
+    shapes = Image.new('RGBA', SIZE, (0, 0, 0, 0))
+    draw = ImageDraw.Draw(shapes)
+    for i in range(4):
+        x, y, r = digest[1 + 3 * i] * width // 256, digest[2 + 3 * i] * height // 256, 30 + digest[3 + 3 * i] // 3
+        draw.ellipse((x - r, y - r, x + r, y + r), fill=(255, 255, 255, 40))
+    image = Image.alpha_composite(image.convert('RGBA'), shapes.filter(ImageFilter.GaussianBlur(6)))
+
+    draw = ImageDraw.Draw(image)
+    title = ImageFont.load_default(size=40)
+    caption = ImageFont.load_default(size=18)
+    draw.text((24, height - 86), name, font=title, fill=(255, 255, 255, 255),
+              stroke_width=2, stroke_fill=(0, 0, 0, 90))
+    draw.text((26, height - 38), industry, font=caption, fill=(255, 255, 255, 220))
+
+    buffer = io.BytesIO()
+    image.convert('RGB').save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def _write(path, data):
+    os.makedirs(THUMBNAIL_DIR, exist_ok=True)
+    # Replicas may draw the same thumbnail at once; never serve a half-written file.
+    fd, tmp_path = tempfile.mkstemp(suffix='.png', dir=THUMBNAIL_DIR)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def thumbnail_path(name, industry):
+    """Path of the thumbnail's PNG file, drawing it when it is not on disk.
+
+    Not memoized: the file is checked on every call (one ``stat``), so a cleaned
+    cache directory is filled again instead of serving missing files.
+    """
+    key = thumbnail_key(name, industry)
+    path = os.path.join(THUMBNAIL_DIR, f"{key}.png")
+    if not os.path.exists(path):
+        _write(path, render_thumbnail(name, industry))
+    return path
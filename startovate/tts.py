@@ -0,0 +1,355 @@
+"""Text-to-speech narration rendered to audio files by worker processes.
+
+Narration is written to a WAV file with pyttsx3's ``save_to_file``, so it can
+be streamed to the user's browser instead of playing on the server.  Files
+are cached on disk, keyed by a hash of the cleaned text and the voice
+settings, so narrating the same idea twice is instant.
+
+pyttsx3 engines run an event loop that cannot be shared between threads, so
+each engine lives in its own worker process (``STARTOVATE_TTS_WORKERS`` of
+them).  Requests go through a queue, ``job`` reports a request's status, and
+``stats`` reports queue depth and latency.
+
+Long narration goes through ``narrate``, which splits the text into
+sentences and queues each one as its own job, first sentence first.  The
+first sentence can be played while the rest are synthesized, and sentences
+that several narrations share (a section that only depends on the team size
+or the monetization, say) are synthesized once.  When every sentence is
+ready they are joined into one file, cached like any other narration.
+Time to first audio and total time are measured separately.
+"""
+import hashlib
+import os
+import queue
+import re
+import tempfile
+import threading
+import time
+import uuid
+import wave
+from collections import deque
+
+from startovate.metrics import metrics
+
+CACHE_DIR = os.environ.get("STARTOVATE_TTS_CACHE_DIR", ".tts_cache")
+VOICE_SETTINGS = {'voice': 'en-female', 'rate': 170}
+
+WORKERS = int(os.environ.get("STARTOVATE_TTS_WORKERS", "1"))
+JOB_RETENTION = 3600  # seconds a finished job's status stays queryable
+
+_engine = None  # one per worker process
+
+
+def clean_text_for_tts(text):
+    # Remove markdown for better narration
+    cleaned_text = re.sub(r'[*_`]', '', text)
+    return cleaned_text
+
+
+_SENTENCE_END = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9])')
+
+
+def split_sentences(text):
+    """The sentences of ``text``, cleaned for narration, in order."""
+    return [sentence for sentence in _SENTENCE_END.split(clean_text_for_tts(text).strip()) if sentence]
+
+
+def _init_engine():
+    # Imported in the worker processes only; the app process never loads pyttsx3.
+    import pyttsx3
+
+    engine = pyttsx3.init()
+    voices = engine.getProperty('voices')
+    # Try to find an English female voice, otherwise use default
+    female_voice = next((v for v in voices if 'en' in v.id and 'female' in v.name.lower()), None)
+    if female_voice:
+        engine.setProperty('voice', female_voice.id)
+    engine.setProperty('rate', VOICE_SETTINGS['rate'])
+    return engine
+
+
+def audio_path(text):
+    """Where the narration of ``text`` is (or will be) cached."""
+    settings = ','.join(f"{key}={value}" for key, value in sorted(VOICE_SETTINGS.items()))
+    key = hashlib.sha256(f"{settings}\n{clean_text_for_tts(text)}".encode()).hexdigest()
+    return os.path.join(CACHE_DIR, f"{key}.wav")
+
+
+def _synthesize(text, path):
+    global _engine
+    if _engine is None:
+        _engine = _init_engine()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Render to a temporary name first so a half-written file is never served.
+    fd, tmp_path = tempfile.mkstemp(suffix='.wav', dir=CACHE_DIR)
+    os.close(fd)
+    try:
+        _engine.save_to_file(clean_text_for_tts(text), tmp_path)
+        _engine.runAndWait()
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def duration(path):
+    """Length of the WAV file at ``path`` in seconds."""
+    with wave.open(path, 'rb') as f:
+        return f.getnframes() / f.getframerate()
+
+
+def _join_wavs(paths, path):
+    """Write the audio of ``paths``, one after the other, to ``path``."""
+    fd, tmp_path = tempfile.mkstemp(suffix='.wav', dir=os.path.dirname(path) or '.')
+    os.close(fd)
+    try:
+        with wave.open(tmp_path, 'wb') as out:
+            for i, part in enumerate(paths):
+                with wave.open(part, 'rb') as f:
+                    if i == 0:
+                        out.setparams(f.getparams())
+                    out.writeframes(f.readframes(f.getnframes()))
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+
+def _worker_main(worker_index, requests, results):
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        job_id, text, path = request
+        results.put(('started', job_id, worker_index, time.time(), None))
+        try:
+            _synthesize(text, path)
+        except Exception as e:
+            results.put(('failed', job_id, worker_index, time.time(), str(e)))
+        else:
+            results.put(('done', job_id, worker_index, time.time(), None))
+
+
+class TTSService:
+    """Pool of TTS worker processes fed by a request queue."""
+
+    def __init__(self, workers=WORKERS):
+        import multiprocessing
+
+        self.workers = workers
+        self._context = multiprocessing.get_context("spawn")
+        self._requests = self._context.Queue()
+        self._results = self._context.Queue()
+        self._lock = threading.Lock()
+        self._jobs = {}        # job id -> job dict
+        self._in_flight = {}   # audio path -> job id, so identical requests share one synthesis
+        self._running = {}     # worker index -> job id
+        self._narrations = {}  # narration id -> narration dict
+        self._latencies = deque(maxlen=500)
+        self._narration_latencies = deque(maxlen=500)  # (time to first audio, total)
+        self._processes = [self._spawn(i) for i in range(workers)]
+        threading.Thread(target=self._collect, name="tts-results", daemon=True).start()
+
+    def _spawn(self, worker_index):
+        process = self._context.Process(
+            target=_worker_main, args=(worker_index, self._requests, self._results), daemon=True
+        )
+        process.start()
+        return process
+
+    def submit(self, text):
+        """Queue ``text`` for narration and return a job id."""
+        path = audio_path(text)
+        now = time.time()
+        with self._lock:
+            self._prune(now)
+            if path in self._in_flight:
+                return self._in_flight[path]
+            job_id = uuid.uuid4().hex
+            job = {'id': job_id, 'path': path, 'status': 'queued', 'error': None,
+                   'submitted_at': now, 'started_at': None, 'finished_at': None}
+            self._jobs[job_id] = job
+            if os.path.exists(path):
+                job.update(status='done', started_at=now, finished_at=now)
+                return job_id
+            self._in_flight[path] = job_id
+        self._requests.put((job_id, text, path))
+        return job_id
+
+    def job(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def narrate(self, text):
+        """Queue ``text`` sentence by sentence and return a narration id."""
+        path = audio_path(text)
+        now = time.time()
+        narration_id = uuid.uuid4().hex
+        narration = {'id': narration_id, 'path': path, 'status': 'running', 'error': None, 'chunks': [],
+                     'submitted_at': now, 'first_audio_at': None, 'finished_at': None}
+        if os.path.exists(path):
+            narration.update(status='done', first_audio_at=now, finished_at=now)
+        else:
+            narration['chunks'] = [self.submit(sentence) for sentence in split_sentences(text) or [text]]
+        with self._lock:
+            self._prune(now)
+            self._narrations[narration_id] = narration
+        self._advance([narration_id])
+        return narration_id
+
+    def narration(self, narration_id):
+        """Status of a narration, with the paths of its sentences that can be played in order."""
+        with self._lock:
+            narration = self._narrations.get(narration_id)
+            if narration is None:
+                return None
+            result = dict(narration, ready=[])
+            for job_id in narration['chunks']:
+                job = self._jobs.get(job_id)
+                if job is None or job['status'] != 'done':
+                    break
+                result['ready'].append(job['path'])
+            return result
+
+    def _advance(self, narration_ids):
+        """Move narrations along once their sentences are ready, joining the finished ones."""
+        to_join = []
+        with self._lock:
+            for narration_id in narration_ids:
+                narration = self._narrations.get(narration_id)
+                if narration is None or narration['status'] != 'running':
+                    continue
+                jobs = [self._jobs.get(job_id) for job_id in narration['chunks']]
+                if any(job is None for job in jobs):
+                    narration.update(status='failed', finished_at=time.time(), error="Narration expired")
+                    continue
+                failed = next((job for job in jobs if job['status'] == 'failed'), None)
+                if failed is not None:
+                    narration.update(status='failed', finished_at=time.time(), error=failed['error'])
+                    continue
+                if narration['first_audio_at'] is None and jobs[0]['status'] == 'done':
+                    narration['first_audio_at'] = max(jobs[0]['finished_at'], narration['submitted_at'])
+                    metrics.observe("tts.first_audio", narration['first_audio_at'] - narration['submitted_at'],
+                                    'external')
+                if all(job['status'] == 'done' for job in jobs):
+                    narration['status'] = 'joining'
+                    to_join.append((narration, [job['path'] for job in jobs]))
+        # Joining reads and writes files, so it happens outside the lock.
+        for narration, paths in to_join:
+            try:
+                _join_wavs(paths, narration['path'])
+            except Exception as e:
+                status, error = 'failed', str(e)
+            else:
+                status, error = 'done', None
+            finished_at = time.time()
+            with self._lock:
+                narration.update(status=status, error=error, finished_at=finished_at)
+                if status == 'done':
+                    metrics.observe("tts.narration", finished_at - narration['submitted_at'], 'external')
+                    self._narration_latencies.append((
+                        narration['first_audio_at'] - narration['submitted_at'],
+                        finished_at - narration['submitted_at'],
+                    ))
+
+    def _prune(self, now):
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job['finished_at'] and now - job['finished_at'] > JOB_RETENTION]
+        for job_id in expired:
+            del self._jobs[job_id]
+        expired = [narration_id for narration_id, narration in self._narrations.items()
+                   if narration['finished_at'] and now - narration['finished_at'] > JOB_RETENTION]
+        for narration_id in expired:
+            del self._narrations[narration_id]
+
+    def _finish(self, job_id, status, finished_at, error=None):
+        job = self._jobs.get(job_id)
+        if job is None or job['status'] in ('done', 'failed'):
+            return
+        job.update(status=status, finished_at=finished_at, error=error)
+        self._in_flight.pop(job['path'], None)
+        if job['started_at']:
+            metrics.observe("tts.synthesis", finished_at - job['started_at'], 'external')
+        self._latencies.append((
+            (job['started_at'] or finished_at) - job['submitted_at'],
+            finished_at - job['submitted_at'],
+        ))
+
+    def _collect(self):
+        while True:
+            try:
+                event, job_id, worker_index, at, error = self._results.get(timeout=1)
+            except queue.Empty:
+                self._restart_dead_workers()
+                continue
+            except (EOFError, OSError):
+                return  # the queue was closed: the process is exiting
+            with self._lock:
+                if event == 'started':
+                    self._running[worker_index] = job_id
+                    if job_id in self._jobs:
+                        self._jobs[job_id].update(status='running', started_at=at)
+                    continue
+                self._running.pop(worker_index, None)
+                self._finish(job_id, event, at, error)
+                waiting = [narration_id for narration_id, narration in self._narrations.items()
+                           if narration['status'] == 'running' and job_id in narration['chunks']]
+            self._advance(waiting)
+
+    def _restart_dead_workers(self):
+        with self._lock:
+            for i, process in enumerate(self._processes):
+                if not process.is_alive():
+                    job_id = self._running.pop(i, None)
+                    if job_id:
+                        self._finish(job_id, 'failed', time.time(), "TTS worker exited unexpectedly")
+                    self._processes[i] = self._spawn(i)
+            waiting = [narration_id for narration_id, narration in self._narrations.items()
+                       if narration['status'] == 'running']
+        self._advance(waiting)
+
+    def stats(self):
+        with self._lock:
+            statuses = [job['status'] for job in self._jobs.values()]
+            unfinished = sum(narration['status'] in ('running', 'joining') for narration in self._narrations.values())
+            waits = sorted(wait for wait, _ in self._latencies)
+            totals = sorted(total for _, total in self._latencies)
+            first_audio = sorted(first for first, _ in self._narration_latencies)
+            narration_totals = sorted(total for _, total in self._narration_latencies)
+        return {
+            'workers': self.workers,
+            'queue_depth': statuses.count('queued'),
+            'running': statuses.count('running'),
+            'done': statuses.count('done'),
+            'failed': statuses.count('failed'),
+            'narrations_running': unfinished,
+            'queue_wait_p50': _percentile(waits, 0.5),
+            'latency_p50': _percentile(totals, 0.5),
+            'latency_p95': _percentile(totals, 0.95),
+            'first_audio_p50': _percentile(first_audio, 0.5),
+            'first_audio_p95': _percentile(first_audio, 0.95),
+            'narration_p50': _percentile(narration_totals, 0.5),
+            'narration_p95': _percentile(narration_totals, 0.95),
+        }
+
+
+def _percentile(sorted_values, fraction):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def service():
+    """The process-wide TTS service, started on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TTSService()
+        return _service
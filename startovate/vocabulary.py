@@ -0,0 +1,32 @@
+"""The generator's vocabularies: every selection, name part, tagline and idea text.
+
+A leaf module, so the generator, ``ideas`` and ``scoring`` can all import it.
+"""
+
+INDUSTRIES = ["Healthcare", "Education", "Finance", "Entertainment", "AI/ML", "GreenTech", "Travel"]
+AUDIENCES = ["Students", "Professionals", "Seniors", "Startups", "Businesses", "Individuals"]
+TECHNOLOGIES = ["AI Tool", "Mobile App", "Web App", "IoT", "Blockchain", "SaaS Platform", "VR/AR"]
+GOALS = ["Disrupt the market", "Solve social issues", "Go viral", "Generate revenue", "Improve efficiency", "Enhance user experience"]
+MONETIZATION_OPTIONS = ["Subscription", "Ads", "Freemium", "Commission", "Direct Sales", "Licensing"]
+REGIONS = ["India", "Global", "US", "Europe", "Asia", "Africa"]
+
+NAMES = ["Nexa", "Zeno", "Looma", "Orbit", "Glowr", "Synapse", "Apex", "Nova", "Vortex"]
+SUFFIXES = ["ly", "X", "ify", "Hub", "Flow", "Go", "AI"]
+STARTUP_NAMES = [name + suffix for name in NAMES for suffix in SUFFIXES]
+
+TAGLINES = [
+    "Revolutionizing the future.", "Power through simplicity.",
+    "Smart ideas, real impact.", "Innovation meets action.",
+    "Your ultimate solution.", "Simplifying complex problems."
+]
+
+IDEA_MAP = {
+    "Healthcare": "analyze health metrics and provide instant AI feedback for personalized wellness plans.",
+    "Education": "deliver smart, adaptive lessons and track learning patterns for optimized student growth.",
+    "Finance": "automate savings, budgets, and investments with intelligent predictive analytics.",
+    "Entertainment": "create customized immersive experiences through interactive storytelling and AI-driven content.",
+    "AI/ML": "build intelligent solutions for automating daily tasks and enhancing productivity across industries.",
+    "GreenTech": "suggest eco-friendly habits and monitor environmental impact using real-time data.",
+    "Travel": "plan smart, personalized trips that adjust on-the-go based on preferences and real-time conditions."
+}
+DEFAULT_IDEA = "solve a pressing problem in the chosen domain."
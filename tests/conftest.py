@@ -0,0 +1,32 @@
+import os
+
+import pytest
+
+from startovate import storage
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """Point storage at a fresh database in ``tmp_path``; returns its path.
+
+    The legacy JSON files it imports on first use are looked for in ``tmp_path`` too.
+    """
+    path = os.path.join(tmp_path, "test.db")
+    monkeypatch.setattr(storage, 'DB_FILE', path)
+    monkeypatch.setattr(storage, 'USER_DATA_FILE', os.path.join(tmp_path, "users.json"))
+    monkeypatch.setattr(storage, 'SAVED_IDEAS_FILE', os.path.join(tmp_path, "saved_ideas.json"))
+    return path
+
+
+@pytest.fixture
+def make_idea():
+    """Build a saved-idea dict like the generator's, with some values changed."""
+    def make(**changes):
+        idea = {
+            'name': "Zenoify", 'tagline': "Smart care for everyone", 'industry': "Healthcare",
+            'audience': "Students", 'tech': "AI Tool", 'goal': "Go viral", 'monetization': ["Subscription"],
+            'region': "India", 'team': 5, 'score': 80, 'idea': "An AI tool that books clinic visits.",
+        }
+        idea.update(changes)
+        return idea
+    return make
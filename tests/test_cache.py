@@ -0,0 +1,55 @@
+"""The user directory cache against writes from another replica."""
+import os
+import threading
+
+from startovate import storage
+from startovate.cache import UserDirectoryCache
+
+
+def in_other_replica(fn, *args):
+    """Run ``fn`` on another thread, which has its own storage connection."""
+    thread = threading.Thread(target=fn, args=args)
+    thread.start()
+    thread.join()
+
+
+def test_write_between_signature_and_version_is_seen(db, monkeypatch):
+    cache = UserDirectoryCache()
+    storage.add_user("amy", "Amy", "amy@example.com", "h")
+    assert set(cache.users()) == {"amy"}
+
+    # The files change without a write (e.g. a checkpoint), so the cache reads the version,
+    # and another replica commits right after that read.
+    os.utime(db, ns=(0, 0))
+    version = storage.version
+
+    def version_then_commit():
+        current = version()
+        in_other_replica(storage.add_user, "bob", "Bob", "bob@example.com", "h")
+        return current
+
+    monkeypatch.setattr(storage, 'version', version_then_commit)
+    cache.users()
+    monkeypatch.setattr(storage, 'version', version)
+    assert set(cache.users()) == {"amy", "bob"}
+
+
+def test_write_right_after_own_write_is_seen(db, monkeypatch):
+    cache = UserDirectoryCache()
+    assert cache.users() == {}
+    add_user, version = storage.add_user, storage.version
+
+    def version_then_commit():
+        current = version()
+        monkeypatch.setattr(storage, 'version', version)
+        in_other_replica(add_user, "bob", "Bob", "bob@example.com", "h")
+        return current
+
+    def add_user_then_race(*args):
+        created = add_user(*args)
+        monkeypatch.setattr(storage, 'version', version_then_commit)
+        return created
+
+    monkeypatch.setattr(storage, 'add_user', add_user_then_race)
+    assert cache.add_user("amy", "Amy", "amy@example.com", "h")
+    assert set(cache.users()) == {"amy", "bob"}
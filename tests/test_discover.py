@@ -0,0 +1,67 @@
+"""Discover search over the inverted index kept by storage."""
+import json
+
+from startovate import discover, storage, terms
+
+
+def names(results):
+    return [idea['name'] for idea in results.ideas]
+
+
+def test_terms_of_an_idea(make_idea):
+    idea_terms = terms.idea_terms(make_idea(name="ZenoFlow", monetization=["Ads", "Freemium"]))
+    assert {terms.ALL, "zenoflow", "zeno", "flow", "smart", "care", "students", "industry:Healthcare",
+            "monetization:Ads", "monetization:Freemium"} <= idea_terms
+    assert "for" not in idea_terms  # stopword
+    assert terms.query_groups("Smart the CARE", industry=["Travel", "Finance"]) == [
+        ["care"], ["smart"], ["industry:Travel", "industry:Finance"]]
+
+
+def test_keywords_and_facets_must_all_match(db, make_idea):
+    storage.add_idea("amy", make_idea(name="Alpha", score=90))
+    storage.add_idea("amy", make_idea(name="Beta", tagline="Cheap flights", industry="Travel", score=70))
+    storage.add_idea("bob", make_idea(name="Gamma", monetization=["Ads"], score=60))
+
+    assert names(discover.search("smart")) == ["Alpha", "Gamma"]
+    assert names(discover.search("smart", monetization=["Ads", "Freemium"])) == ["Gamma"]
+    assert names(discover.search(industry=["Travel", "Healthcare"])) == ["Alpha", "Beta", "Gamma"]
+    assert names(discover.search("flights", industry=["Healthcare"])) == []
+    assert names(discover.search("zzzz")) == []
+    assert names(discover.search(score=(65, 85))) == ["Beta"]
+
+
+def test_ranked_by_score_then_newest(db, make_idea):
+    for name, score in (("Old", 80), ("Low", 50), ("New", 80), ("Top", 95)):
+        storage.add_idea("amy", make_idea(name=name, score=score))
+    assert names(discover.search()) == ["Top", "New", "Old", "Low"]
+
+
+def test_pages(db, make_idea):
+    for i in range(5):
+        storage.add_idea("amy", make_idea(name=f"Idea{i}", score=50 + i))
+    first, second, last = (discover.search(k=2, page=page) for page in (1, 2, 3))
+    assert (names(first), first.has_more) == (["Idea4", "Idea3"], True)
+    assert (names(second), second.has_more) == (["Idea2", "Idea1"], True)
+    assert (names(last), last.page, last.has_more) == (["Idea0"], 3, False)
+    assert discover.search(k=5).has_more is False
+
+
+def test_index_follows_updates_and_deletes(db, make_idea):
+    saved = storage.add_idea("amy", make_idea(name="Alpha"))
+    storage.update_idea("amy", {**saved, 'tagline': "Cheap flights", 'score': 40})
+    assert names(discover.search("smart")) == []
+    assert [idea['score'] for idea in discover.search("flights").ideas] == [40]
+    assert names(discover.search(score=(80, 80))) == []
+
+    storage.delete_idea("amy", saved['id'])
+    assert names(discover.search("flights")) == []
+    conn = storage.connect()
+    assert conn.execute("SELECT COUNT(*) FROM idea_terms").fetchone() == (0,)
+    assert conn.execute("SELECT COUNT(*) FROM term_counts WHERE ideas != 0").fetchone() == (0,)
+
+
+def test_ideas_imported_by_the_migration_are_indexed(db, make_idea):
+    with open(storage.SAVED_IDEAS_FILE, 'w') as f:
+        json.dump({"amy": [make_idea(name="Alpha"), make_idea(name="Beta", tagline="Cheap flights")]}, f)
+    assert names(discover.search("flights")) == ["Beta"]
+    assert sorted(names(discover.search())) == ["Alpha", "Beta"]
@@ -0,0 +1,51 @@
+"""The ``Idea`` record and its ids."""
+import json
+import pickle
+
+import pytest
+
+from startovate.ideas import Idea, content_hash, idea_id, with_id
+
+
+def test_json_round_trip(make_idea):
+    text = json.dumps(make_idea(id="abc"))
+    idea = Idea.from_json(text)
+    assert idea.to_json() == text
+    assert dict(idea) == make_idea(id="abc")
+    assert idea['monetization'] == ["Subscription"] and idea['industry'] == "Healthcare"
+
+
+def test_unknown_values_keys_and_order_are_kept(make_idea):
+    data = {'note': "hand-edited", **make_idea(industry="Space Mining", region="Mars")}
+    text = json.dumps(data)
+    idea = Idea.from_json(text)
+    assert idea.to_json() == text
+    assert list(idea) == list(data) and idea['note'] == "hand-edited" and idea['industry'] == "Space Mining"
+    with pytest.raises(KeyError):
+        idea['missing']
+
+
+def test_equality_and_hashing(make_idea):
+    idea = Idea.from_mapping(make_idea())
+    assert idea == Idea.from_json(json.dumps(make_idea()))
+    assert idea == make_idea()  # compares as a mapping
+    assert idea != idea.replace(tagline="Other")
+    assert idea.content_key() == idea.replace(id="abc").content_key()
+    assert idea.content_key() != idea.replace(score=1).content_key()
+    with pytest.raises(TypeError):
+        hash(idea)  # a mapping; use content_key() or content_hash() as a key
+    assert pickle.loads(pickle.dumps(idea)) == idea
+
+
+def test_idea_id(make_idea):
+    data = make_idea()
+    derived = idea_id(data)
+    assert derived == content_hash(data)[:16] == idea_id(Idea.from_mapping(data))
+    assert idea_id({'id': "abc", **data}) == "abc"
+    assert content_hash({'id': "abc", **data}) == content_hash(data)
+    assert idea_id(make_idea(score=1)) != derived
+
+    idea = with_id(data)
+    assert type(idea) is Idea and idea['id'] == derived
+    assert with_id(idea) is idea
+    assert with_id({**data, 'id': "abc"})['id'] == "abc"
@@ -0,0 +1,127 @@
+"""Outbox delivery against a local aiosmtpd server."""
+import os
+import socket
+import time
+
+import pytest
+from aiosmtpd.controller import Controller
+
+from startovate import outbox, storage
+
+
+class Recorder:
+    """aiosmtpd handler that keeps every accepted message, refusing the first ``refuse`` attempts."""
+
+    def __init__(self, refuse=0):
+        self.refuse = refuse
+        self.attempts = 0
+        self.subjects = []
+        self.connections = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.attempts += 1
+        if self.attempts <= self.refuse:
+            return '451 Try again later'
+        subject = next(line for line in envelope.content.decode().splitlines() if line.startswith('Subject: '))
+        self.subjects.append(subject.removeprefix('Subject: '))
+        return '250 OK'
+
+
+@pytest.fixture
+def smtp(tmp_path, monkeypatch):
+    """Start a stand-in SMTP server and point storage and the outbox at temporary ones."""
+    monkeypatch.setattr(storage, 'DB_FILE', os.path.join(tmp_path, "test.db"))
+    monkeypatch.setattr(outbox, 'BACKOFF_BASE', 0.01)
+    monkeypatch.setattr(outbox, 'POLL_INTERVAL', 0.05)
+    servers = []
+
+    def start(handler, workers=1, run=True):
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            port = probe.getsockname()[1]
+        controller = Controller(handler, hostname='127.0.0.1', port=port)
+        controller.start()
+        servers.append(controller)
+        monkeypatch.setattr(outbox, 'SMTP_HOST', '127.0.0.1')
+        monkeypatch.setattr(outbox, 'SMTP_PORT', port)
+        monkeypatch.setattr(outbox, 'SMTP_SSL', False)
+        monkeypatch.setattr(outbox, '_sender', None)
+        if run:
+            sender = outbox.OutboxSender(workers=workers).start()
+            monkeypatch.setattr(outbox, '_sender', sender)
+        return handler
+
+    yield start
+    if outbox._sender is not None:
+        outbox._sender.stop()
+    for server in servers:
+        server.stop()
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def test_enqueued_message_is_delivered(smtp):
+    handler = smtp(Recorder())
+    message_id = outbox.enqueue("amy@example.com", "Hello", "Body")
+    wait_for(lambda: outbox.status(message_id)['status'] == 'sent')
+    assert handler.subjects == ["Hello"]
+    assert outbox.status(message_id)['attempts'] == 1
+
+
+def test_failed_delivery_is_retried(smtp):
+    handler = smtp(Recorder(refuse=2))
+    message_id = outbox.enqueue("amy@example.com", "Retried", "Body")
+    wait_for(lambda: outbox.status(message_id)['status'] == 'sent')
+    assert handler.subjects == ["Retried"]
+    assert outbox.status(message_id)['attempts'] == 3
+
+
+def test_messages_are_not_sent_twice(smtp):
+    handler = smtp(Recorder(), workers=4)
+    ids = [outbox.enqueue("amy@example.com", f"Message {i}", "Body") for i in range(30)]
+    wait_for(lambda: all(outbox.status(message_id)['status'] == 'sent' for message_id in ids))
+    assert sorted(handler.subjects) == sorted(f"Message {i}" for i in range(30))
+
+
+def test_sender_survives_a_locked_database(smtp, monkeypatch):
+    claim = outbox._claim
+    failures = []
+
+    def locked_once():
+        if not failures:
+            failures.append(1)
+            raise outbox.sqlite3.OperationalError("database is locked")
+        return claim()
+
+    monkeypatch.setattr(outbox, '_claim', locked_once)
+    handler = smtp(Recorder())
+    message_id = outbox.enqueue("amy@example.com", "After lock", "Body")
+    wait_for(lambda: outbox.status(message_id)['status'] == 'sent')
+    assert failures and handler.subjects == ["After lock"]
+
+
+def test_messages_queued_before_a_restart_are_delivered_on_start(smtp):
+    handler = smtp(Recorder(), run=False)
+    now = time.time()
+    # Left by the previous server process: never tried, and claimed by a sender that died.
+    with storage.transaction(bump=False) as conn:
+        for i, (status, claimed_at) in enumerate([('pending', None)] * 3 + [('sending', now - outbox.CLAIM_LEASE - 1)]):
+            conn.execute(
+                "INSERT INTO outbox (to_email, subject, body, status, claimed_at, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                ("amy@example.com", f"Left {i}", "Body", status, claimed_at, now, now),
+            )
+    outbox.start()
+    wait_for(lambda: len(handler.subjects) == 4)
+    assert sorted(handler.subjects) == [f"Left {i}" for i in range(4)]
+    assert handler.connections == 1  # the batch went over one connection
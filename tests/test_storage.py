@@ -0,0 +1,86 @@
+"""SQLite storage: the one-time JSON import, migrations, ids and gallery order."""
+import json
+import threading
+
+import pytest
+
+from startovate import storage, terms
+from startovate.ideas import idea_id
+
+
+@pytest.fixture
+def legacy(db):
+    """Write old users.json / saved_ideas.json files for the first connect() to import."""
+    def write(users, saved_ideas):
+        for path, data in ((storage.USER_DATA_FILE, users), (storage.SAVED_IDEAS_FILE, saved_ideas)):
+            with open(path, 'w') as f:
+                json.dump(data, f)
+    return write
+
+
+def in_new_connection(fn, *args):
+    """``fn(*args)`` on another thread, which opens its own connection."""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(fn(*args)))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_legacy_json_is_imported_with_ids(legacy, make_idea):
+    first, second = make_idea(), make_idea(name="Loomaly", score=70)
+    legacy({"amy": {'name': "Amy", 'email': "amy@example.com", 'password': "h"}},
+           {"amy": [first, second, first]})
+
+    assert storage.load_user_data() == {"amy": {'name': "Amy", 'email': "amy@example.com", 'password': "h"}}
+    ideas = storage.load_saved_ideas("amy")
+    assert [idea['name'] for idea in ideas] == ["Zenoify", "Loomaly", "Zenoify"]
+    first_id = idea_id(first)
+    # The same idea saved twice before duplicates were detected keeps both copies.
+    assert [idea['id'] for idea in ideas] == [first_id, idea_id(second), f"{first_id}-2"]
+    assert {key: value for key, value in ideas[0].items() if key != 'id'} == first
+
+
+def test_duplicate_in_second_place_gets_its_position_as_suffix(legacy, make_idea):
+    legacy({}, {"amy": [make_idea(), make_idea()]})
+    first_id = idea_id(make_idea())
+    assert [idea['id'] for idea in storage.load_saved_ideas("amy")] == [first_id, f"{first_id}-1"]
+
+
+def test_migrations_run_once(legacy, make_idea):
+    legacy({"amy": {'name': "Amy", 'email': "amy@example.com", 'password': "h"}}, {"amy": [make_idea()]})
+    conn = storage.connect()
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(storage.MIGRATIONS)
+    version = storage.version()
+
+    # A second connection finds the schema current: nothing is imported or indexed again.
+    assert in_new_connection(lambda: len(storage.load_saved_ideas("amy"))) == 1
+    assert in_new_connection(storage.version) == version
+    assert conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 1
+    assert conn.execute("SELECT ideas FROM term_counts WHERE term = ?", (terms.ALL,)).fetchone() == (1,)
+
+
+def test_every_write_bumps_the_version(db, make_idea):
+    version = storage.version()
+    assert storage.add_user("amy", "Amy", "amy@example.com", "h")
+    assert not storage.add_user("amy", "Amy", "amy@example.com", "h")
+    assert storage.version() == version + 1
+    saved = storage.add_idea("amy", make_idea())
+    storage.update_idea("amy", {**saved, 'tagline': "New"})
+    storage.delete_idea("amy", saved['id'])
+    assert storage.version() == version + 4
+
+
+def test_gallery_order_after_delete_and_add(db, make_idea):
+    a, b, c = (storage.add_idea("amy", make_idea(name=name)) for name in ("A", "B", "C"))
+    assert storage.add_idea("amy", make_idea(name="A")) == a  # already saved: a no-op
+    storage.delete_idea("amy", b['id'])
+    d = storage.add_idea("amy", make_idea(name="D"))
+    assert [idea['name'] for idea in storage.load_saved_ideas("amy")] == ["A", "C", "D"]
+
+    storage.save_saved_ideas("amy", [d, a, c])
+    assert [idea['name'] for idea in storage.load_saved_ideas("amy")] == ["D", "A", "C"]
+    storage.delete_idea("amy", a['id'])
+    storage.update_idea("amy", {**c, 'tagline': "Edited"})
+    assert [(idea['name'], idea['tagline']) for idea in storage.load_saved_ideas("amy")] == [
+        ("D", "Smart care for everyone"), ("C", "Edited")]
@@ -0,0 +1,88 @@
+"""Recognizer jobs against a stub backend, so no network or speech engine is needed."""
+import io
+import threading
+import time
+import wave
+
+import pytest
+
+from startovate import stt
+
+
+def wav(n):
+    """A short silent WAV recording; ``n`` makes the bytes, and so the cache key, unique."""
+    out = io.BytesIO()
+    with wave.open(out, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(8000)
+        w.writeframes(b'\0\0' * (800 + n))
+    return out.getvalue()
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """Register a backend that blocks until ``release`` is set, then returns "hello"."""
+    release = threading.Event()
+    calls = []
+
+    def recognize(recognizer, audio):
+        calls.append(audio)
+        release.wait(5)
+        return "hello"
+
+    monkeypatch.setitem(stt.BACKENDS, 'stub', recognize)
+    monkeypatch.setattr(stt, 'RESULT_GRACE', 0.1)
+    recognizer = stt.Recognizer(backend='stub', workers=1, timeout=0.2)
+    yield recognizer, release, calls
+    release.set()
+    recognizer._executor.shutdown(wait=True)
+
+
+def wait_for(condition, timeout=5):
+    end = time.time() + timeout
+    while not condition():
+        assert time.time() < end, "timed out"
+        time.sleep(0.01)
+
+
+def test_done_and_cached(stub):
+    recognizer, release, calls = stub
+    release.set()
+    job_id = recognizer.submit(wav(0))
+    wait_for(lambda: recognizer.job(job_id)['status'] != 'running')
+    assert recognizer.job(job_id) == {'status': 'done', 'text': "hello", 'error': None}
+
+    again = recognizer.submit(wav(0))
+    assert recognizer.job(again)['status'] == 'done'
+    assert len(calls) == 1
+
+
+def test_queued_job_times_out_and_is_cancelled(stub):
+    recognizer, release, calls = stub
+    busy = recognizer.submit(wav(0))
+    queued = recognizer.submit(wav(1))
+    wait_for(lambda: calls)
+    assert recognizer.pending() == 2
+
+    time.sleep(0.25)
+    assert recognizer.job(queued)['status'] == 'timeout'
+    assert recognizer.job(busy)['status'] == 'timeout'
+    # The queued one gave its place back; the running one holds the worker until it returns.
+    assert recognizer.pending() == 1
+    release.set()
+    wait_for(lambda: recognizer.pending() == 0)
+    assert len(calls) == 1
+
+
+def test_uncollected_jobs_are_dropped_after_their_deadline(stub):
+    recognizer, release, calls = stub
+    release.set()
+    job_ids = [recognizer.submit(wav(n)) for n in range(5)]
+    wait_for(lambda: recognizer.pending() == 0)
+    assert all(recognizer.job(job_id)['status'] == 'done' for job_id in job_ids)
+
+    time.sleep(0.35)  # past timeout + RESULT_GRACE
+    recognizer.submit(wav(0))
+    assert all(recognizer.job(job_id) is None for job_id in job_ids)
+    assert len(recognizer._jobs) == 1